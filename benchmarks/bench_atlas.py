@@ -0,0 +1,88 @@
+"""
+Benchmark of the packing of the texture atlases (--with_texture).
+Compare the skyline packing of the AtlasPacker with the former implementation: a binary tree of rectangles
+(https://blackpawn.com/texts/lightmaps/), restarted with a doubled width or height each time a texture doesn't fit.
+
+Usage:
+    python benchmarks/bench_atlas.py [--atlases 50] [--textures 200] [--padding 1]
+
+The textures are random rectangles, from 8 to 512 pixels wide and high. Both packers round the atlas sizes to powers of two,
+the skyline packing is also run without rounding (--atlas_npot). The efficiency is the ratio of the atlas area covered by the textures.
+"""
+import argparse
+import time
+import numpy as np
+from py3dtilers.Texture import AtlasPacker, Node, Rectangle
+
+
+class LegacyTexture():
+    def __init__(self, size):
+        self.size = size
+
+
+def legacy_packing(sizes):
+    textures = sorted([LegacyTexture(size) for size in sizes], key=lambda texture: texture.size[0] * texture.size[1], reverse=True)
+    side = 1
+    while side < np.sqrt(sum([width * height for width, height in sizes])):
+        side *= 2
+    rect = Rectangle(0, 0, side, side)
+    node_root = None
+    it = 0
+    while node_root is None:
+        node_root = Node(rect)
+        axis = it % 2
+        for index, texture in enumerate(textures):
+            node_root = node_root.insert(texture, index)
+            if node_root is None:
+                rect = Rectangle(0, 0, int(rect.get_width() * (2 - axis)), int(rect.get_height() * (1 + axis)))
+                it += 1
+                break
+    return rect.get_width(), rect.get_height()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the packing of the texture atlases')
+    parser.add_argument('--atlases', type=int, default=50)
+    parser.add_argument('--textures', type=int, default=200)
+    parser.add_argument('--padding', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    atlases = [[tuple(size) for size in rng.integers(8, 513, (args.textures, 2)).tolist()] for _ in range(args.atlases)]
+    areas = [sum([width * height for width, height in sizes]) for sizes in atlases]
+
+    start = time.perf_counter()
+    legacy_sizes = [legacy_packing(sizes) for sizes in atlases]
+    legacy_time = time.perf_counter() - start
+
+    packer = AtlasPacker(args.padding)
+    start = time.perf_counter()
+    results = [packer.pack(sizes) for sizes in atlases]
+    skyline_time = time.perf_counter() - start
+
+    npot_packer = AtlasPacker(args.padding, power_of_two=False)
+    start = time.perf_counter()
+    npot_results = [npot_packer.pack(sizes) for sizes in atlases]
+    npot_time = time.perf_counter() - start
+
+    legacy_efficiency = np.mean([area / (width * height) for area, (width, height) in zip(areas, legacy_sizes)])
+    skyline_efficiency = np.mean([packer.get_efficiency(sizes, atlas_size) for sizes, (_, atlas_size) in zip(atlases, results)])
+    npot_efficiency = np.mean([packer.get_efficiency(sizes, atlas_size) for sizes, (_, atlas_size) in zip(atlases, npot_results)])
+
+    print(args.atlases, "atlases of", args.textures, "textures")
+    print("{:<14}{:>10}{:>12}".format("", "time (s)", "efficiency"))
+    print("{:<14}{:>10.3f}{:>12.3f}".format("legacy", legacy_time, legacy_efficiency))
+    print("{:<14}{:>10.3f}{:>12.3f}".format("skyline", skyline_time, skyline_efficiency))
+    print("{:<14}{:>10.3f}{:>12.3f}".format("skyline npot", npot_time, npot_efficiency))
+
+    # The textures must not overlap and must stay in the atlas
+    for sizes, (positions, (atlas_width, atlas_height)) in zip(atlases + atlases, results + npot_results):
+        mask = np.zeros((atlas_height, atlas_width), dtype=np.int32)
+        for (width, height), (left, top) in zip(sizes, positions):
+            assert left + width <= atlas_width and top + height <= atlas_height
+            mask[top:top + height, left:left + width] += 1
+        assert mask.max() == 1
+
+
+if __name__ == '__main__':
+    main()
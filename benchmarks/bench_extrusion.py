@@ -0,0 +1,109 @@
+"""
+Benchmark of the footprint extrusions used by the LOD1 and LOA nodes (--lod1, --loa).
+Compare the extrusion of each building (Shapely hull, mapbox_earcut, walls as array operations),
+the extrusion of all the buildings at once by a FootprintExtruder (used by the LOD1 nodes),
+and the former implementation (alphashape hull, pure Python triangulation and walls).
+
+Usage:
+    python benchmarks/bench_extrusion.py [--buildings 10000] [--legacy_buildings 1000] [--processes 1]
+
+The buildings are random boxes with a gabled roof. The former implementation used earclip, which is not on PyPI:
+the pure Python port of earcut (a dependency of py3dtiles) replaces it as the legacy triangulation.
+The former implementation is only run on the first legacy_buildings buildings, its time is extrapolated.
+It needs alphashape, which is no longer a dependency of py3dtilers: without it, the former implementation is skipped.
+"""
+import argparse
+import time
+import numpy as np
+from earcut.earcut import earcut
+from py3dtilers.Common import Feature, FeatureList, ExtrudedPolygon, FootprintExtruder
+try:
+    from alphashape import alphashape
+except ImportError:
+    alphashape = None
+
+
+def create_building(rng, index):
+    x, y = rng.uniform(0, 1000, 2)
+    width, depth, height = rng.uniform(5, 30, 3)
+    corners = np.array([[x, y], [x + width, y], [x + width, y + depth], [x, y + depth]])
+    bottom = np.hstack([corners, np.zeros((4, 1))])
+    top = np.hstack([corners, np.full((4, 1), height)])
+    ridge = np.array([[x, y + depth / 2, height + 3], [x + width, y + depth / 2, height + 3]])
+    triangles = list()
+    for i in range(4):
+        j = (i + 1) % 4
+        triangles += [[bottom[i], top[i], top[j]], [bottom[i], top[j], bottom[j]]]
+    triangles += [[top[0], top[1], ridge[1]], [top[0], ridge[1], ridge[0]],
+                  [top[2], top[3], ridge[0]], [top[2], ridge[0], ridge[1]],
+                  [top[1], top[2], ridge[1]], [top[3], top[0], ridge[0]]]
+    feature = Feature("building_" + str(index))
+    feature.set_triangles(np.array(triangles))
+    feature.set_box()
+    return feature
+
+
+def legacy_extrusion(feature):
+    triangles = feature.get_geom_as_triangles()
+    points = triangles[:, :, :2].reshape((-1, 2)).tolist()
+    minZ = np.min(triangles[:, :, 2])
+    maxZ = sum(np.max(triangles[:, :, 2], axis=1).tolist()) / len(triangles)
+    coordinates = alphashape(points, 0.).exterior.coords[:-1]
+    length = len(coordinates)
+    vertices = [None] * (2 * length)
+    for i, coord in enumerate(coordinates):
+        vertices[i] = np.array([coord[0], coord[1], minZ])
+        vertices[i + length] = np.array([coord[0], coord[1], maxZ])
+    extrusion = list()
+    indices = earcut([value for coord in coordinates for value in coord])
+    for k in range(0, len(indices), 3):
+        extrusion.append([np.array([coordinates[i][0], coordinates[i][1], maxZ]) for i in indices[k:k + 3]])
+    for i in range(0, length):
+        extrusion.append([vertices[i], vertices[length + i], vertices[length + ((i + 1) % length)]])
+        extrusion.append([vertices[i], vertices[length + ((i + 1) % length)], vertices[((i + 1) % length)]])
+    return extrusion
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the footprint extrusions')
+    parser.add_argument('--buildings', type=int, default=10000)
+    parser.add_argument('--legacy_buildings', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    buildings = [create_building(rng, i) for i in range(args.buildings)]
+
+    start = time.perf_counter()
+    extrusions = [ExtrudedPolygon("lod1_" + str(i), [building]) for i, building in enumerate(buildings)]
+    vectorized_time = time.perf_counter() - start
+
+    store = FeatureList(buildings).get_geometry_store()
+    start = time.perf_counter()
+    triangles, batch_ids = FootprintExtruder(args.processes).extrude(store.vertices, store.offsets)
+    batch_time = time.perf_counter() - start
+
+    print(args.buildings, "buildings,", sum([extrusion.get_number_of_triangles() for extrusion in extrusions]), "triangles")
+    if alphashape is None:
+        print("alphashape is not installed, the former implementation is skipped")
+        print("{:<15}{:>16}".format("", "vectorized (s)"))
+        print("{:<15}{:>16.3f}".format("per building", vectorized_time))
+        print("{:<15}{:>16.3f}".format("batch", batch_time))
+    else:
+        nb_legacy = min(args.legacy_buildings, args.buildings)
+        start = time.perf_counter()
+        legacy_extrusions = [legacy_extrusion(building) for building in buildings[:nb_legacy]]
+        legacy_time = (time.perf_counter() - start) * args.buildings / nb_legacy
+
+        print("{:<15}{:>14}{:>16}{:>10}".format("", "legacy (s)*", "vectorized (s)", "speedup"))
+        print("{:<15}{:>14.3f}{:>16.3f}{:>9.1f}x".format("per building", legacy_time, vectorized_time, legacy_time / vectorized_time))
+        print("{:<15}{:>14.3f}{:>16.3f}{:>9.1f}x".format("batch", legacy_time, batch_time, legacy_time / batch_time))
+        print("* extrapolated from", nb_legacy, "buildings")
+
+        for extrusion, legacy in zip(extrusions, legacy_extrusions):
+            assert extrusion.get_number_of_triangles() == len(legacy)
+    assert np.array_equal(np.bincount(batch_ids), [extrusion.get_number_of_triangles() for extrusion in extrusions])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark of the affine transformations of FeatureList (translate, scale and height multiplier).
+Compare the whole-array implementation with the former vertex by vertex implementation.
+
+Usage:
+    python benchmarks/bench_feature_transforms.py [--features 2000] [--triangles 200]
+"""
+import argparse
+import time
+import numpy as np
+from py3dtilers.Common import Feature, FeatureList
+
+
+def create_feature_list(nb_features, nb_triangles, seed=0):
+    rng = np.random.default_rng(seed)
+    features = list()
+    for i in range(nb_features):
+        feature = Feature(str(i))
+        center = rng.uniform([0, 0, 0], [10000, 10000, 100])
+        feature.geom.triangles.append(center + rng.uniform(-10, 10, (nb_triangles, 3, 3)))
+        feature.set_box()
+        features.append(feature)
+    return FeatureList(features)
+
+
+def legacy_translate(feature_list, offset):
+    for feature in feature_list.get_features():
+        new_geom = []
+        for triangle in feature.get_geom_as_triangles():
+            new_position = []
+            for points in triangle:
+                new_position.append(np.array(points + offset))
+            new_geom.append(new_position)
+        feature.set_triangles(new_geom)
+        feature.set_box()
+
+
+def legacy_height_mult(feature_list, height_mult):
+    for feature in feature_list.get_features():
+        new_geom = []
+        for triangle in feature.get_geom_as_triangles():
+            scaled_triangle = []
+            for vertex in triangle:
+                scaled_triangle.append(np.array([vertex[0], vertex[1], vertex[2] * height_mult]))
+            new_geom.append(scaled_triangle)
+        feature.set_triangles(new_geom)
+        feature.set_box()
+
+
+def legacy_scale(feature_list, scale_factor, centroid):
+    for feature in feature_list.get_features():
+        new_geom = []
+        for triangle in feature.get_geom_as_triangles():
+            new_geom.append([((vertex - centroid) * scale_factor) + centroid for vertex in triangle])
+        feature.set_triangles(new_geom)
+        feature.set_box()
+
+
+def run(function, feature_list, *args):
+    start = time.perf_counter()
+    function(feature_list, *args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the FeatureList affine transformations')
+    parser.add_argument('--features', type=int, default=2000)
+    parser.add_argument('--triangles', type=int, default=200)
+    args = parser.parse_args()
+
+    legacy_list = create_feature_list(args.features, args.triangles)
+    array_list = create_feature_list(args.features, args.triangles)
+    centroid = array_list.get_centroid()
+    offset = np.array([10., -20., 5.])
+
+    print(args.features, "features,", args.features * args.triangles, "triangles")
+    print("{:<15}{:>12}{:>12}{:>10}".format("transform", "legacy (s)", "array (s)", "speedup"))
+    benchmarks = [('height_mult', legacy_height_mult, FeatureList.height_mult_features, (0.3048,)),
+                  ('scale', legacy_scale, FeatureList.scale_features, (2., centroid)),
+                  ('translate', legacy_translate, FeatureList.translate_features, (offset,))]
+    for name, legacy, vectorized, arguments in benchmarks:
+        legacy_time = run(legacy, legacy_list, *arguments)
+        array_time = run(vectorized, array_list, *arguments)
+        print("{:<15}{:>12.3f}{:>12.3f}{:>9.1f}x".format(name, legacy_time, array_time, legacy_time / array_time))
+
+    for legacy_feature, array_feature in zip(legacy_list, array_list):
+        assert np.allclose(legacy_feature.get_geom_as_triangles(), array_feature.get_geom_as_triangles())
+        assert np.allclose(legacy_feature.get_centroid(), array_feature.get_centroid())
+
+
+if __name__ == '__main__':
+    main()
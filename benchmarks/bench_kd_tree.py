@@ -0,0 +1,68 @@
+"""
+Benchmark of the kd-tree distributing the features into groups.
+Compare the index-array implementation with the former implementation sorting a FeatureList at each level.
+
+Usage:
+    python benchmarks/bench_kd_tree.py [--features 200000] [--max 500]
+"""
+import argparse
+import time
+import numpy as np
+from py3dtilers.Common import Feature, FeatureList, kd_tree
+
+
+def create_features(nb_features, seed=0):
+    rng = np.random.default_rng(seed)
+    features = list()
+    for i, centroid in enumerate(rng.uniform([0, 0, 0], [10000, 10000, 100], (nb_features, 3))):
+        feature = Feature(str(i))
+        # Round the centroids, so many features share the median value of a level
+        feature.centroid = np.round(centroid / 10) * 10
+        features.append(feature)
+    return features
+
+
+def legacy_kd_tree(feature_list, maxNumObjects, depth=0):
+    derived = feature_list.__class__
+    axis = depth % 2
+    feature_list.set_features(sorted(feature_list, key=lambda obj: obj.get_centroid()[axis]))
+    median = len(feature_list) // 2
+    lObjects = feature_list[:median]
+    rObjects = feature_list[median:]
+    pre_tiles = derived()
+    if len(lObjects) > maxNumObjects or len(rObjects) > maxNumObjects:
+        pre_tiles.extend(legacy_kd_tree(lObjects, maxNumObjects, depth + 1))
+        pre_tiles.extend(legacy_kd_tree(rObjects, maxNumObjects, depth + 1))
+    else:
+        if len(lObjects) > 0:
+            pre_tiles.append(lObjects)
+        if len(rObjects) > 0:
+            pre_tiles.append(rObjects)
+    return pre_tiles
+
+
+def run(function, features, maxNumObjects):
+    start = time.perf_counter()
+    groups = function(FeatureList(list(features)), maxNumObjects)
+    return time.perf_counter() - start, [[feature.get_id() for feature in group] for group in groups]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the kd-tree')
+    parser.add_argument('--features', type=int, default=200000)
+    parser.add_argument('--max', type=int, default=500)
+    args = parser.parse_args()
+
+    features = create_features(args.features)
+    legacy_time, legacy_groups = run(legacy_kd_tree, features, args.max)
+    array_time, array_groups = run(kd_tree, features, args.max)
+
+    print(args.features, "features,", len(array_groups), "groups")
+    print("{:<15}{:>12}{:>12}{:>10}".format("", "legacy (s)", "array (s)", "speedup"))
+    print("{:<15}{:>12.3f}{:>12.3f}{:>9.1f}x".format("kd_tree", legacy_time, array_time, legacy_time / array_time))
+
+    assert legacy_groups == array_groups
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the polygon containment tests used to group the features by polygons (--loa).
+Compare the spatial index (STRtree) with the former implementation testing each centroid against each polygon.
+
+Usage:
+    python benchmarks/bench_polygon_grouping.py [--parcels 50000] [--features 100000] [--legacy_features 2000]
+
+The parcels are the cells of a jittered grid, the features are random points.
+The former implementation is only run on the first legacy_features features, its time is extrapolated.
+"""
+import argparse
+import time
+import numpy as np
+from shapely.geometry import Point, Polygon
+from py3dtilers.Common import PolygonIndex
+
+
+def create_parcels(nb_parcels, cell_size=20., seed=0):
+    rng = np.random.default_rng(seed)
+    columns = int(np.ceil(np.sqrt(nb_parcels)))
+    parcels = list()
+    for i in range(nb_parcels):
+        x, y = (i % columns) * cell_size, (i // columns) * cell_size
+        corners = np.array([[x, y], [x + cell_size, y], [x + cell_size, y + cell_size], [x, y + cell_size]])
+        # Shrink the parcels a little, so some points are outside any parcel
+        corners += rng.uniform(0.5, 1.5, (4, 2)) * np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]])
+        parcels.append(Polygon(corners))
+    return parcels, columns * cell_size
+
+
+def create_points(nb_points, size, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform([0, 0, 0], [size, size, 50], (nb_points, 3))
+
+
+def legacy_find_containing_polygons(points, polygons):
+    polygon_indices = list()
+    for point in points:
+        p = Point(point)
+        polygon_index = -1
+        for index, polygon in enumerate(polygons):
+            if p.within(polygon):
+                polygon_index = index
+                break
+        polygon_indices.append(polygon_index)
+    return np.array(polygon_indices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the polygon containment tests')
+    parser.add_argument('--parcels', type=int, default=50000)
+    parser.add_argument('--features', type=int, default=100000)
+    parser.add_argument('--legacy_features', type=int, default=2000)
+    args = parser.parse_args()
+
+    parcels, size = create_parcels(args.parcels)
+    points = create_points(args.features, size)
+
+    start = time.perf_counter()
+    index_result = PolygonIndex(parcels).find_containing_polygons(points)
+    index_time = time.perf_counter() - start
+
+    nb_legacy = min(args.legacy_features, args.features)
+    start = time.perf_counter()
+    legacy_result = legacy_find_containing_polygons(points[:nb_legacy], parcels)
+    legacy_time = (time.perf_counter() - start) * args.features / nb_legacy
+
+    print(args.parcels, "parcels,", args.features, "features,", np.count_nonzero(index_result >= 0), "in a parcel")
+    print("{:<15}{:>14}{:>12}{:>10}".format("", "legacy (s)*", "index (s)", "speedup"))
+    print("{:<15}{:>14.3f}{:>12.3f}{:>9.1f}x".format("containment", legacy_time, index_time, legacy_time / index_time))
+    print("* extrapolated from", nb_legacy, "features")
+
+    assert np.array_equal(legacy_result, index_result[:nb_legacy])
+
+
+if __name__ == '__main__':
+    main()
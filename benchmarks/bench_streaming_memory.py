@@ -0,0 +1,121 @@
+"""
+Peak memory (RSS) of the tilers, with and without the --stream mode.
+Each run is made in a new process, which reports its own peak RSS.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py [--geojson file.geojson] [--ifc file.ifc] [--features 20000]
+
+When no input is given, a synthetic GeoJSON file (extruded buildings) and a synthetic IFC file (walls)
+are generated in a temporary directory. The IFC run is skipped when ifcopenshell is not installed.
+"""
+import argparse
+import importlib.util
+import json
+import math
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+
+RUNNER = """
+import resource, runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_module(sys.argv[0], run_name='__main__')
+finally:
+    print('PEAK_RSS_KB', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def create_geojson(path, nb_features, nb_points=32, seed=0):
+    rng = np.random.default_rng(seed)
+    features = list()
+    for i in range(nb_features):
+        x, y = rng.uniform([200000, 500000], [205000, 505000])
+        radius = rng.uniform(5, 20)
+        ring = [[x + radius * math.cos(2 * math.pi * k / nb_points), y + radius * math.sin(2 * math.pi * k / nb_points), 50.] for k in range(nb_points)]
+        ring.append(ring[0])
+        features.append({'type': 'Feature',
+                         'properties': {'ID': 'building_' + str(i), 'HAUTEUR': float(rng.uniform(5, 50)), 'PREC_ALTI': 1.},
+                         'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+
+def create_ifc(path, nb_features, seed=0):
+    import ifcopenshell
+    import ifcopenshell.api
+
+    rng = np.random.default_rng(seed)
+    model = ifcopenshell.file(schema='IFC4')
+    project = ifcopenshell.api.run('root.create_entity', model, ifc_class='IfcProject', name='Benchmark')
+    ifcopenshell.api.run('unit.assign_unit', model)
+    context = ifcopenshell.api.run('context.add_context', model, context_type='Model')
+    body = ifcopenshell.api.run('context.add_context', model, context_type='Model', context_identifier='Body', target_view='MODEL_VIEW', parent=context)
+    site = ifcopenshell.api.run('root.create_entity', model, ifc_class='IfcSite', name='Site')
+    building = ifcopenshell.api.run('root.create_entity', model, ifc_class='IfcBuilding', name='Building')
+    storey = ifcopenshell.api.run('root.create_entity', model, ifc_class='IfcBuildingStorey', name='Storey')
+    ifcopenshell.api.run('aggregate.assign_object', model, relating_object=project, products=[site])
+    ifcopenshell.api.run('aggregate.assign_object', model, relating_object=site, products=[building])
+    ifcopenshell.api.run('aggregate.assign_object', model, relating_object=building, products=[storey])
+
+    walls = list()
+    for i in range(nb_features):
+        wall = ifcopenshell.api.run('root.create_entity', model, ifc_class='IfcWall', name='wall_' + str(i))
+        matrix = np.identity(4)
+        matrix[0:3, 3] = rng.uniform([0, 0, 0], [500, 500, 30])
+        ifcopenshell.api.run('geometry.edit_object_placement', model, product=wall, matrix=matrix)
+        representation = ifcopenshell.api.run('geometry.add_wall_representation', model, context=body,
+                                              length=float(rng.uniform(2, 10)), height=3., thickness=0.2)
+        ifcopenshell.api.run('geometry.assign_representation', model, product=wall, representation=representation)
+        walls.append(wall)
+    ifcopenshell.api.run('spatial.assign_container', model, relating_structure=storey, products=walls)
+    model.write(str(path))
+
+
+def measure(module, arguments):
+    """
+    Run a tiler in a new process.
+    :return: the peak RSS of the process, in MB
+    """
+    result = subprocess.run([sys.executable, '-c', RUNNER, module] + arguments, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith('PEAK_RSS_KB'):
+            return int(line.split()[1]) / 1024
+    raise RuntimeError(result.stderr[-2000:])
+
+
+def compare(name, module, arguments, output_dir, input_path):
+    print(f'{name:8} input: {Path(input_path).stat().st_size / 2 ** 20:.1f} MB')
+    default = measure(module, arguments + ['-o', str(Path(output_dir, name + '_default'))])
+    streaming = measure(module, arguments + ['-o', str(Path(output_dir, name + '_stream')), '--stream'])
+    print(f'{name:8} default: {default:8.1f} MB  --stream: {streaming:8.1f} MB  ({100 * (default - streaming) / default:+.1f}% saved)')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--geojson', type=str, default=None)
+    parser.add_argument('--ifc', type=str, default=None)
+    parser.add_argument('--features', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        geojson = args.geojson
+        if geojson is None:
+            geojson = Path(directory, 'buildings.geojson')
+            create_geojson(geojson, args.features)
+        compare('GeoJSON', 'py3dtilers.GeojsonTiler.GeojsonTiler', ['-i', str(geojson), '--lod1'], directory, geojson)
+
+        if importlib.util.find_spec('ifcopenshell') is None:
+            print('IFC      skipped, ifcopenshell is not installed')
+            return
+        ifc = args.ifc
+        if ifc is None:
+            ifc = Path(directory, 'walls.ifc')
+            create_ifc(ifc, args.features // 4)
+        compare('IFC', 'py3dtilers.IfcTiler.IfcTiler', ['-i', str(ifc)], directory, ifc)
+
+
+if __name__ == '__main__':
+    main()
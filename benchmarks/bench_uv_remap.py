@@ -0,0 +1,112 @@
+"""
+Microbenchmarks of the UV operations of the textured tiles (--with_texture).
+Compare the array operations of Texture.cropImage (UV bounds and crop), Texture.updateUvs (UVs of the cropped texture)
+and Atlas.createImage (UVs in the atlas) with the former implementations, which loop over each UV in Python.
+
+Usage:
+    python benchmarks/bench_uv_remap.py [--triangles 200000] [--repeat 3]
+
+The UVs are random (n, 3, 2) arrays, like the UV buffer of a GeometryStore. The best time of the repeats is kept.
+"""
+import argparse
+import time
+import numpy as np
+from PIL import Image
+from py3dtilers.Texture import Texture
+
+
+def legacy_bounds(uvs):
+    minX = 2
+    maxX = -1
+    minY = 2
+    maxY = -1
+    for uv_triangle in uvs:
+        for uv in uv_triangle:
+            if uv[0] < minX:
+                minX = uv[0]
+            if uv[0] > maxX:
+                maxX = uv[0]
+            if uv[1] < minY:
+                minY = uv[1]
+            if uv[1] > maxY:
+                maxY = uv[1]
+    return [minX, minY, maxX, maxY]
+
+
+def legacy_crop(image, uvs):
+    rect = legacy_bounds(uvs)
+    cropped_image = image.crop((rect[0] * image.size[0], rect[1] * image.size[1], rect[2] * image.size[0], rect[3] * image.size[1]))
+    legacy_update_uvs(uvs, rect)
+    return cropped_image
+
+
+def legacy_update_uvs(uvs, rect):
+    offsetX = rect[0]
+    offsetY = rect[1]
+    ratioX = 1 / (rect[2] - rect[0]) if rect[2] != rect[0] else 1
+    ratioY = 1 / (rect[3] - rect[1]) if rect[3] != rect[1] else 1
+    for i in range(0, len(uvs)):
+        for y in range(0, 3):
+            new_u = (uvs[i][y][0] - offsetX) * ratioX
+            new_v = (uvs[i][y][1] - offsetY) * ratioY
+            uvs[i][y] = np.array([new_u, new_v])
+
+
+def legacy_update_uv(uvs, position, oldTexture, newTexture):
+    ratioWidth = oldTexture.size[0] / newTexture.size[0]
+    ratioHeight = oldTexture.size[1] / newTexture.size[1]
+    offsetWidth = position[0] / newTexture.size[0]
+    offsetHeight = position[1] / newTexture.size[1]
+    for i in range(0, len(uvs)):
+        for y in range(0, 3):
+            new_u = (uvs[i][y][0] * ratioWidth) + offsetWidth
+            new_v = (uvs[i][y][1] * ratioHeight) + offsetHeight
+            uvs[i][y] = np.array([new_u, new_v])
+
+
+def update_uv(uvs, position, oldTexture, newTexture):
+    # The UV transform of Atlas.createImage
+    ratio = [oldTexture.width / newTexture.width, oldTexture.height / newTexture.height]
+    offset = [position[0] / newTexture.width, position[1] / newTexture.height]
+    Texture.transform_uvs(uvs, ratio, offset)
+
+
+def best_time(function, uvs, repeat):
+    times = list()
+    for _ in range(repeat):
+        copy = uvs.copy()
+        start = time.perf_counter()
+        function(copy)
+        times.append(time.perf_counter() - start)
+    return min(times), copy
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks of the UV operations')
+    parser.add_argument('--triangles', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    uvs = rng.uniform(0.2, 0.7, (args.triangles, 3, 2))
+    texture = Texture.__new__(Texture)
+    image = Image.new('RGB', (1024, 512))
+    atlas_image = Image.new('RGB', (4096, 4096))
+    position = (1000, 2000)
+    rect = [0.2, 0.2, 0.7, 0.7]
+
+    benchmarks = [("crop (cropImage)", lambda uvs: legacy_crop(image, uvs), lambda uvs: texture.cropImage(image, uvs)),
+                  ("cropped UVs (updateUvs)", lambda uvs: legacy_update_uvs(uvs, rect), lambda uvs: texture.updateUvs(uvs, rect)),
+                  ("atlas UVs (createImage)", lambda uvs: legacy_update_uv(uvs, position, image, atlas_image), lambda uvs: update_uv(uvs, position, image, atlas_image))]
+
+    print(args.triangles, "triangles")
+    print("{:<26}{:>12}{:>16}{:>10}".format("", "legacy (s)", "vectorized (s)", "speedup"))
+    for name, legacy, vectorized in benchmarks:
+        legacy_time, legacy_uvs = best_time(legacy, uvs, args.repeat)
+        vectorized_time, vectorized_uvs = best_time(vectorized, uvs, args.repeat)
+        print("{:<26}{:>12.3f}{:>16.4f}{:>9.1f}x".format(name, legacy_time, vectorized_time, legacy_time / vectorized_time))
+        assert np.allclose(legacy_uvs, vectorized_uvs)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,43 @@
+from .run_report import RunReport
+from .transformer_cache import TransformerCache
+from .background_writer import BackgroundWriter
+from .geometry_store import TriangleArray, GeometryStore
+from .transform_pipeline import TransformPipeline
+from .mesh_quantization import MeshQuantizer
+from .mesh_simplification import MeshSimplifier
+from .local_frame import LocalFrame
 from .kd_tree import kd_tree
+from .polygon_index import PolygonIndex
+from .space_filling_curve import SpaceFillingCurve
+from .footprint_extrusion import FootprintExtruder
 from .feature import Feature, FeatureList
 from .tree_with_children_and_parent import TreeWithChildrenAndParent
 from .group import Groups
 from .polygon_extrusion import ExtrudedPolygon
-from .lod_feature_list import LoaFeatureList, Lod1FeatureList
+from .lod_feature_list import LoaFeatureList, Lod1FeatureList, SimplifiedFeatureList
 from .geometry_node import GeometryNode
 from .geometry_tree import GeometryTree
 from .lod1_node import Lod1Node
 from .loa_node import LoaNode
-from .lod_tree import LodTree
+from .simplified_node import SimplifiedNode
+from .lod_tree import LodTree, StreamingLodTree
 from .obj_writer import ObjWriter
 from .tileset_creation import FromGeometryTreeToTileset
 from .tiler import Tiler
 
-__all__ = ['kd_tree',
+__all__ = ['RunReport',
+           'TransformerCache',
+           'BackgroundWriter',
+           'TriangleArray',
+           'GeometryStore',
+           'TransformPipeline',
+           'MeshQuantizer',
+           'MeshSimplifier',
+           'LocalFrame',
+           'kd_tree',
+           'PolygonIndex',
+           'SpaceFillingCurve',
+           'FootprintExtruder',
            'Feature',
            'FeatureList',
            'TreeWithChildrenAndParent',
@@ -21,11 +45,14 @@ __all__ = ['kd_tree',
            'ExtrudedPolygon',
            'Lod1FeatureList',
            'LoaFeatureList',
+           'SimplifiedFeatureList',
            'GeometryNode',
            'GeometryTree',
            'Lod1Node',
            'LoaNode',
+           'SimplifiedNode',
            'LodTree',
+           'StreamingLodTree',
            'ObjWriter',
            'Tiler',
            'FromGeometryTreeToTileset']
@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from concurrent.futures import ThreadPoolExecutor
+from .run_report import RunReport
+
+
+class BackgroundWriter():
+    """
+    Write files in a thread pool, so the encoding of the next tiles overlaps with the file I/O.
+    The number of pending writes is bounded: when the queue is full, submit() waits until a write is done.
+    The queue depth and the write latencies are added to the run report ("writer" section).
+    """
+
+    def __init__(self, threads=2, queue_size=32):
+        """
+        :param threads: the number of threads writing the files
+        :param queue_size: the maximum number of pending writes
+        """
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='py3dtilers-writer')
+        self.slots = BoundedSemaphore(queue_size)
+        self.lock = Lock()
+        self.depth = 0
+        self.errors = list()
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Call a function writing a file in a thread of the pool.
+        :param function: the function writing the file
+        :param args: the arguments of the function
+        :param kwargs: the keyword arguments of the function
+        """
+        start = time.perf_counter()
+        self.slots.acquire()
+        wait = time.perf_counter() - start
+        # The writing threads update the same section of the report, under the same lock
+        with self.lock:
+            RunReport.increment('writer', 'queue_wait', wait)
+            self.depth += 1
+            section = RunReport.get_section('writer')
+            section['max_queue_depth'] = max(section.get('max_queue_depth', 0), self.depth)
+        self.executor.submit(self.__write, function, *args, **kwargs)
+
+    def write_bytes(self, path, data):
+        """
+        Write bytes in a file. The parent directories are created if needed.
+        :param path: the path of the file
+        :param data: the bytes to write
+        """
+        self.submit(BackgroundWriter.__write_bytes, path, data)
+
+    def flush(self):
+        """
+        Wait until all the pending files are written, then stop the threads.
+        The first error raised while writing a file is raised again here.
+        """
+        self.executor.shutdown(wait=True)
+        if len(self.errors) > 0:
+            raise self.errors[0]
+
+    def __write(self, function, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            function(*args, **kwargs)
+        except Exception as e:
+            with self.lock:
+                self.errors.append(e)
+        finally:
+            latency = time.perf_counter() - start
+            with self.lock:
+                self.depth -= 1
+                section = RunReport.get_section('writer')
+                section['writes'] = section.get('writes', 0) + 1
+                section['write_time'] = section.get('write_time', 0) + latency
+                section['max_write_latency'] = max(section.get('max_write_latency', 0), latency)
+            self.slots.release()
+
+    @staticmethod
+    def __write_bytes(path, data):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
@@ -1,8 +1,9 @@
 import numpy as np
-from py3dtiles.tilers.b3dm.wkb_utils import TriangleSoup
 from py3dtiles.tileset import BoundingVolumeBox
 from typing import List
 from ..Color import ColorConfig
+from .geometry_store import TriangleArray, GeometryStore
+from .transform_pipeline import TransformPipeline
 
 
 class Feature(object):
@@ -16,7 +17,7 @@ class Feature(object):
         :param id: given identifier
         """
 
-        self.geom = TriangleSoup()
+        self.geom = TriangleArray()
 
         # Optional application specific data to be added to the batch table for this object
         self.batchtable_data = {}
@@ -35,6 +36,21 @@ class Feature(object):
 
         self.set_id(id)
 
+    @property
+    def geom(self):
+        """
+        The geometry of this feature, as a TriangleArray.
+        """
+        return self._geom
+
+    @geom.setter
+    def geom(self, geom):
+        """
+        Set the geometry of this feature. A TriangleSoup is converted into a TriangleArray.
+        :param geom: a TriangleSoup
+        """
+        self._geom = TriangleArray.from_triangle_soup(geom)
+
     def set_id(self, id):
         """
         Set the id of this feature.
@@ -87,16 +103,43 @@ class Feature(object):
     def get_geom_as_triangles(self):
         """
         Return the triangles of this feature.
-        :return: a list of triangles
+        :return: a (n, 3, 3) array, which can be used as a list of triangles
+        """
+        return self.geom.get_layer(0)
+
+    def get_vertex_array(self):
         """
-        return self.geom.triangles[0]
+        Return the vertices of the triangles of this feature.
+        :return: a (3n, 3) array
+        """
+        return self.geom.get_vertex_array()
+
+    def get_number_of_triangles(self):
+        """
+        Return the number of triangles of this feature.
+        :return: int
+        """
+        return self.geom.get_number_of_triangles()
+
+    def get_encoded_size(self):
+        """
+        Estimate the size of the geometry of this feature once encoded in a tile:
+        each vertex has a position, a normal and a batch ID, plus UVs and a color when the feature has them.
+        :return: a number of bytes
+        """
+        vertex_size = 12 + 12 + 4
+        if self.has_texture():
+            vertex_size += 8
+        if self.has_vertex_colors:
+            vertex_size += 12
+        return 3 * self.get_number_of_triangles() * vertex_size
 
     def set_triangles(self, triangles):
         """
         Set the triangles of this feature.
-        :param triangles: a list of triangles.
+        :param triangles: a list of triangles or a (n, 3, 3) array.
         """
-        self.geom.triangles[0] = triangles
+        self.geom.set_layer(0, triangles)
 
     def set_box(self):
         """
@@ -154,6 +197,11 @@ class FeatureList(object):
 
     def __init__(self, features: List[Feature] = None):
         self.features = list()
+        self.geometry_store = None
+        # The texture atlas of the features, shared by the tiles created from this list (texture LODs)
+        self.atlas = None
+        # The texture images of the features, loaded once when they are sent to the processes of the pool
+        self.textures = None
         if FeatureList.default_mat is None:
             FeatureList.default_mat = self.get_color_config().get_default_color()
         self.materials = [FeatureList.default_mat]
@@ -176,11 +224,20 @@ class FeatureList(object):
         new_features.features.extend(other.features)
         return new_features
 
+    def __getstate__(self):
+        # The geometry store and the atlas are caches, they are rebuilt when needed
+        state = self.__dict__.copy()
+        state['geometry_store'] = None
+        state['atlas'] = None
+        return state
+
     def append(self, feature: Feature):
         self.features.append(feature)
+        self.geometry_store = None
 
     def extend(self, others: 'FeatureList'):
         self.features.extend(others)
+        self.geometry_store = None
 
     def get_features(self):
         """
@@ -201,10 +258,23 @@ class FeatureList(object):
         :param features: a list of Feature
         """
         self.features = features
+        self.geometry_store = None
+
+    def get_geometry_store(self):
+        """
+        Return the GeometryStore holding the geometry of all the features (recursively) in contiguous arrays.
+        The store is created (or re-created if the features have changed) when needed.
+        :return: a GeometryStore
+        """
+        features = self.get_features()
+        if self.geometry_store is None or not self.geometry_store.is_valid(features):
+            self.geometry_store = GeometryStore(features)
+        return self.geometry_store
 
     def delete_features_ref(self):
         """Delete the reference to the features contained by this instance, so the features are destroyed when unused."""
         del self.features
+        self.geometry_store = None
 
     def __len__(self):
         return len(self.features)
@@ -279,53 +349,67 @@ class FeatureList(object):
         self.add_material(material)
         return len(self.materials) - 1
 
+    def set_boxes(self):
+        """
+        Set the BoundingVolumeBox and the centroid of all the features (recursively) from their triangles.
+        The boxes are computed in one pass over the geometry store.
+        """
+        store = self.get_geometry_store()
+        mins, maxs = store.get_bounding_boxes()
+        centers = (mins + maxs) / 2
+        half_sizes = (maxs - mins) / 2
+        boxes = np.zeros((len(store), 12))
+        boxes[:, 0:3] = centers
+        boxes[:, 3] = half_sizes[:, 0]
+        boxes[:, 7] = half_sizes[:, 1]
+        boxes[:, 11] = half_sizes[:, 2]
+        for feature, box, has_geom in zip(store.features, boxes, store.get_sizes() > 0):
+            if has_geom:
+                feature.box = BoundingVolumeBox()
+                feature.box.set_from_list(box)
+                feature.centroid = np.array(feature.box.get_center())
+
     def translate_features(self, offset):
         """
         Translate the features by adding an offset
         :param offset: the Vec3 translation offset
         """
-        # Translate the position of each object by an offset
-        for feature in self.get_features():
-            new_geom = []
-            for triangle in feature.get_geom_as_triangles():
-                new_position = []
-                for points in triangle:
-                    new_position.append(np.array(points + offset))
-                new_geom.append(new_position)
-            feature.set_triangles(new_geom)
-            feature.set_box()
+        store = self.get_geometry_store()
+        store.vertices += np.asarray(offset, dtype=np.float64)
+        self.set_boxes()
 
-    def change_crs(self, transformer, offset=np.array([0, 0, 0])):
+    def change_crs(self, transformer, offset=np.array([0, 0, 0]), threads=1):
         """
         Project the features into another CRS
+        The vertices are reprojected with array calls to the transformer, by chunks.
         :param transformer: the transformer used to change the crs
+        :param offset: an offset added to the vertices before the reprojection
+        :param int threads: the number of threads used to reproject the chunks of vertices
         """
-        for feature in self.get_features():
-            new_geom = []
-            for triangle in feature.get_geom_as_triangles():
-                new_position = []
-                for point in triangle:
-                    new_point = transformer.transform((point + offset)[0], (point + offset)[1], (point + offset)[2])
-                    new_position.append(np.array(new_point))
-                new_geom.append(new_position)
-            feature.set_triangles(new_geom)
-            feature.set_box()
+        pipeline = TransformPipeline(threads)
+        pipeline.add_translation(offset)
+        pipeline.set_reprojection(transformer)
+        self.transform_features(pipeline)
+
+    def transform_features(self, pipeline: 'TransformPipeline'):
+        """
+        Apply a TransformPipeline on the features, in a single pass over their vertices.
+        :param pipeline: a TransformPipeline
+        """
+        if pipeline.is_empty():
+            return
+        store = self.get_geometry_store()
+        pipeline.apply(store.vertices)
+        self.set_boxes()
 
     def height_mult_features(self, height_mult):
         """
         Converts height to different units by specifing the multiplier
         :param height_mult: the factor to scale height values
         """
-        for feature in self.get_features():
-            new_geom = []
-            for triangle in feature.get_geom_as_triangles():
-                scaled_triangle = []
-                for vertex in triangle:
-                    scaled_vertex = np.array([vertex[0], vertex[1], vertex[2] * height_mult])
-                    scaled_triangle.append(scaled_vertex)
-                new_geom.append(scaled_triangle)
-            feature.set_triangles(new_geom)
-            feature.set_box()
+        store = self.get_geometry_store()
+        store.vertices[:, 2] *= height_mult
+        self.set_boxes()
 
     def scale_features(self, scale_factor, centroid):
         """
@@ -333,13 +417,12 @@ class FeatureList(object):
         :param scale_factor: the factor to scale the objects
         :param centroid: the centroid used as reference point
         """
-        for feature in self.get_features():
-            new_geom = []
-            for triangle in feature.get_geom_as_triangles():
-                scaled_triangle = [((vertex - centroid) * scale_factor) + centroid for vertex in triangle]
-                new_geom.append(scaled_triangle)
-            feature.set_triangles(new_geom)
-            feature.set_box()
+        store = self.get_geometry_store()
+        centroid = np.asarray(centroid, dtype=np.float64)
+        store.vertices -= centroid
+        store.vertices *= scale_factor
+        store.vertices += centroid
+        self.set_boxes()
 
     def get_textures(self):
         """
@@ -351,6 +434,20 @@ class FeatureList(object):
             texture_dict[feature.get_id()] = feature.get_texture()
         return texture_dict
 
+    def get_memory_size(self):
+        """
+        Estimate the memory used by the geometry and the textures of the features.
+        :return: a number of bytes
+        """
+        size = self.get_geometry_store().get_memory_size()
+        if self.textures is not None:
+            textures = self.textures.values()
+        else:
+            textures = [feature.get_texture() for feature in self.get_features() if feature.has_texture()]
+        for texture in textures:
+            size += texture.width * texture.height * len(texture.getbands())
+        return size
+
     def set_features_geom(self, user_arguments=None):
         """
         Set the geometry of the features.
@@ -368,7 +465,7 @@ class FeatureList(object):
         The filter function must take an ID as input.
         :param filter_function: a function
         """
-        self.features = list(filter(lambda f: filter_function(f.get_id()), self.features))
+        self.set_features(list(filter(lambda f: filter_function(f.get_id()), self.features)))
 
     @classmethod
     def set_color_config(cls, config_path):
@@ -0,0 +1,174 @@
+import numpy as np
+import shapely
+from concurrent.futures import ProcessPoolExecutor
+from shapely.geometry import Polygon
+
+
+class FootprintExtruder():
+    """
+    Extrude the footprints of many features in one pass, from the vertex array and the offsets of a GeometryStore.
+    The footprint of each feature is the convex hull of its vertices (projected on the XY plane),
+    extruded from the lowest Z of the feature to the average of the highest Z of its triangles.
+    The hulls, the upper faces (fans, since the hulls are convex) and the walls of all the features are created with array operations.
+    """
+
+    # The number of features extruded by each process
+    CHUNK_SIZE = 20000
+
+    def __init__(self, processes=1):
+        """
+        :param int processes: the number of processes extruding the chunks of features.
+        When lower than 2, or when there is a single chunk, the features are extruded by the current process.
+        """
+        self.processes = processes if processes is not None and processes > 0 else 1
+
+    def extrude(self, vertices, offsets):
+        """
+        Extrude the footprint of each feature.
+        :param vertices: the (N, 3) vertices of the triangles of the features
+        :param offsets: the (n + 1,) offsets of the vertices of each feature, the vertices of the feature i being vertices[offsets[i]:offsets[i + 1]]
+        :return: the (m, 3, 3) triangles of the extrusions, and the (m,) index of the feature of each triangle (its batch ID).
+        The triangles of a feature are contiguous, the features without vertices have no triangle.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        starts = np.arange(0, len(offsets) - 1, FootprintExtruder.CHUNK_SIZE)
+        chunks = [(vertices[offsets[start]:offsets[min(start + FootprintExtruder.CHUNK_SIZE, len(offsets) - 1)]],
+                   offsets[start:start + FootprintExtruder.CHUNK_SIZE + 1] - offsets[start]) for start in starts]
+        if self.processes > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.processes, len(chunks))) as executor:
+                results = list(executor.map(FootprintExtruder.extrude_chunk, *zip(*chunks)))
+        else:
+            results = [FootprintExtruder.extrude_chunk(*chunk) for chunk in chunks]
+
+        if len(results) == 0:
+            return np.zeros((0, 3, 3)), np.zeros(0, dtype=np.int64)
+        triangles = np.concatenate([result[0] for result in results])
+        batch_ids = np.concatenate([result[1] + start for result, start in zip(results, starts)])
+        return triangles, batch_ids
+
+    @staticmethod
+    def extrude_chunk(vertices, offsets):
+        """
+        Extrude the footprint of each feature of a chunk. Called by the processes of the pool.
+        :param vertices: the (N, 3) vertices of the triangles of the features
+        :param offsets: the (n + 1,) offsets of the vertices of each feature
+        :return: the (m, 3, 3) triangles of the extrusions, and the (m,) index of the feature of each triangle
+        """
+        sizes = np.diff(offsets)
+        features = np.flatnonzero(sizes > 0)
+        if len(features) == 0:
+            return np.zeros((0, 3, 3)), np.zeros(0, dtype=np.int64)
+        starts = offsets[:-1][features]
+
+        # The heights of each feature
+        min_heights = np.minimum.reduceat(vertices[:, 2], starts)
+        triangle_max_heights = np.max(vertices[:, 2].reshape((-1, 3)), axis=1)
+        max_heights = np.add.reduceat(triangle_max_heights, starts // 3) / (sizes[features] // 3)
+
+        # The footprint of each feature, the features without vertices being removed from the indices
+        indices = np.repeat(np.arange(len(features)), sizes[features])
+        points, rings = FootprintExtruder.get_convex_hulls(vertices[:, 0:2], indices, len(features))
+        ring_sizes = np.bincount(rings, minlength=len(features))
+        ring_starts = np.concatenate([[0], np.cumsum(ring_sizes)[:-1]])
+        local_indices = np.arange(len(points)) - ring_starts[rings]
+        following = np.where(local_indices == ring_sizes[rings] - 1, ring_starts[rings], np.arange(len(points)) + 1)
+
+        nb_points = len(points)
+        extruded_vertices = np.empty((2 * nb_points, 3))
+        extruded_vertices[:, 0:2] = np.tile(points, (2, 1))
+        extruded_vertices[0:nb_points, 2] = min_heights[rings]
+        extruded_vertices[nb_points:, 2] = max_heights[rings]
+
+        # The upper faces are fans, reversed when the ring is clockwise so they look up
+        signed_areas = np.bincount(rings, points[:, 0] * points[following, 1] - points[following, 0] * points[:, 1], minlength=len(features))
+        fan = (local_indices >= 1) & (local_indices <= ring_sizes[rings] - 2)
+        fan_points = np.flatnonzero(fan)
+        fan_rings = rings[fan]
+        clockwise = signed_areas[fan_rings] < 0
+        upper_faces = np.stack([ring_starts[fan_rings],
+                                np.where(clockwise, fan_points + 1, fan_points),
+                                np.where(clockwise, fan_points, fan_points + 1)], axis=1) + nb_points
+
+        # The walls are made of two triangles per edge of the footprint
+        current = np.arange(nb_points)
+        side_faces = np.stack([current, current + nb_points, following + nb_points,
+                               current, following + nb_points, following], axis=1).reshape((-1, 3))
+
+        # Keep the triangles of each feature together, the upper face first
+        faces = np.concatenate([upper_faces, side_faces])
+        face_rings = np.concatenate([fan_rings, np.repeat(rings, 2)])
+        order = np.argsort(face_rings, kind='stable')
+        return extruded_vertices[faces[order]], features[face_rings[order]]
+
+    @staticmethod
+    def get_convex_hulls(points, indices, nb_hulls):
+        """
+        Compute the convex hull of each group of points (monotone chain). The points of each group are sorted by X and Y,
+        then the points which don't make a convex turn with their neighbours are removed from the lower and the upper chains,
+        in passes over all the groups, until the chains are convex.
+        The hulls without area (aligned points) are replaced by the footprints of get_degenerated_footprint.
+        :param points: a (n, 2) array
+        :param indices: the (n,) index of the group of each point, from 0 to nb_hulls - 1
+        :param nb_hulls: the number of groups, each group having at least one point
+        :return: the (m, 2) points of the hulls (clockwise, without closing point), and the (m,) index of the hull of each point
+        """
+        order = np.lexsort((points[:, 1], points[:, 0], indices))
+        points = points[order]
+        indices = indices[order]
+        unique = np.ones(len(points), dtype=bool)
+        unique[1:] = (indices[1:] != indices[:-1]) | np.any(points[1:] != points[:-1], axis=1)
+        points = points[unique]
+        indices = indices[unique]
+
+        def get_chain(sign):
+            chain = np.arange(len(points))
+            while len(chain) > 2:
+                a, b, c = chain[:-2], chain[1:-1], chain[2:]
+                cross = (points[b, 0] - points[a, 0]) * (points[c, 1] - points[a, 1]) - (points[b, 1] - points[a, 1]) * (points[c, 0] - points[a, 0])
+                # A point above (below for the upper chain) the segment between its neighbours isn't on the chain
+                removed = (indices[a] == indices[b]) & (indices[b] == indices[c]) & (sign * cross <= 0)
+                if not np.any(removed):
+                    break
+                kept = np.ones(len(chain), dtype=bool)
+                kept[1:-1] = ~removed
+                chain = chain[kept]
+            return chain
+
+        # Clockwise: the upper chain from left to right, then the lower chain from right to left without its ends
+        lower = get_chain(1)
+        upper = get_chain(-1)
+        lower_ends = np.zeros(len(lower), dtype=bool)
+        lower_ends[0] = lower_ends[-1] = True
+        lower_ends[1:] |= indices[lower[1:]] != indices[lower[:-1]]
+        lower_ends[:-1] |= indices[lower[:-1]] != indices[lower[1:]]
+        lower = lower[~lower_ends][::-1]
+        hull = np.concatenate([upper, lower])
+        hull = hull[np.argsort(indices[hull], kind='stable')]
+        hull_points = points[hull]
+        hull_indices = indices[hull]
+
+        degenerated = np.flatnonzero(np.bincount(hull_indices, minlength=nb_hulls) < 3)
+        if len(degenerated) == 0:
+            return hull_points, hull_indices
+        kept = ~np.isin(hull_indices, degenerated)
+        footprints = [FootprintExtruder.get_degenerated_footprint(shapely.convex_hull(shapely.multipoints(points[indices == index]))) for index in degenerated]
+        footprint_points, footprint_indices = shapely.get_coordinates(shapely.get_exterior_ring(footprints), return_index=True)
+        # Remove the closing point of each ring
+        closing = np.ones(len(footprint_points), dtype=bool)
+        closing[:-1] = footprint_indices[1:] != footprint_indices[:-1]
+        hull_points = np.concatenate([hull_points[kept], footprint_points[~closing]])
+        hull_indices = np.concatenate([hull_indices[kept], degenerated[footprint_indices[~closing]]])
+        order = np.argsort(hull_indices, kind='stable')
+        return hull_points[order], hull_indices[order]
+
+    @staticmethod
+    def get_degenerated_footprint(hull):
+        """
+        Create a footprint from a degenerated hull (aligned vertices): a thin polygon along the line, or a small square around the point.
+        :param hull: a Shapely LineString or Point
+        :return: a Shapely Polygon
+        """
+        if isinstance(hull, shapely.LineString):
+            offset = hull.offset_curve(-0.1)
+            return Polygon([*list(hull.coords), *list(offset.coords)[::-1]])
+        return hull.buffer(0.1, quad_segs=1)
@@ -1,3 +1,4 @@
+import numpy as np
 from typing import TYPE_CHECKING, List
 
 if TYPE_CHECKING:
@@ -60,11 +61,14 @@ class GeometryNode():
     def get_features(self):
         """
         Return the features in this node and the features in the child nodes (recursively).
-        :return: a list of Feature
+        A FeatureList shared by several nodes (texture LODs) is only returned once.
+        :return: a list of FeatureList
         """
         features = [self.feature_list]
         for child in self.child_nodes:
-            features.extend(child.get_features())
+            for feature_list in child.get_features():
+                if not any(feature_list is other for other in features):
+                    features.append(feature_list)
         return features
 
     def set_node_features_geometry(self, user_arguments=None):
@@ -73,6 +77,63 @@ class GeometryNode():
         """
         for features in reversed(self.get_features()):
             features.set_features_geom(user_arguments)
+        self.update_geometric_error()
+
+    def update_geometric_error(self):
+        """
+        Update the geometric error of this node and of its child nodes (recursively) once the geometry of their features is set.
+        The error of a GeometryNode is fixed when it is created, it only changes in the subclasses measuring it from their features.
+        """
+        for child in self.child_nodes:
+            child.update_geometric_error()
+
+    def compute_geometric_error(self):
+        """
+        Compute the geometric error of this node and of its child nodes (recursively) from the geometry of their features,
+        instead of using fixed values. A leaf has no error, since its features are never refined.
+        The error of another node is the error of its content against the features of its child nodes,
+        and at least the geometric error of its child nodes, so the errors never increase from a node to its children.
+        The features must be placed in their final CRS, since the errors are distances.
+        """
+        for child in self.child_nodes:
+            child.compute_geometric_error()
+        if len(self.child_nodes) < 1:
+            self.geometric_error = 0.
+        else:
+            children_error = max([child.geometric_error for child in self.child_nodes])
+            self.geometric_error = max(children_error, self.get_content_error(children_error))
+
+    def get_content_error(self, children_error=0.):
+        """
+        Estimate the error of the features of this node against the features of its child nodes.
+        When the node shares its features with a child (texture LOD), the error is the size of a texel of the downsized texture.
+        Otherwise the content of the node isn't related to its children, the error is the diagonal of its bounding box.
+        :param children_error: the highest geometric error of the child nodes
+        :return: a distance
+        """
+        if self.has_texture() and any(getattr(child, 'feature_list', None) is self.feature_list for child in self.child_nodes):
+            return self.downsample_factor * self.get_texel_size()
+        mins, maxs = self.feature_list.get_geometry_store().get_bounding_boxes()
+        if len(mins) == 0:
+            return 0.
+        return float(np.linalg.norm(np.nanmax(maxs, axis=0) - np.nanmin(mins, axis=0)))
+
+    def get_texel_size(self):
+        """
+        Estimate the size of a texel of the textures of the features, on the surface of the features:
+        the square root of the textured area divided by the number of texels.
+        :return: a distance
+        """
+        area = 0.
+        nb_texels = 0
+        for feature in self.feature_list:
+            texture = feature.get_texture()
+            if texture is None:
+                continue
+            triangles = feature.get_geom_as_triangles()
+            area += np.sum(np.linalg.norm(np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]), axis=1)) / 2
+            nb_texels += texture.width * texture.height
+        return float(np.sqrt(area / nb_texels)) if nb_texels > 0 else 0.
 
     def get_leaves(self):
         """
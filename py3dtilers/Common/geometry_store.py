@@ -0,0 +1,358 @@
+import numpy as np
+from py3dtiles.tilers.b3dm.wkb_utils import TriangleSoup
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from ..Common import Feature
+
+
+class TriangleArray(TriangleSoup):
+    """
+    A TriangleSoup where each layer of triangles (positions, UVs, colors...)
+    is stored as a single float64 NumPy array of shape (n, 3, k) instead of
+    a list of triangles made of one np.array per vertex.
+    Layers can still be appended as lists of triangles (as the tilers do),
+    they are converted into arrays the first time they are accessed.
+    """
+
+    def __init__(self, triangles=None):
+        super().__init__()
+        if triangles is not None:
+            self.triangles = list(triangles)
+
+    @classmethod
+    def from_triangle_soup(cls, triangle_soup: TriangleSoup):
+        """
+        Create a TriangleArray holding the layers of a TriangleSoup.
+        :param triangle_soup: a TriangleSoup
+        :return: a TriangleArray
+        """
+        if triangle_soup is None or isinstance(triangle_soup, TriangleArray):
+            return triangle_soup
+        return cls(triangle_soup.triangles)
+
+    @staticmethod
+    def to_array(triangles):
+        """
+        Convert a list of triangles into a (n, 3, k) float64 array.
+        :param triangles: a list of triangles or an array
+        :return: a (n, 3, k) array
+        """
+        if isinstance(triangles, np.ndarray) and triangles.dtype == np.float64 and triangles.ndim == 3:
+            return triangles
+        array = np.asarray(triangles, dtype=np.float64)
+        if array.size == 0:
+            return np.zeros((0, 3, 3), dtype=np.float64)
+        return array.reshape((len(array), 3, -1))
+
+    def get_layer(self, index):
+        """
+        Return a layer of triangles as a (n, 3, k) array.
+        :param index: the index of the layer (0 for positions)
+        :return: a (n, 3, k) array
+        """
+        layer = self.triangles[index]
+        if not isinstance(layer, np.ndarray) or layer.dtype != np.float64 or layer.ndim != 3:
+            layer = TriangleArray.to_array(layer)
+            self.triangles[index] = layer
+        return layer
+
+    def set_layer(self, index, triangles):
+        """
+        Set (or add) a layer of triangles.
+        :param index: the index of the layer (0 for positions)
+        :param triangles: a list of triangles or a (n, 3, k) array
+        """
+        if index == len(self.triangles):
+            self.triangles.append(TriangleArray.to_array(triangles))
+        else:
+            self.triangles[index] = TriangleArray.to_array(triangles)
+
+    def compact(self):
+        """Convert all the layers into arrays."""
+        for index in range(0, len(self.triangles)):
+            self.get_layer(index)
+
+    def get_vertex_array(self):
+        """
+        Return the positions as a (3n, 3) array (a view of the positions layer).
+        :return: a (3n, 3) array
+        """
+        return self.get_layer(0).reshape((-1, 3))
+
+    def get_number_of_triangles(self):
+        """
+        Return the number of triangles.
+        :return: int
+        """
+        if len(self.triangles) == 0:
+            return 0
+        return len(self.triangles[0])
+
+    @property
+    def vertices(self):
+        return np.unique(self.get_vertex_array(), axis=0)
+
+    def get_position_array(self):
+        return self.get_vertex_array().tobytes()
+
+    def get_data_array(self, index):
+        return self.get_data(index).tobytes()
+
+    def get_data(self, index):
+        layer = self.get_layer(1 + index)
+        return layer.reshape((-1, layer.shape[2]))
+
+    def compute_normals(self):
+        """Compute the vertex normals (one normal per triangle, repeated on its 3 vertices)."""
+        return TriangleArray.compute_triangle_normals(self.get_layer(0)).repeat(3, axis=0)
+
+    def get_bbox(self):
+        """
+        Returns the bbox in this format: [[minX, minY, minZ],[maxX, maxY, maxZ]]
+        """
+        vertices = self.get_vertex_array()
+        return [np.min(vertices, 0), np.max(vertices, 0)]
+
+    @staticmethod
+    def compute_triangle_normals(triangles):
+        """
+        Compute the normal of each triangle.
+        Degenerated triangles get the [0, 0, 1] normal.
+        :param triangles: a (n, 3, 3) array
+        :return: a (n, 3) array
+        """
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        norms = np.sqrt(np.matmul(normals[:, np.newaxis, :], normals[:, :, np.newaxis]).reshape(-1))
+        degenerated = norms == 0
+        normals[degenerated] = [0, 0, 1]
+        norms[degenerated] = 1
+        return normals / norms[:, np.newaxis]
+
+    @staticmethod
+    def weld_vertices(attributes):
+        """
+        Find the identical vertices of a triangle soup. Two vertices are identical when all their attributes
+        have the same bytes, once the signed zeros are normalized (-0.0 and 0.0 are the same value).
+        The vertices are sorted by their bytes (np.unique) to find the duplicates.
+        The unique vertices keep the order of their first occurrence.
+        :param attributes: a list of arrays with one row per vertex (positions, normals, uvs, batch ids...).
+        None values are ignored.
+        :return: the indices of the unique vertices in the soup, and the (n,) index of the unique vertex of each vertex of the soup
+        """
+        columns = list()
+        for attribute in attributes:
+            if attribute is None:
+                continue
+            attribute = np.asarray(attribute)
+            if np.issubdtype(attribute.dtype, np.floating):
+                # Adding 0.0 turns -0.0 into 0.0 and keeps the other values
+                attribute = attribute + attribute.dtype.type(0)
+            columns.append(np.ascontiguousarray(attribute).reshape(len(attribute), -1).view(np.uint8))
+        keys = np.ascontiguousarray(np.hstack(columns))
+        keys = keys.view(np.dtype((np.void, keys.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        # np.unique sorts the vertices, restore the order of their first occurrence
+        order = np.argsort(first)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return first[order], rank[inverse.reshape(-1)]
+
+    @staticmethod
+    def get_distances_to_triangles(points, triangles, max_pairs=1 << 18):
+        """
+        Compute the distance from each point to the closest triangle (Ericson, "Real-Time Collision Detection", 5.1.5).
+        The points are processed by chunks, so at most max_pairs (point, triangle) pairs are evaluated at once.
+        Degenerated triangles are ignored.
+        :param points: a (n, 3) array
+        :param triangles: a (m, 3, 3) array
+        :param max_pairs: the maximum number of pairs evaluated at once
+        :return: a (n,) array, filled with inf when there is no triangle
+        """
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        triangles = TriangleArray.to_array(triangles)
+        distances = np.full(len(points), np.inf)
+        if len(triangles) == 0:
+            return distances
+        chunk_size = max(1, max_pairs // len(triangles))
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size, np.newaxis, :]
+            closest = TriangleArray.__get_closest_points(chunk, triangles[:, 0], triangles[:, 1], triangles[:, 2])
+            chunk_distances = np.nan_to_num(np.linalg.norm(chunk - closest, axis=2), nan=np.inf)
+            distances[start:start + chunk_size] = np.min(chunk_distances, axis=1)
+        return distances
+
+    @staticmethod
+    def __get_closest_points(p, a, b, c):
+        """
+        Find the closest point of each triangle to each point, from the Voronoi region of the triangle containing the point.
+        :param p: a (n, 1, 3) array of points
+        :param a: the (m, 3) first vertices of the triangles
+        :param b: the (m, 3) second vertices of the triangles
+        :param c: the (m, 3) third vertices of the triangles
+        :return: a (n, m, 3) array
+        """
+        def dot(u, v):
+            return np.sum(u * v, axis=-1)
+
+        ab = b - a
+        ac = c - a
+        ap = p - a
+        bp = p - b
+        cp = p - c
+        d1, d2 = dot(ab, ap), dot(ac, ap)
+        d3, d4 = dot(ab, bp), dot(ac, bp)
+        d5, d6 = dot(ab, cp), dot(ac, cp)
+        va = d3 * d6 - d5 * d4
+        vb = d5 * d2 - d1 * d6
+        vc = d1 * d4 - d3 * d2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denominator = va + vb + vc
+            closest = a + ab * (vb / denominator)[..., np.newaxis] + ac * (vc / denominator)[..., np.newaxis]
+            # The regions are tested from the lowest priority to the highest, each region overriding the previous ones
+            t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+            closest = np.where(((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0))[..., np.newaxis], b + (c - b) * t[..., np.newaxis], closest)
+            t = d2 / (d2 - d6)
+            closest = np.where(((vb <= 0) & (d2 >= 0) & (d6 <= 0))[..., np.newaxis], a + ac * t[..., np.newaxis], closest)
+            closest = np.where(((d6 >= 0) & (d5 <= d6))[..., np.newaxis], c, closest)
+            t = d1 / (d1 - d3)
+            closest = np.where(((vc <= 0) & (d1 >= 0) & (d3 <= 0))[..., np.newaxis], a + ab * t[..., np.newaxis], closest)
+            closest = np.where(((d3 >= 0) & (d4 <= d3))[..., np.newaxis], b, closest)
+            closest = np.where(((d1 <= 0) & (d2 <= 0))[..., np.newaxis], a, closest)
+        return closest
+
+
+class GeometryStore(object):
+    """
+    The columnar storage of the geometry of a list of features.
+    The positions of all the features are stored in one contiguous float64 (N, 3) array,
+    the vertices of the feature i being vertices[offsets[i]:offsets[i + 1]].
+    The additional layers of the features (UVs, vertex colors) are stored in arrays aligned with the vertices.
+    Once stored, the geometry of each feature is a view of those arrays.
+    """
+
+    def __init__(self, features: List['Feature']):
+        """
+        Pack the geometry of the features into contiguous arrays.
+        :param features: a list of Feature
+        """
+        self.features = list(features)
+        geoms = [feature.geom for feature in features]
+        for geom in geoms:
+            geom.compact()
+
+        sizes = np.array([3 * geom.get_number_of_triangles() for geom in geoms], dtype=np.int64)
+        self.offsets = np.zeros(len(geoms) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+
+        self.vertices = self.__pack_layer(geoms, 0, 3)
+
+        # Additional layers are only stored when every feature has them, with the same width
+        self.data = list()
+        nb_layers = min([len(geom.triangles) for geom in geoms], default=0)
+        for index in range(1, nb_layers):
+            widths = {geom.triangles[index].shape[2] for geom in geoms if len(geom.triangles[index]) > 0}
+            if len(widths) > 1:
+                break
+            self.data.append(self.__pack_layer(geoms, index, widths.pop() if widths else 2))
+
+    def __pack_layer(self, geoms, index, width):
+        """
+        Concatenate a layer of the geometries and replace this layer by a view of the concatenated array.
+        :param geoms: the TriangleArray of the features
+        :param index: the index of the layer
+        :param width: the number of components of each vertex in the layer
+        :return: a (N, width) array
+        """
+        array = np.empty((self.offsets[-1], width), dtype=np.float64)
+        for i, geom in enumerate(geoms):
+            if len(geom.triangles) > index:
+                array[self.offsets[i]:self.offsets[i + 1]] = geom.triangles[index].reshape((-1, width))
+        for i, geom in enumerate(geoms):
+            if len(geom.triangles) > index:
+                geom.triangles[index] = array[self.offsets[i]:self.offsets[i + 1]].reshape((-1, 3, width))
+        return array
+
+    def __len__(self):
+        return len(self.features)
+
+    def is_valid(self, features: List['Feature']):
+        """
+        Check if this store still holds the geometry of the features:
+        the layers of the feature i must be views of the rows offsets[i]:offsets[i + 1] of the stored arrays.
+        :param features: a list of Feature
+        :return: a boolean
+        """
+        if len(features) != len(self.features):
+            return False
+        layers = [self.vertices] + self.data
+        for i, (feature, stored_feature) in enumerate(zip(features, self.features)):
+            if feature is not stored_feature:
+                return False
+            triangles = feature.geom.triangles
+            for index, array in enumerate(layers):
+                if len(triangles) <= index or not isinstance(triangles[index], np.ndarray):
+                    return False
+                layer = triangles[index]
+                expected = array[self.offsets[i]:self.offsets[i + 1]].reshape((-1, 3, array.shape[1]))
+                if layer.shape != expected.shape:
+                    return False
+                if len(layer) > 0 and (layer.base is not array or layer.strides != expected.strides
+                                       or layer.__array_interface__['data'][0] != expected.__array_interface__['data'][0]):
+                    return False
+        return True
+
+    def get_uvs(self):
+        """
+        Return the UVs of the features, following the TriangleSoup convention (first additional layer).
+        :return: a (N, 2) array or None
+        """
+        return self.data[0] if len(self.data) > 0 else None
+
+    def get_colors(self, with_texture=False):
+        """
+        Return the vertex colors of the features, stored after the UVs when the features are textured.
+        :param with_texture: if the first additional layer holds the UVs
+        :return: a (N, k) array or None
+        """
+        index = int(with_texture)
+        return self.data[index] if len(self.data) > index else None
+
+    def get_vertices(self, index):
+        """
+        Return the vertices of a feature.
+        :param index: the index of the feature
+        :return: a (n, 3) array
+        """
+        return self.vertices[self.offsets[index]:self.offsets[index + 1]]
+
+    def get_memory_size(self):
+        """
+        Return the memory used by the stored arrays.
+        :return: a number of bytes
+        """
+        return self.vertices.nbytes + sum([array.nbytes for array in self.data])
+
+    def get_sizes(self):
+        """
+        Return the number of vertices of each feature.
+        :return: an array of int
+        """
+        return np.diff(self.offsets)
+
+    def get_bounding_boxes(self):
+        """
+        Compute the axis aligned bounding box of each feature in one pass.
+        :return: two (n, 3) arrays containing the mins and the maxs of each feature
+        """
+        nb_features = len(self.features)
+        mins = np.full((nb_features, 3), np.nan)
+        maxs = np.full((nb_features, 3), np.nan)
+        not_empty = self.get_sizes() > 0
+        if np.any(not_empty):
+            starts = self.offsets[:-1][not_empty]
+            mins[not_empty] = np.minimum.reduceat(self.vertices, starts, axis=0)
+            maxs[not_empty] = np.maximum.reduceat(self.vertices, starts, axis=0)
+        return mins, maxs
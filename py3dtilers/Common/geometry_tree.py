@@ -15,6 +15,14 @@ class GeometryTree():
     def __init__(self, root_nodes: List['GeometryNode']):
         self.root_nodes = root_nodes
 
+    def pop_root_nodes(self):
+        """
+        Iterate over the root nodes. Each root node is removed from the tree before being returned,
+        so the tree doesn't keep a reference to the nodes once their tiles are created.
+        """
+        while len(self.root_nodes) > 0:
+            yield self.root_nodes.pop(0)
+
     def get_centroid(self):
         """
         Return the centroid of the tree.
@@ -1,8 +1,8 @@
 import os
 from os import listdir
 import json
-from shapely.geometry import Point, Polygon
-from ..Common import FeatureList
+from shapely.geometry import Polygon
+from ..Common import FeatureList, RunReport, PolygonIndex, SpaceFillingCurve
 from ..Common import kd_tree
 from typing import List
 
@@ -62,7 +62,8 @@ class Groups():
     # Used to put in a same group the features which are in a same 1000 m^3 cube.
     DEFAULT_CUBE_SIZE = 1000
 
-    def __init__(self, feature_list: FeatureList, polygons_path=None, kd_tree_max=500, as_lods=False):
+    def __init__(self, feature_list: FeatureList, polygons_path=None, kd_tree_max=500, as_lods=False, max_tile_triangles=None, max_tile_bytes=None, kd_tree_3d=False,
+                 space_filling_curve=None):
         """
         Distribute the features contained in feature_list into different Group
         The way to distribute the features depends on the parameters
@@ -70,9 +71,16 @@ class Groups():
         :param polygons_path: the path to a folder containing polygons as .geojson files.
         When this param is not None, it means we want to group features by polygons
         :param kd_tree_max: the maximum number of features in each list created by the kd_tree
+        :param max_tile_triangles: the maximum number of triangles in each group, None for no limit
+        :param max_tile_bytes: the maximum estimated encoded size (in bytes) of each group, None for no limit
+        :param kd_tree_3d: if True, the kd-tree splits the features along the longest axis of their bounding box (X, Y or Z)
+        :param space_filling_curve: the name of a space filling curve ('morton' or 'hilbert') used to order the groups
+        and the features of each group, None to keep the order of the distribution
         """
         if ((type(feature_list) is list)):
-            self.group_array_of_feature_list(feature_list)
+            self.group_array_of_feature_list(feature_list, max_tile_triangles, max_tile_bytes, kd_tree_max, kd_tree_3d)
+            if space_filling_curve is not None:
+                self.order_on_curve(space_filling_curve)
         else:
             self.materials = feature_list.materials
             if polygons_path is not None:
@@ -80,8 +88,11 @@ class Groups():
             elif as_lods:
                 self.group_feature_list(feature_list)
             else:
-                self.group_objects_with_kdtree(feature_list, kd_tree_max)
+                self.group_objects_with_kdtree(feature_list, kd_tree_max, max_tile_triangles, max_tile_bytes, kd_tree_3d)
+            if space_filling_curve is not None:
+                self.order_on_curve(space_filling_curve)
             self.set_materials(self.materials)
+        self.report_distribution()
 
     def get_groups_as_list(self):
         """
@@ -90,6 +101,30 @@ class Groups():
         """
         return self.groups
 
+    def report_distribution(self):
+        """
+        Add the distribution of the number of features, of triangles and of the estimated size of the groups to the run report.
+        """
+        features = [group.feature_list.get_features() for group in self.groups]
+        RunReport.set_distribution('partition', 'features', [len(group_features) for group_features in features])
+        RunReport.set_distribution('partition', 'triangles', [sum([feature.get_number_of_triangles() for feature in group_features]) for group_features in features])
+        RunReport.set_distribution('partition', 'estimated_bytes', [sum([feature.get_encoded_size() for feature in group_features]) for group_features in features])
+
+    def order_on_curve(self, curve_name):
+        """
+        Order the groups by the position of their centroid along a space filling curve,
+        and the features of each group by the position of their centroid along the same curve.
+        Close groups then get close tile indices, and close features close batch IDs.
+        :param curve_name: the name of the curve ('morton' or 'hilbert')
+        """
+        centroids = [[feature.get_centroid() for feature in group.feature_list] for group in self.groups]
+        curve = SpaceFillingCurve.from_points([centroid for group_centroids in centroids for centroid in group_centroids], curve_name)
+        for group, group_centroids in zip(self.groups, centroids):
+            features = group.feature_list.get_features()
+            group.feature_list.set_features([features[i] for i in curve.argsort(group_centroids)])
+        order = curve.argsort([group.get_centroid() for group in self.groups])
+        self.groups = [self.groups[i] for i in order]
+
     def set_materials(self, materials):
         """
         Set the materials of each group.
@@ -98,12 +133,26 @@ class Groups():
         for group in self.groups:
             group.add_materials(materials)
 
-    def group_array_of_feature_list(self, feature_lists_array: List[FeatureList]):
+    def group_array_of_feature_list(self, feature_lists_array: List[FeatureList], max_tile_triangles=None, max_tile_bytes=None, kd_tree_max=500, kd_tree_3d=False):
         """
         Create one Group per FeatureList.
+        When a limit is given, the FeatureList exceeding it are distributed by a kd-tree into several groups.
         :param feature_lists_array: a list of FeatureList
+        :param max_tile_triangles: the maximum number of triangles in each group, None for no limit
+        :param max_tile_bytes: the maximum estimated encoded size (in bytes) of each group, None for no limit
+        :param kd_tree_max: the maximum number of features in each group, only used with kd_tree_3d
+        :param kd_tree_3d: if True, the FeatureList with more than kd_tree_max features are distributed by a 3D kd-tree
         """
-        self.groups = [Group(feature_list) for feature_list in feature_lists_array]
+        self.groups = list()
+        for feature_list in feature_lists_array:
+            if max_tile_triangles is None and max_tile_bytes is None and not kd_tree_3d:
+                self.groups.append(Group(feature_list))
+                continue
+            max_features = kd_tree_max if kd_tree_3d else len(feature_list)
+            for part in kd_tree(feature_list, max_features, max_triangles=max_tile_triangles, max_bytes=max_tile_bytes, use_3d=kd_tree_3d):
+                # The features keep their material indexes, so the parts keep all the materials of the list
+                part.set_materials(feature_list.materials)
+                self.groups.append(Group(part))
 
     def group_feature_list(self, feature_list: FeatureList):
         """
@@ -112,15 +161,18 @@ class Groups():
         """
         self.groups = [Group(FeatureList([feature])) for feature in feature_list]
 
-    def group_objects_with_kdtree(self, feature_list: FeatureList, kd_tree_max=500):
+    def group_objects_with_kdtree(self, feature_list: FeatureList, kd_tree_max=500, max_tile_triangles=None, max_tile_bytes=None, kd_tree_3d=False):
         """
         Create groups of features. The features are distributed into FeatureList of (by default) max 500 features.
         The distribution depends on the centroid of each feature.
         :param feature_list: a FeatureList
         :param kd_tree_max: the maximum number of features in each FeatureList
+        :param max_tile_triangles: the maximum number of triangles in each FeatureList, None for no limit
+        :param max_tile_bytes: the maximum estimated encoded size (in bytes) of each FeatureList, None for no limit
+        :param kd_tree_3d: if True, the features are split along the longest axis of their bounding box (X, Y or Z)
         """
         groups = list()
-        objects = kd_tree(feature_list, kd_tree_max)
+        objects = kd_tree(feature_list, kd_tree_max, max_triangles=max_tile_triangles, max_bytes=max_tile_bytes, use_3d=kd_tree_3d)
         for feature_list in objects:
             group = Group(feature_list)
             groups.append(group)
@@ -170,17 +222,13 @@ class Groups():
         features_without_poly = list()
 
         # For each feature, find the polygon containing it
-        for i, feature in enumerate(feature_list):
-            p = Point(feature.get_centroid())
-            in_polygon = False
-            for index, polygon in enumerate(polygons):
-                if p.within(polygon):
-                    if index not in features_dict:
-                        features_dict[index] = []
-                    features_dict[index].append(i)
-                    in_polygon = True
-                    break
-            if not in_polygon:
+        polygon_indices = PolygonIndex(polygons).find_containing_polygons([feature.get_centroid() for feature in feature_list])
+        for i, index in enumerate(polygon_indices.tolist()):
+            if index >= 0:
+                if index not in features_dict:
+                    features_dict[index] = []
+                features_dict[index].append(i)
+            else:
                 features_without_poly.append(i)
 
         # Create a list of Group
@@ -1,13 +1,18 @@
+import numpy as np
 from .feature import FeatureList
 
 
-def kd_tree(feature_list, maxNumObjects, depth=0):
+def kd_tree(feature_list, maxNumObjects, depth=0, max_triangles=None, max_bytes=None, use_3d=False):
     """
     Distribute the features into FeatureList.
     The objects are distributed by their centroid.
     :param objects: the features to distribute
     :param maxNumObjects: the max number of objects in each new group
     :param depth: the depth of the recursion
+    :param max_triangles: the max number of triangles in each new group, None for no limit
+    :param max_bytes: the max estimated encoded size (in bytes) of each new group, None for no limit
+    :param use_3d: if True, each split is done along the longest axis (X, Y or Z) of the bounding box of the centroids,
+    instead of alternating the X and Y axes
 
     :return: a list of FeatureList
     """
@@ -17,26 +22,139 @@ def kd_tree(feature_list, maxNumObjects, depth=0):
         return None
 
     derived = feature_list.__class__
+    features = list(feature_list)
 
-    # The module argument of 2 (in the next line) hard-wires the fact that
-    # this kd_tree is in fact a 2D_tree.
-    axis = depth % 2
+    # The tree is built on the X and Y coordinates of the centroids of the features (X, Y and Z in 3D),
+    # the recursion only moves arrays of indices
+    centroids = np.array([feature.get_centroid() for feature in features], dtype=np.float64).reshape((-1, 3))
+    if not use_3d:
+        centroids = centroids[:, 0:2]
+    leaves = list()
+    if max_triangles is None and max_bytes is None:
+        split_on_median(centroids, np.arange(len(features)), maxNumObjects, depth, depth, leaves)
+    else:
+        weights = [np.ones(len(features))]
+        limits = [maxNumObjects]
+        if max_triangles is not None:
+            weights.append([feature.get_number_of_triangles() for feature in features])
+            limits.append(max_triangles)
+        if max_bytes is not None:
+            weights.append([feature.get_encoded_size() for feature in features])
+            limits.append(max_bytes)
+        weights = np.array(weights, dtype=np.float64).T
+        split_on_budget(centroids, np.arange(len(features)), weights, np.array(limits, dtype=np.float64), depth, depth, leaves)
 
-    # Within the sorting criteria point[1] refers to the centroid of the
-    # bounding boxes of the city objects. And thus, depending on the value of
-    # axis, we alternatively sort on the X or Y coordinate of those centroids:
+    # Like the sort of the first level, leave the features sorted on the first axis
+    feature_list.set_features([features[i] for i in order_on_axes(centroids, np.arange(len(features)), depth, depth)])
 
-    feature_list.set_features(sorted(feature_list, key=lambda obj: obj.get_centroid()[axis]))
-    median = len(feature_list) // 2
-    lObjects = feature_list[:median]
-    rObjects = feature_list[median:]
     pre_tiles = derived()
-    if len(lObjects) > maxNumObjects or len(rObjects) > maxNumObjects:
-        pre_tiles.extend(kd_tree(lObjects, maxNumObjects, depth + 1))
-        pre_tiles.extend(kd_tree(rObjects, maxNumObjects, depth + 1))
-    else:
-        if len(lObjects) > 0:
-            pre_tiles.append(lObjects)
-        if len(rObjects) > 0:
-            pre_tiles.append(rObjects)
+    for leaf in leaves:
+        pre_tiles.append(derived([features[i] for i in leaf]))
     return pre_tiles
+
+
+def get_split_axes(centroids, indices, depth, first_depth):
+    """
+    Return the axes on which the features of a level are sorted, the first one being the split axis.
+    In 2D, the axes alternate: the features are sorted on the axis of the level, then on the axis of the previous level.
+    In 3D, the features are sorted on the longest axis of the bounding box of their centroids.
+    :param centroids: a (n, 2) or (n, 3) array with the coordinates of the centroids of all the features
+    :param indices: the indices of the features to split
+    :return: a list of axes
+    """
+    if centroids.shape[1] == 3:
+        if len(indices) == 0:
+            return [0]
+        return [int(np.argmax(np.ptp(centroids[indices], axis=0)))]
+    axes = [depth % 2]
+    if depth > first_depth:
+        axes.append((depth - 1) % 2)
+    return axes
+
+
+def order_on_axes(centroids, indices, depth, first_depth):
+    """
+    Return the order of features given by successive stable sorts of the features on the axis
+    of each level, from the first level to the level of depth.
+    Since the axes alternate, this order only depends on the axis of the level, then the axis of the previous level,
+    then the position of the feature in the input list.
+    In 3D, the order only depends on the split axis of the level, then the position of the feature in the input list.
+    :param indices: the indices of the features to sort
+    :return: an array of positions in indices
+    """
+    return order_on(centroids, indices, get_split_axes(centroids, indices, depth, first_depth))
+
+
+def order_on(centroids, indices, axes):
+    """
+    Sort the features on the given axes, then on their position in the input list.
+    :param indices: the indices of the features to sort
+    :param axes: the axes, from the most significant
+    :return: an array of positions in indices
+    """
+    keys = [indices] + [centroids[indices, axis] for axis in reversed(axes)]
+    return np.lexsort(keys)
+
+
+def split_on_median(centroids, indices, maxNumObjects, depth, first_depth, leaves):
+    """
+    Split the features in two halves on the median of their centroids, on the X or Y axis depending on the depth
+    (on the longest axis in 3D).
+    The lower half contains the same features as the first half of the features sorted on this axis.
+    The halves are split again while one of them has more than maxNumObjects features, otherwise they are added to the leaves.
+    :param centroids: a (n, 2) array with the X and Y coordinates of the centroids of all the features, (n, 3) in 3D
+    :param indices: the indices of the features to split
+    :param leaves: the list where the arrays of indices of the final groups are added
+    """
+    axes = get_split_axes(centroids, indices, depth, first_depth)
+    axis = axes[0]
+    median = len(indices) // 2
+
+    if median == 0:
+        lower = indices[:0]
+        upper = indices
+    else:
+        values = centroids[indices, axis]
+        pivot = np.partition(values, median)[median]
+        below = values < pivot
+        # The features on the pivot are distributed like a stable sort would do
+        equal = np.flatnonzero(values == pivot)
+        missing = median - np.count_nonzero(below)
+        below[equal[order_on(centroids, indices[equal], axes)[:missing]]] = True
+        lower = indices[below]
+        upper = indices[~below]
+
+    if len(lower) > maxNumObjects or len(upper) > maxNumObjects:
+        split_on_median(centroids, lower, maxNumObjects, depth + 1, first_depth, leaves)
+        split_on_median(centroids, upper, maxNumObjects, depth + 1, first_depth, leaves)
+    else:
+        if len(lower) > 0:
+            leaves.append(lower[order_on(centroids, lower, axes)])
+        if len(upper) > 0:
+            leaves.append(upper[order_on(centroids, upper, axes)])
+
+
+def split_on_budget(centroids, indices, weights, limits, depth, first_depth, leaves):
+    """
+    Split the features in two halves until each group fits in the limits (number of features, triangles, bytes...).
+    The features are sorted on the X or Y axis depending on the depth (on the longest axis in 3D), and the split keeps the same cost on both sides,
+    the cost of a feature being the largest fraction of a limit it uses.
+    A group containing a single feature is never split, even when it exceeds a limit.
+    :param centroids: a (n, 2) array with the X and Y coordinates of the centroids of all the features, (n, 3) in 3D
+    :param indices: the indices of the features to split
+    :param weights: a (n, k) array with the weights (1, triangles, bytes...) of all the features
+    :param limits: the (k,) maximum sum of each weight in a group
+    :param leaves: the list where the arrays of indices of the final groups are added
+    """
+    if len(indices) == 0:
+        return
+    indices = indices[order_on_axes(centroids, indices, depth, first_depth)]
+    if len(indices) == 1 or np.all(np.sum(weights[indices], axis=0) <= limits):
+        leaves.append(indices)
+        return
+
+    cumulative_cost = np.cumsum(np.max(weights[indices] / limits, axis=1))
+    cut = int(np.searchsorted(cumulative_cost, cumulative_cost[-1] / 2)) + 1
+    cut = min(max(cut, 1), len(indices) - 1)
+    split_on_budget(centroids, indices[:cut], weights, limits, depth + 1, first_depth, leaves)
+    split_on_budget(centroids, indices[cut:], weights, limits, depth + 1, first_depth, leaves)
@@ -14,3 +14,11 @@ class LoaNode(GeometryNode):
     def __init__(self, features_node: GeometryNode, geometric_error=None, polygons=list()):
         feature_list = LoaFeatureList(polygons=polygons, features_node=features_node)
         super().__init__(feature_list, geometric_error=geometric_error)
+
+    def get_content_error(self, children_error=0.):
+        """
+        Estimate the error of the polygon extrusions against the features they replace.
+        :param children_error: the highest geometric error of the child nodes
+        :return: a distance
+        """
+        return self.feature_list.get_deviation()
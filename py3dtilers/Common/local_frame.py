@@ -0,0 +1,71 @@
+import numpy as np
+
+
+class LocalFrame(object):
+    """
+    The local frame of a tile, used to place its vertices in the output CRS without reprojecting them.
+    Only the origin of the frame is reprojected exactly. The vertices, expressed relatively to this origin,
+    are then placed by the linear part of the tile transform: the local East-North-Up axes at the origin,
+    combined with the scale factor and the grid convergence of the input projection
+    (i.e. the Jacobian of the reprojection at the origin).
+    This approximation is only valid for small tiles, its error grows with the square of the tile extent.
+    """
+
+    def __init__(self, transformer, origin, extent):
+        """
+        :param transformer: the pyproj Transformer from the input CRS to the output CRS
+        :param origin: the origin of the frame, in the input CRS
+        :param extent: the size of the tile along X, Y and Z, in the input CRS
+        """
+        self.transformer = transformer
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.center = self.reproject(self.origin[np.newaxis, :])[0]
+
+        # The Jacobian is computed with central differences, the step being small compared to the tile
+        step = max(float(np.max(extent)), 1.) * 1e-3
+        offsets = np.identity(3) * step
+        forward = self.reproject(self.origin + offsets)
+        backward = self.reproject(self.origin - offsets)
+        self.matrix = ((forward - backward) / (2 * step)).T
+
+    def reproject(self, points):
+        """
+        Reproject points exactly.
+        :param points: a (n, 3) array of points in the input CRS
+        :return: a (n, 3) array of points in the output CRS
+        """
+        x, y, z = self.transformer.transform(points[:, 0], points[:, 1], points[:, 2])
+        return np.column_stack((x, y, z))
+
+    def approximate(self, points):
+        """
+        Place points in the output CRS with the local frame.
+        :param points: a (n, 3) array of points in the input CRS
+        :return: a (n, 3) array of points in the output CRS
+        """
+        return self.center + np.matmul(points - self.origin, self.matrix.T)
+
+    def get_max_error(self, mins, maxs):
+        """
+        Estimate the maximum distance between the approximated and the exact positions inside a box.
+        The error is measured on a 3x3x3 grid covering the box, which includes its corners
+        (where the error of the linearization is the highest).
+        :param mins: the minimal X, Y and Z of the box, in the input CRS
+        :param maxs: the maximal X, Y and Z of the box, in the input CRS
+        :return: the maximum error, in the units of the output CRS
+        """
+        axes = [np.linspace(mins[i], maxs[i], 3) for i in range(0, 3)]
+        points = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape((-1, 3))
+        errors = self.reproject(points) - self.approximate(points)
+        return float(np.max(np.sqrt(np.sum(errors * errors, axis=1))))
+
+    def get_transform(self, translation):
+        """
+        Return the 4x4 transform of a tile placed with this frame.
+        :param translation: the translation of the tile
+        :return: a (4, 4) array
+        """
+        transform = np.identity(4)
+        transform[0:3, 0:3] = self.matrix
+        transform[0:3, 3] = translation
+        return transform
@@ -12,3 +12,11 @@ class Lod1Node(GeometryNode):
     def __init__(self, features_node: GeometryNode, geometric_error=None):
         feature_list = Lod1FeatureList(features_node=features_node)
         super().__init__(feature_list, geometric_error=geometric_error)
+
+    def get_content_error(self, children_error=0.):
+        """
+        Estimate the error of the footprint extrusions against the features they replace.
+        :param children_error: the highest geometric error of the child nodes
+        :return: a distance
+        """
+        return self.feature_list.get_deviation()
@@ -1,5 +1,6 @@
-from shapely.geometry import Point, Polygon
-from ..Common import FeatureList, ExtrudedPolygon
+import numpy as np
+from shapely.geometry import Polygon
+from ..Common import Feature, FeatureList, ExtrudedPolygon, PolygonIndex, MeshSimplifier, TriangleArray, FootprintExtruder
 from typing import TYPE_CHECKING, List
 
 if TYPE_CHECKING:
@@ -11,7 +12,17 @@ class LodFeatureList(FeatureList):
     def __init__(self, features=None, features_node: 'GeometryNode' = None):
         super().__init__(features)
         self.features_node = features_node
-        self.centroid = features_node.feature_list.get_centroid()
+        # The features of a LodFeatureList are only created when its geometry is set
+        source = features_node.feature_list
+        self.centroid = source.centroid if isinstance(source, LodFeatureList) else source.get_centroid()
+
+    def get_deviation(self):
+        """
+        Estimate the distance between the features and the features they are created from.
+        The features are extrusions of the features they replace.
+        :return: a distance
+        """
+        return max([feature.get_deviation() for feature in self], default=0.)
 
 
 class Lod1FeatureList(LodFeatureList):
@@ -20,14 +31,69 @@ class Lod1FeatureList(LodFeatureList):
         """
         Set the geometry of the features.
         Keep only the features with geometry.
+        The footprints of all the features are extruded together by a FootprintExtruder.
         """
-        for i, feature in enumerate(self.features_node.feature_list):
-            extruded_polygon = ExtrudedPolygon("lod1_" + str(i), [feature])
-            extruded_polygon.set_geom()
-            self.append(extruded_polygon)
+        feature_list = self.features_node.feature_list
+        store = feature_list.get_geometry_store()
+        triangles, batch_ids = FootprintExtruder(getattr(user_arguments, 'lod1_jobs', 1)).extrude(store.vertices, store.offsets)
+        features = np.unique(batch_ids)
+        feature_triangles = np.split(triangles, np.cumsum(np.bincount(batch_ids)[features])[:-1])
+        for i, extrusion in zip(features.tolist(), feature_triangles):
+            self.append(ExtrudedPolygon.from_triangles("lod1_" + str(i), [store.features[i]], extrusion))
         self.features_node = None
 
 
+class SimplifiedFeatureList(LodFeatureList):
+
+    def __init__(self, features=None, features_node: 'GeometryNode' = None, ratio=0.5):
+        super().__init__(features, features_node=features_node)
+        self.ratio = ratio
+        # The error of the simplification, as a distance
+        self.error = 0.
+
+    def set_features_geom(self, user_arguments=None):
+        """
+        Set the geometry of the features: a simplified version of the features of the features node,
+        keeping a ratio of their triangles. The features are simplified together, so the simplification
+        removes the triangles where it creates the lowest error. The features without triangles left are removed.
+        """
+        features = [feature for feature in self.features_node.feature_list if feature.geom.get_number_of_triangles() > 0]
+        if len(features) > 0:
+            counts = [feature.geom.get_number_of_triangles() for feature in features]
+            simplifier = MeshSimplifier(np.concatenate([feature.geom.get_layer(0) for feature in features]), np.repeat(np.arange(len(features)), counts))
+            self.error = simplifier.simplify(int(np.ceil(sum(counts) * self.ratio)))
+
+            groups = simplifier.get_triangle_groups()
+            order = np.argsort(groups, kind='stable')
+            triangles = np.split(simplifier.get_triangles()[order], np.cumsum(np.bincount(groups, minlength=len(features)))[:-1])
+            for feature, feature_triangles in zip(features, triangles):
+                if len(feature_triangles) > 0:
+                    self.append(self.create_simplified_feature(feature, feature_triangles))
+        self.set_materials(self.features_node.feature_list.materials)
+        self.features_node = None
+
+    def create_simplified_feature(self, feature: 'Feature', triangles):
+        """
+        Create the simplified version of a feature. It keeps the ID, the material and the batch table data of the feature.
+        :param feature: the Feature
+        :param triangles: the (n, 3, 3) array of the simplified triangles
+        :return: a Feature
+        """
+        simplified_feature = Feature(feature.get_id())
+        simplified_feature.geom = TriangleArray([triangles])
+        simplified_feature.material_index = feature.material_index
+        simplified_feature.set_batchtable_data(feature.get_batchtable_data())
+        simplified_feature.set_box()
+        return simplified_feature
+
+    def get_deviation(self):
+        """
+        Return the error measured during the simplification.
+        :return: a distance
+        """
+        return self.error
+
+
 class LoaFeatureList(LodFeatureList):
 
     loa_index = 0
@@ -41,15 +107,22 @@ class LoaFeatureList(LodFeatureList):
         Set the geometry of the features.
         Keep only the features with geometry.
         """
-        features = self.features_node.feature_list.get_features().copy()
-
-        for polygon in self.polygons:
-            feature_list = FeatureList(self.find_features_in_polygon(features, Polygon(polygon)))
-            if len(feature_list) > 0:
-                [features.remove(feature) for feature in feature_list]
-                self.append(self.create_loa(feature_list, polygon))
-
-        for feature in features:
+        features = self.features_node.feature_list.get_features()
+
+        # Each feature is contained by the first polygon containing its centroid
+        features_in_polygons = dict()
+        features_without_polygon = list()
+        for feature, polygon_index in zip(features, self.find_polygon_of_features(features, [Polygon(polygon) for polygon in self.polygons])):
+            if polygon_index >= 0:
+                features_in_polygons.setdefault(polygon_index, list()).append(feature)
+            else:
+                features_without_polygon.append(feature)
+
+        for index, polygon in enumerate(self.polygons):
+            if index in features_in_polygons:
+                self.append(self.create_loa(FeatureList(features_in_polygons[index]), polygon))
+
+        for feature in features_without_polygon:
             self.append(self.create_loa(FeatureList([feature])))
 
         self.features_node = None
@@ -61,12 +134,17 @@ class LoaFeatureList(LodFeatureList):
         :param polygon: a Shapely Polygon
         :return: a list of Feature
         """
-        features_in_polygon = list()
-        for feature in features:
-            p = Point(feature.get_centroid())
-            if p.within(polygon):
-                features_in_polygon.append(feature)
-        return features_in_polygon
+        polygon_indices = self.find_polygon_of_features(features, [polygon])
+        return [feature for feature, polygon_index in zip(features, polygon_indices) if polygon_index == 0]
+
+    def find_polygon_of_features(self, features: List['Feature'], polygons: List['Polygon']):
+        """
+        Find the first polygon containing the centroid of each feature.
+        :param features: a list of Feature
+        :param polygons: a list of Shapely Polygon
+        :return: a list with the index of the polygon of each feature, -1 when no polygon contains the feature
+        """
+        return PolygonIndex(polygons).find_containing_polygons([feature.get_centroid() for feature in features]).tolist()
 
     def create_loa(self, feature_list: 'FeatureList', polygon: 'Polygon' = None):
         """
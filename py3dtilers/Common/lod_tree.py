@@ -1,9 +1,9 @@
-from ..Common import GeometryTree, GeometryNode, Lod1Node, LoaNode
+from ..Common import FeatureList, GeometryTree, GeometryNode, Lod1Node, LoaNode, SimplifiedNode
 from typing import TYPE_CHECKING
-import copy
 
 if TYPE_CHECKING:
     from ..Common import Groups
+    from .group import Group
 
 
 class LodTree(GeometryTree):
@@ -11,7 +11,8 @@ class LodTree(GeometryTree):
     The LodTree contains the root node(s) of the LOD hierarchy and the centroid of the whole tileset
     """
 
-    def __init__(self, groups: 'Groups', create_lod1=False, create_loa=False, with_texture=False, geometric_errors=[None, None, None], texture_lods=0):
+    def __init__(self, groups: 'Groups', create_lod1=False, create_loa=False, with_texture=False, geometric_errors=[None, None, None], texture_lods=0,
+                 simplification_ratios=list()):
         """
         LodTree takes an instance of FeatureList (which contains a collection of Feature) and creates nodes.
         In order to reduce the number of .b3dm, it also distributes the features into a list of Group.
@@ -20,28 +21,48 @@ class LodTree(GeometryTree):
         root_nodes = list()
 
         for group in groups:
-            node = GeometryNode(group.feature_list, geometric_errors[0], with_texture)
-            root_node = node
-            downsample_factor = 3
-            for _ in range(0, texture_lods):
-                geometric_error = (downsample_factor / 3) + geometric_errors[0] if geometric_errors[0] else downsample_factor / 3
-                textured_node = GeometryNode(copy.deepcopy(group.feature_list), geometric_error, with_texture, downsample_factor)
-                textured_node.add_child_node(root_node)
-                root_node = textured_node
-                downsample_factor += 10
-            if create_lod1:
-                lod1_node = Lod1Node(node, geometric_errors[1])
-                lod1_node.add_child_node(root_node)
-                root_node = lod1_node
-            if create_loa:
-                loa_node = LoaNode(node, geometric_errors[2], group.polygons)
-                loa_node.add_child_node(root_node)
-                root_node = loa_node
-
-            root_nodes.append(root_node)
+            root_nodes.append(LodTree.create_root_node(group, create_lod1, create_loa, with_texture, geometric_errors, texture_lods, simplification_ratios))
 
         super().__init__(root_nodes)
 
+    @staticmethod
+    def create_root_node(group: 'Group', create_lod1=False, create_loa=False, with_texture=False, geometric_errors=[None, None, None], texture_lods=0,
+                         simplification_ratios=list()):
+        """
+        Create the LOD hierarchy of a group.
+        The texture LOD nodes share the features of the group, only their atlas image is downsized.
+        Each simplification ratio (ratio of the triangles of the features to keep, in decreasing order) creates a SimplifiedNode,
+        simplified from the features of the previous one.
+        :param group: the Group containing the features
+        :return: the root GeometryNode of the hierarchy
+        """
+        node = GeometryNode(group.feature_list, geometric_errors[0], with_texture)
+        root_node = node
+        downsample_factor = 3
+        for _ in range(0, texture_lods):
+            geometric_error = (downsample_factor / 3) + geometric_errors[0] if geometric_errors[0] else downsample_factor / 3
+            textured_node = GeometryNode(group.feature_list, geometric_error, with_texture, downsample_factor)
+            textured_node.add_child_node(root_node)
+            root_node = textured_node
+            downsample_factor += 10
+        features_node = node
+        previous_ratio = 1.
+        for ratio in simplification_ratios:
+            simplified_node = SimplifiedNode(features_node, ratio / previous_ratio)
+            simplified_node.add_child_node(root_node)
+            root_node = simplified_node
+            features_node = simplified_node
+            previous_ratio = ratio
+        if create_lod1:
+            lod1_node = Lod1Node(node, geometric_errors[1])
+            lod1_node.add_child_node(root_node)
+            root_node = lod1_node
+        if create_loa:
+            loa_node = LoaNode(node, geometric_errors[2], group.polygons)
+            loa_node.add_child_node(root_node)
+            root_node = loa_node
+        return root_node
+
     @staticmethod
     def vertical_hierarchy(groups: 'Groups', geometric_errors=[None]):
         root_node = GeometryNode(groups[0].feature_list, geometric_errors[0])
@@ -52,3 +73,40 @@ class LodTree(GeometryTree):
             root_node = node
         tree = GeometryTree([root_node])
         return tree
+
+
+class StreamingLodTree(LodTree):
+    """
+    A LodTree creating the LOD hierarchy of each group only when its tiles are created.
+    The groups are removed from the list once their hierarchy is created, so the features of a group
+    can be freed as soon as its tiles are writen.
+    """
+
+    def __init__(self, groups: 'Groups', create_lod1=False, create_loa=False, with_texture=False, geometric_errors=[None, None, None], texture_lods=0,
+                 simplification_ratios=list()):
+        self.groups = groups
+        self.options = (create_lod1, create_loa, with_texture, geometric_errors, texture_lods, simplification_ratios)
+        self.nodes_per_group = 1 + texture_lods + len(simplification_ratios) + int(create_lod1) + int(create_loa)
+        GeometryTree.__init__(self, list())
+
+    def get_centroid(self):
+        """
+        Return the centroid of the tree.
+        The centroid of the tree is the centroid of the features of the groups which are not consumed yet.
+        """
+        return FeatureList([group.feature_list for group in self.groups]).get_centroid()
+
+    def get_number_of_nodes(self):
+        """
+        Return the number of nodes of the hierarchies not created yet.
+        :return: int
+        """
+        return len(self.groups) * self.nodes_per_group
+
+    def pop_root_nodes(self):
+        """
+        Create the LOD hierarchy of each group, one group at a time.
+        The group is removed from the list before its hierarchy is returned.
+        """
+        while len(self.groups) > 0:
+            yield LodTree.create_root_node(self.groups.pop(0), *self.options)
@@ -0,0 +1,120 @@
+import numpy as np
+import pygltflib
+from py3dtiles.tileset.content import GltfAttribute, GltfPrimitive
+from typing import List
+
+
+class MeshQuantizer():
+    """
+    Store the vertex attributes of the glTF primitives of a tile as normalized integers (KHR_mesh_quantization).
+    The positions are stored as int16 relative to the bounding box of the tile, the box being restored by the node matrix.
+    The normals are stored as int8, the UVs as uint16 and the vertex colors as uint8.
+    """
+
+    EXTENSION = 'KHR_mesh_quantization'
+
+    def __init__(self, primitives: List[GltfPrimitive]):
+        """
+        :param primitives: the GltfPrimitive instances of the tile
+        """
+        positions = np.concatenate([primitive.points.array for primitive in primitives])
+        mins = np.min(positions, axis=0).astype(np.float64)
+        maxs = np.max(positions, axis=0).astype(np.float64)
+        self.center = (mins + maxs) / 2
+        # A flat axis keeps a scale of 1, since any scale maps its vertices on the center
+        self.half_size = np.where(maxs > mins, (maxs - mins) / 2, 1.)
+        self.position_bounds = list()
+
+    def get_matrix(self):
+        """
+        Return the matrix restoring the positions from their quantized values.
+        :return: a 4x4 array
+        """
+        matrix = np.diag(np.append(self.half_size, 1.))
+        matrix[0:3, 3] = self.center
+        return matrix
+
+    def quantize(self, primitive):
+        """
+        Replace the attributes of a primitive by their quantized values.
+        The attributes whose values are outside the range of the quantized type are kept as floats.
+        :param primitive: a GltfPrimitive
+        """
+        positions = MeshQuantizer.to_normalized((primitive.points.array - self.center) / self.half_size, np.int16)
+        self.position_bounds.append((np.min(positions, axis=0).tolist(), np.max(positions, axis=0).tolist()))
+        primitive.points = GltfAttribute('POSITION', pygltflib.VEC3, pygltflib.SHORT, MeshQuantizer.pad(positions))
+
+        if primitive.normals is not None:
+            # The node matrix scales the normals by the inverse of the half size, so they are scaled by the half size here
+            normals = primitive.normals.array * self.half_size
+            norms = np.linalg.norm(normals, axis=1)
+            norms[norms == 0] = 1
+            normals = MeshQuantizer.to_normalized(normals / norms[:, np.newaxis], np.int8)
+            primitive.normals = GltfAttribute('NORMAL', pygltflib.VEC3, pygltflib.BYTE, MeshQuantizer.pad(normals))
+
+        if primitive.uvs is not None and MeshQuantizer.is_in_unit_range(primitive.uvs.array):
+            primitive.uvs = GltfAttribute('TEXCOORD_0', pygltflib.VEC2, pygltflib.UNSIGNED_SHORT, MeshQuantizer.to_normalized(primitive.uvs.array, np.uint16))
+
+        for index, attribute in enumerate(primitive.additional_attributes):
+            if attribute.name == 'COLOR_0' and MeshQuantizer.is_in_unit_range(attribute.array):
+                colors = np.full((len(attribute.array), 4), np.iinfo(np.uint8).max, dtype=np.uint8)
+                colors[:, 0:3] = MeshQuantizer.to_normalized(attribute.array, np.uint8)
+                primitive.additional_attributes[index] = GltfAttribute('COLOR_0', pygltflib.VEC4, pygltflib.UNSIGNED_BYTE, colors)
+
+    def update_gltf(self, gltf: 'pygltflib.GLTF2'):
+        """
+        Declare the quantized attributes in the glTF created from the quantized primitives:
+        set the normalized flag of their accessors, the byte stride of the padded attributes,
+        the bounds of the positions, and the KHR_mesh_quantization extension.
+        :param gltf: the GLTF2 instance
+        """
+        for gltf_primitive, (position_min, position_max) in zip(gltf.meshes[0].primitives, self.position_bounds):
+            for name in ['POSITION', 'NORMAL', 'TEXCOORD_0', 'COLOR_0']:
+                index = getattr(gltf_primitive.attributes, name)
+                if index is None or gltf.accessors[index].componentType == pygltflib.FLOAT:
+                    continue
+                accessor = gltf.accessors[index]
+                accessor.normalized = True
+                if accessor.type == pygltflib.VEC3:
+                    # The VEC3 attributes are padded to 4 components to keep each vertex 4-byte aligned
+                    gltf.bufferViews[accessor.bufferView].byteStride = 4 * np.dtype(MeshQuantizer.__get_dtype(accessor.componentType)).itemsize
+            position = gltf.accessors[gltf_primitive.attributes.POSITION]
+            position.min = position_min
+            position.max = position_max
+
+        for extensions in [gltf.extensionsUsed, gltf.extensionsRequired]:
+            if MeshQuantizer.EXTENSION not in extensions:
+                extensions.append(MeshQuantizer.EXTENSION)
+
+    @staticmethod
+    def to_normalized(array, dtype):
+        """
+        Convert values in [-1, 1] (or [0, 1] for unsigned types) to normalized integers.
+        :param array: an array of floats
+        :param dtype: the integer type
+        :return: an array of integers
+        """
+        info = np.iinfo(dtype)
+        return np.clip(np.round(np.asarray(array, dtype=np.float64) * info.max), -info.max if info.min < 0 else 0, info.max).astype(dtype)
+
+    @staticmethod
+    def pad(array):
+        """
+        Add a fourth component of zeros to a (n, 3) array.
+        :param array: a (n, 3) array
+        :return: a (n, 4) array
+        """
+        return np.hstack([array, np.zeros((len(array), 1), dtype=array.dtype)])
+
+    @staticmethod
+    def is_in_unit_range(array):
+        """
+        :param array: an array of floats
+        :return: True if all the values are in [0, 1]
+        """
+        return len(array) == 0 or (np.min(array) >= 0 and np.max(array) <= 1)
+
+    @staticmethod
+    def __get_dtype(component_type):
+        return {pygltflib.BYTE: np.int8, pygltflib.UNSIGNED_BYTE: np.uint8,
+                pygltflib.SHORT: np.int16, pygltflib.UNSIGNED_SHORT: np.uint16}[component_type]
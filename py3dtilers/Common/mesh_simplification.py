@@ -0,0 +1,248 @@
+import numpy as np
+from .geometry_store import TriangleArray
+
+
+class MeshSimplifier():
+    """
+    Simplify a triangle mesh by quadric edge collapse (Garland and Heckbert, "Surface simplification using quadric error metrics").
+    Each vertex holds the quadric of the planes of its faces (and of the planes orthogonal to its boundary edges),
+    the cost of collapsing an edge being the sum of the squared distances of the new vertex to those planes.
+    The collapses are done in passes: each pass collapses the cheapest edges whose neighbourhoods don't overlap,
+    so a pass only needs array operations.
+    """
+
+    # The candidates of a pass are the cheapest edges, at most 1 / CANDIDATE_DIVISOR of the edges
+    CANDIDATE_DIVISOR = 8
+
+    def __init__(self, triangles, groups=None):
+        """
+        :param triangles: a (n, 3, 3) array of triangles
+        :param groups: the (n,) group (an integer) of each triangle, None for a single group.
+        The groups don't share vertices, so each triangle of the simplified mesh stays in a single group.
+        """
+        triangles = TriangleArray.to_array(triangles)
+        positions = triangles.reshape((-1, 3))
+        groups = np.zeros(len(triangles), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        if len(positions) == 0:
+            self.vertices = np.zeros((0, 3))
+            self.vertex_groups = np.zeros(0, dtype=np.int64)
+            self.faces = np.zeros((0, 3), dtype=np.int64)
+        else:
+            vertex_groups = np.repeat(groups, 3)
+            first, inverse = TriangleArray.weld_vertices([positions, vertex_groups])
+            self.vertices = positions[first].copy()
+            self.vertex_groups = vertex_groups[first]
+            self.faces = inverse.reshape((-1, 3))
+        self.faces = self.faces[~MeshSimplifier.is_degenerated(self.faces)]
+        self.quadrics = self.__compute_quadrics()
+        self.random = np.random.default_rng(0)
+        # The square root of the highest cost of the collapses done (in the units of the positions)
+        self.error = 0.
+
+    def get_number_of_triangles(self):
+        """
+        :return: the number of triangles of the simplified mesh
+        """
+        return len(self.faces)
+
+    def get_triangles(self):
+        """
+        Return the triangles of the simplified mesh.
+        :return: a (n, 3, 3) array
+        """
+        return self.vertices[self.faces]
+
+    def get_triangle_groups(self):
+        """
+        Return the group of each triangle of the simplified mesh.
+        :return: a (n,) array
+        """
+        return self.vertex_groups[self.faces[:, 0]]
+
+    def simplify(self, target_count):
+        """
+        Collapse edges until the mesh has at most target_count triangles, or no edge can be collapsed.
+        An edge can't be collapsed when it would flip a triangle.
+        :param target_count: the number of triangles to reach
+        :return: the error of the simplification, as a distance
+        """
+        blocked = np.zeros(0, dtype=np.int64)
+        while len(self.faces) > target_count:
+            edges = self.__get_edges()
+            keys = self.__get_edge_keys(edges)
+            unblocked = ~np.isin(keys, blocked)
+            edges = edges[unblocked]
+            keys = keys[unblocked]
+            if len(edges) == 0:
+                break
+
+            positions, costs = self.__get_optimal_positions(edges)
+            # A collapse removes 2 triangles (1 on a boundary), only the cheapest edges are candidates.
+            # The ties are broken randomly and the candidates are shuffled, otherwise the candidates would be clustered
+            # and their neighbourhoods would overlap, allowing only a few collapses per pass
+            nb_candidates = max(1, min((len(self.faces) - target_count) // 2, len(edges) // MeshSimplifier.CANDIDATE_DIVISOR))
+            candidates = np.lexsort((self.random.random(len(costs)), costs))[:nb_candidates]
+            candidates = candidates[self.random.permutation(len(candidates))]
+            selected = candidates[self.__select_independent_edges(edges[candidates], len(edges))]
+
+            rejected = self.__find_flips(edges[selected], positions[selected])
+            blocked = np.concatenate([blocked, keys[selected[rejected]]])
+            selected = selected[~rejected]
+            if len(selected) == 0:
+                continue
+            self.__collapse(edges[selected], positions[selected])
+            self.error = max(self.error, float(np.sqrt(np.max(costs[selected]))))
+        return self.error
+
+    def __compute_quadrics(self):
+        """
+        Compute the quadric of each vertex: the sum of the quadrics of the planes of its faces,
+        plus the quadrics of the planes containing its boundary edges and orthogonal to their face.
+        :return: a (n, 4, 4) array
+        """
+        quadrics = np.zeros((len(self.vertices), 4, 4))
+        if len(self.faces) == 0:
+            return quadrics
+        normals = TriangleArray.compute_triangle_normals(self.vertices[self.faces])
+        planes = np.hstack([normals, -np.sum(normals * self.vertices[self.faces[:, 0]], axis=1)[:, np.newaxis]])
+        plane_quadrics = planes[:, :, np.newaxis] * planes[:, np.newaxis, :]
+        for corner in range(0, 3):
+            np.add.at(quadrics, self.faces[:, corner], plane_quadrics)
+
+        # The boundary edges are used by a single face
+        face_edges = self.__get_face_edges()
+        _, first, counts = np.unique(self.__get_edge_keys(face_edges), return_index=True, return_counts=True)
+        boundary = first[counts == 1]
+        if len(boundary) > 0:
+            starts = self.vertices[face_edges[boundary, 0]]
+            directions = np.cross(self.vertices[face_edges[boundary, 1]] - starts, normals[boundary // 3])
+            norms = np.linalg.norm(directions, axis=1)
+            norms[norms == 0] = 1
+            directions /= norms[:, np.newaxis]
+            planes = np.hstack([directions, -np.sum(directions * starts, axis=1)[:, np.newaxis]])
+            plane_quadrics = planes[:, :, np.newaxis] * planes[:, np.newaxis, :]
+            for end in range(0, 2):
+                np.add.at(quadrics, face_edges[boundary, end], plane_quadrics)
+        return quadrics
+
+    def __get_face_edges(self):
+        """
+        :return: a (3n, 2) array of the edges of each face, the lower vertex index first
+        """
+        return np.sort(self.faces[:, [[0, 1], [1, 2], [2, 0]]].reshape((-1, 2)), axis=1)
+
+    def __get_edge_keys(self, edges):
+        """
+        :param edges: a (n, 2) array of edges, the lower vertex index first
+        :return: a (n,) array with a unique integer for each edge
+        """
+        return edges[:, 0] * len(self.vertices) + edges[:, 1]
+
+    def __get_edges(self):
+        """
+        :return: a (n, 2) array of the unique edges of the faces, the lower vertex index first
+        """
+        keys = np.unique(self.__get_edge_keys(self.__get_face_edges()))
+        return np.stack([keys // len(self.vertices), keys % len(self.vertices)], axis=1)
+
+    def __get_optimal_positions(self, edges):
+        """
+        Find the position minimizing the cost of the collapse of each edge, among the point minimizing the quadric
+        (when it is well defined and close to the edge), the ends and the middle of the edge.
+        :param edges: a (n, 2) array of edges
+        :return: the (n, 3) positions and the (n,) costs
+        """
+        quadrics = self.quadrics[edges[:, 0]] + self.quadrics[edges[:, 1]]
+        starts = self.vertices[edges[:, 0]]
+        ends = self.vertices[edges[:, 1]]
+        candidates = [starts, ends, (starts + ends) / 2]
+
+        optimal = (starts + ends) / 2
+        solvable = np.abs(np.linalg.det(quadrics[:, 0:3, 0:3])) > 1e-12
+        if np.any(solvable):
+            optimal[solvable] = np.linalg.solve(quadrics[solvable, 0:3, 0:3], -quadrics[solvable, 0:3, 3:4])[:, :, 0]
+        lengths = np.linalg.norm(ends - starts, axis=1)
+        solvable &= np.linalg.norm(optimal - (starts + ends) / 2, axis=1) <= lengths
+        candidates.append(np.where(solvable[:, np.newaxis], optimal, (starts + ends) / 2))
+
+        costs = np.array([MeshSimplifier.get_costs(quadrics, candidate) for candidate in candidates])
+        best = np.argmin(costs, axis=0)
+        indices = np.arange(len(edges))
+        return np.array(candidates)[best, indices], np.maximum(costs[best, indices], 0)
+
+    def __select_independent_edges(self, edges, nb_edges):
+        """
+        Select edges whose collapses don't change the same faces: an edge is selected when it has the lowest rank
+        among all the edges touching the faces around its vertices.
+        :param edges: a (n, 2) array of edges, sorted by priority
+        :param nb_edges: a rank higher than the rank of any edge
+        :return: the indices of the selected edges
+        """
+        ranks = np.arange(len(edges))
+        vertex_ranks = np.full(len(self.vertices), nb_edges, dtype=np.int64)
+        np.minimum.at(vertex_ranks, edges[:, 0], ranks)
+        np.minimum.at(vertex_ranks, edges[:, 1], ranks)
+        face_ranks = np.min(vertex_ranks[self.faces], axis=1)
+        neighbourhood_ranks = np.full(len(self.vertices), nb_edges, dtype=np.int64)
+        for corner in range(0, 3):
+            np.minimum.at(neighbourhood_ranks, self.faces[:, corner], face_ranks)
+        return np.flatnonzero((neighbourhood_ranks[edges[:, 0]] == ranks) & (neighbourhood_ranks[edges[:, 1]] == ranks))
+
+    def __find_flips(self, edges, positions):
+        """
+        Find the collapses which would flip (or flatten) a face.
+        The collapses must not change the same faces.
+        :param edges: a (n, 2) array of edges to collapse
+        :param positions: the (n, 3) positions of the vertices after the collapses
+        :return: a boolean array, True for the collapses to reject
+        """
+        collapse_of_vertex = np.full(len(self.vertices), -1, dtype=np.int64)
+        collapse_of_vertex[edges[:, 0]] = np.arange(len(edges))
+        collapse_of_vertex[edges[:, 1]] = np.arange(len(edges))
+        face_collapses = np.max(collapse_of_vertex[self.faces], axis=1)
+        moved = collapse_of_vertex[self.faces] >= 0
+        # The faces containing the collapsed edge disappear
+        changed = (face_collapses >= 0) & (np.count_nonzero(moved, axis=1) == 1)
+
+        faces = self.faces[changed]
+        old_triangles = self.vertices[faces]
+        new_triangles = np.where(moved[changed][:, :, np.newaxis], positions[face_collapses[changed]][:, np.newaxis, :], old_triangles)
+        old_normals = np.cross(old_triangles[:, 1] - old_triangles[:, 0], old_triangles[:, 2] - old_triangles[:, 0])
+        new_normals = np.cross(new_triangles[:, 1] - new_triangles[:, 0], new_triangles[:, 2] - new_triangles[:, 0])
+        flipped = np.sum(old_normals * new_normals, axis=1) <= 0
+
+        rejected = np.zeros(len(edges), dtype=bool)
+        rejected[face_collapses[changed][flipped]] = True
+        return rejected
+
+    def __collapse(self, edges, positions):
+        """
+        Merge the two vertices of each edge, and remove the faces which become degenerated.
+        :param edges: a (n, 2) array of edges to collapse
+        :param positions: the (n, 3) positions of the merged vertices
+        """
+        self.vertices[edges[:, 0]] = positions
+        self.quadrics[edges[:, 0]] += self.quadrics[edges[:, 1]]
+        remap = np.arange(len(self.vertices))
+        remap[edges[:, 1]] = edges[:, 0]
+        self.faces = remap[self.faces]
+        self.faces = self.faces[~MeshSimplifier.is_degenerated(self.faces)]
+
+    @staticmethod
+    def get_costs(quadrics, positions):
+        """
+        Evaluate the quadrics at the positions.
+        :param quadrics: a (n, 4, 4) array
+        :param positions: a (n, 3) array
+        :return: a (n,) array
+        """
+        points = np.hstack([positions, np.ones((len(positions), 1))])
+        return np.einsum('ni,nij,nj->n', points, quadrics, points)
+
+    @staticmethod
+    def is_degenerated(faces):
+        """
+        :param faces: a (n, 3) array of vertex indices
+        :return: a boolean array, True for the faces using a vertex twice
+        """
+        return (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
@@ -1,5 +1,6 @@
 from pathlib import Path
 import numpy as np
+from ..Common import TriangleArray
 
 
 class ObjWriter():
@@ -32,10 +33,11 @@ class ObjWriter():
         """
         Return the index associated to a vertex.
         If no index is associated to the vertex, create a new index and add the vertex to the OBJ's vertices.
-        :param vertex: the vertex
+        :param vertex: the vertex, as np.array or list
         :return: the index associated to the vertex
         """
-        vertex = vertex.tolist()
+        if isinstance(vertex, np.ndarray):
+            vertex = vertex.tolist()
         if not tuple(vertex) in self.vertex_indexes_dict:
             self.vertex_indexes_dict[tuple(vertex)] = self.vertex_index
             self.vertices.append(vertex)
@@ -46,10 +48,11 @@ class ObjWriter():
         """
         Return the index associated to a normal.
         If no index is associated to the normal, create a new index and add the normal to the OBJ's normals.
-        :param normal: the normal
+        :param normal: the normal, as np.array or list
         :return: the index associated to the normal
         """
-        normal = normal.tolist()
+        if isinstance(normal, np.ndarray):
+            normal = normal.tolist()
         if not tuple(normal) in self.normal_indexes_dict:
             self.normal_indexes_dict[tuple(normal)] = self.normal_index
             self.normals.append(normal)
@@ -85,6 +88,21 @@ class ObjWriter():
 
         self.triangles.append([vertex_indexes, normal_indexes])
 
+    def add_triangles(self, triangles, color, offset=np.array([0, 0, 0])):
+        """
+        Add triangles to the OBJ.
+        An offset can be added to the triangles' position.
+        :param triangles: a (n, 3, 3) array
+        :param color: the color of the triangles
+        :param offset: a 3D point as numpy array
+        """
+        normals = TriangleArray.compute_triangle_normals(triangles).tolist()
+        vertices = (triangles + offset).tolist()
+        for triangle, normal in zip(vertices, normals):
+            vertex_indexes = [self.get_vertex_index(vertex, color) for vertex in triangle]
+            normal_index = self.get_normal_index(normal)
+            self.triangles.append([vertex_indexes, [normal_index] * 3])
+
     def add_geometries(self, feature_list, offset=np.array([0, 0, 0])):
         """
         Add 3D features to the OBJ.
@@ -93,8 +111,8 @@ class ObjWriter():
         :param offset: a 3D point as numpy array
         """
         for geometry in feature_list:
-            for triangle in geometry.get_geom_as_triangles():
-                self.add_triangle(triangle, feature_list.materials[geometry.material_index].pbrMetallicRoughness.baseColorFactor[:3], offset)
+            color = feature_list.materials[geometry.material_index].pbrMetallicRoughness.baseColorFactor[:3]
+            self.add_triangles(geometry.get_geom_as_triangles(), color, offset)
 
     def write_obj(self, file_name):
         """
@@ -1,7 +1,7 @@
 import numpy as np
-from ..Common import Feature
-from alphashape import alphashape
-from earclip import triangulate
+from ..Common import Feature, TriangleArray, FootprintExtruder
+import mapbox_earcut as earcut
+import shapely
 from shapely.geometry import Polygon
 from typing import TYPE_CHECKING
 
@@ -10,6 +10,10 @@ if TYPE_CHECKING:
 
 
 class ExtrudedPolygon(Feature):
+
+    # The maximum number of points and triangles of each side used to estimate the deviation of the extrusion
+    MAX_SAMPLES = 2048
+
     def __init__(self, id, features: 'FeatureList', polygon=None):
         """
         Creates a 3D extrusion of the footprint of a list of features.
@@ -24,77 +28,113 @@ class ExtrudedPolygon(Feature):
         self.features = features
         self.set_geom()
 
+    @classmethod
+    def from_triangles(cls, id, features: 'FeatureList', triangles):
+        """
+        Create an extrusion whose triangles are already computed (by a FootprintExtruder).
+        :param id: the ID of the instance
+        :param features: the features replaced by the extrusion
+        :param triangles: the (n, 3, 3) triangles of the extrusion
+        :return: an ExtrudedPolygon
+        """
+        extruded_polygon = cls.__new__(cls)
+        Feature.__init__(extruded_polygon, id)
+        extruded_polygon.polygon = None
+        extruded_polygon.features = features
+        extruded_polygon.feature_list = None
+        extruded_polygon.geom.triangles.append(triangles)
+        extruded_polygon.set_box()
+        return extruded_polygon
+
     def set_geom(self):
         """
         Set the geometry of the feature.
         :return: a boolean
         """
-        geom_triangles = list()
-        for feature in self.features:
-            geom_triangles.extend(feature.get_geom_as_triangles())
-
-        points = list()
-        minZ = np.inf
-        average_maxZ = 0
-
-        # Compute the footprint of the geometry
-        for triangle in geom_triangles:
-            maxZ = -np.inf
-            for point in triangle:
-                if len(point) >= 3:
-                    points.append([point[0], point[1]])
-                    if point[2] < minZ:
-                        minZ = point[2]
-                    if point[2] > maxZ:
-                        maxZ = point[2]
-            average_maxZ += maxZ
-        average_maxZ /= len(geom_triangles)
+        triangles = np.concatenate([feature.get_geom_as_triangles() for feature in self.features])
+
+        self.min_height = float(np.min(triangles[:, :, 2]))
+        self.max_height = float(np.mean(np.max(triangles[:, :, 2], axis=1)))
         if self.polygon is not None:
-            points = self.polygon
+            self.points = np.array(self.polygon, dtype=np.float64)[:, 0:2]
         else:
-            hull = alphashape(points, 0.)
-            try:
-                points = hull.exterior.coords[:-1]
-            except AttributeError:
-                po = hull.parallel_offset(0.1, 'right')
-                points = Polygon([*list(hull.coords), *list(po.coords)[::-1]]).exterior.coords[:-1]
-
-        self.points = points
-        self.min_height = minZ
-        self.max_height = average_maxZ
+            self.points = ExtrudedPolygon.get_footprint(triangles)
 
         self.extrude_footprint()
 
+    @staticmethod
+    def get_footprint(triangles):
+        """
+        Compute the footprint of triangles: the convex hull of their vertices, projected on the XY plane.
+        When the vertices are aligned, the footprint is a thin polygon along the line (see FootprintExtruder).
+        :param triangles: a (n, 3, 3) array
+        :return: a (m, 2) array, the points of the footprint without the closing point
+        """
+        hull = shapely.convex_hull(shapely.multipoints(triangles[:, :, 0:2].reshape((-1, 2))))
+        if not isinstance(hull, Polygon):
+            hull = FootprintExtruder.get_degenerated_footprint(hull)
+        return np.array(hull.exterior.coords)[:-1, 0:2]
+
     def extrude_footprint(self):
         """
         Extrude the 2D footprint to create a triangulated 3D mesh.
+        The footprint is triangulated with earcut, the walls are made of two triangles per edge of the footprint.
         """
-        coordinates = self.points
+        coordinates = np.asarray(self.points, dtype=np.float64)
         length = len(coordinates)
-        vertices = [None] * (2 * length)
-        minZ = self.min_height
-        maxZ = self.max_height
-
-        for i, coord in enumerate(coordinates):
-            vertices[i] = np.array([coord[0], coord[1], minZ])
-            vertices[i + length] = np.array([coord[0], coord[1], maxZ])
+        vertices = np.empty((2 * length, 3))
+        vertices[:, 0:2] = np.tile(coordinates, (2, 1))
+        vertices[0:length, 2] = self.min_height
+        vertices[length:, 2] = self.max_height
 
-        # Contains the triangles vertices. Used to create 3D tiles
-        triangles = list()
-
-        # Triangulate the feature footprint
-        poly_triangles = triangulate(coordinates)
-
-        # Create upper face triangles
-        for tri in poly_triangles:
-            upper_tri = [np.array([coord[0], coord[1], maxZ]) for coord in tri]
-            triangles.append(upper_tri)
+        # Triangulate the feature footprint to create the upper face.
+        # Earcut gives counter-clockwise triangles whatever the orientation of the footprint, so the upper face looks up
+        upper_faces = earcut.triangulate_float64(coordinates, np.array([length], dtype=np.uint32)).reshape((-1, 3)).astype(np.int64) + length
 
         # Create side triangles
-        for i in range(0, length):
-            triangles.append([vertices[i], vertices[length + i], vertices[length + ((i + 1) % length)]])
-            triangles.append([vertices[i], vertices[length + ((i + 1) % length)], vertices[((i + 1) % length)]])
+        current = np.arange(length)
+        following = (current + 1) % length
+        side_faces = np.stack([current, current + length, following + length,
+                               current, following + length, following], axis=1).reshape((-1, 3))
 
         self.feature_list = None
-        self.geom.triangles.append(triangles)
+        self.geom.triangles.append(vertices[np.concatenate([upper_faces, side_faces])])
         self.set_box()
+
+    def get_deviation(self):
+        """
+        Estimate the distance between the extrusion and the features it replaces (a sampled Hausdorff distance):
+        the highest distance from the points of the features to the extrusion, and from the points of the extrusion to the features.
+        The points are the vertices and the centers of the triangles. At most MAX_SAMPLES points and triangles of each side are used,
+        which can only overestimate the distance.
+        :return: a distance, in the units of the vertices
+        """
+        extrusion = self.get_geom_as_triangles()
+        triangles = np.concatenate([feature.get_geom_as_triangles() for feature in self.features])
+        if len(extrusion) == 0 or len(triangles) == 0:
+            return 0.
+        to_extrusion = TriangleArray.get_distances_to_triangles(ExtrudedPolygon.sample_points(triangles), ExtrudedPolygon.sample(extrusion))
+        to_features = TriangleArray.get_distances_to_triangles(ExtrudedPolygon.sample_points(extrusion), ExtrudedPolygon.sample(triangles))
+        return float(max(np.max(to_extrusion), np.max(to_features)))
+
+    @staticmethod
+    def sample(array, max_samples=None):
+        """
+        Keep at most max_samples rows of an array, evenly spaced.
+        :param array: an array
+        :param max_samples: the maximum number of rows, MAX_SAMPLES by default
+        :return: an array
+        """
+        max_samples = ExtrudedPolygon.MAX_SAMPLES if max_samples is None else max_samples
+        if len(array) <= max_samples:
+            return array
+        return array[np.linspace(0, len(array) - 1, max_samples).astype(np.int64)]
+
+    @staticmethod
+    def sample_points(triangles):
+        """
+        Return the vertices and the centers of triangles, at most MAX_SAMPLES points.
+        :param triangles: a (n, 3, 3) array
+        :return: a (m, 3) array
+        """
+        return ExtrudedPolygon.sample(np.concatenate([triangles.reshape((-1, 3)), np.mean(triangles, axis=1)]))
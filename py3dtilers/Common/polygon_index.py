@@ -0,0 +1,38 @@
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from typing import List
+
+
+class PolygonIndex():
+    """
+    A spatial index (STRtree) of polygons, used to find the polygon containing each point of a list.
+    The points are tested in one vectorized query, and only against the polygons whose bounding box contains them.
+    """
+
+    def __init__(self, polygons: List[Polygon]):
+        """
+        :param polygons: a list of Shapely polygons
+        """
+        self.polygons = list(polygons)
+        self.tree = shapely.STRtree(self.polygons)
+
+    def find_containing_polygons(self, points):
+        """
+        Find the polygon containing each point. When several polygons contain a point, the first one
+        (in the order of the polygons given to the index) is kept, like testing the polygons one by one.
+        Only the X and Y coordinates of the points are used.
+        :param points: a list of 2D or 3D points
+        :return: an array with the index of the polygon containing each point, -1 when no polygon contains the point
+        """
+        polygon_indices = np.full(len(points), -1, dtype=np.int64)
+        if len(points) == 0 or len(self.polygons) == 0:
+            return polygon_indices
+        coordinates = np.array(points, dtype=np.float64).reshape((len(points), -1))
+        point_indices, tree_indices = self.tree.query(shapely.points(coordinates[:, 0:2]), predicate='within')
+
+        # Keep the lowest polygon index of each point
+        polygon_indices[:] = len(self.polygons)
+        np.minimum.at(polygon_indices, point_indices, tree_indices)
+        polygon_indices[polygon_indices == len(self.polygons)] = -1
+        return polygon_indices
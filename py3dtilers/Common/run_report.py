@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+
+
+class RunReport():
+    """
+    A static class gathering statistics during a run (cache counters, tile sizes, timings...).
+    The statistics are stored by section, and can be printed or writen as JSON at the end of the run.
+    """
+
+    sections = dict()
+
+    @staticmethod
+    def reset():
+        """Remove all the statistics of the report."""
+        RunReport.sections = dict()
+
+    @staticmethod
+    def get_section(section):
+        """
+        Return a section of the report. The section is created if it doesn't exist.
+        :param section: the name of the section
+        :return: a dictionary
+        """
+        if section not in RunReport.sections:
+            RunReport.sections[section] = dict()
+        return RunReport.sections[section]
+
+    @staticmethod
+    def set_value(section, key, value):
+        """
+        Set a value in a section of the report.
+        :param section: the name of the section
+        :param key: the name of the value
+        :param value: a JSON serializable value
+        """
+        RunReport.get_section(section)[key] = value
+
+    @staticmethod
+    def increment(section, key, value=1):
+        """
+        Increment a counter in a section of the report.
+        :param section: the name of the section
+        :param key: the name of the counter
+        :param value: the increment
+        """
+        section = RunReport.get_section(section)
+        section[key] = section.get(key, 0) + value
+
+    @staticmethod
+    def append_value(section, key, value):
+        """
+        Append a value to a list in a section of the report.
+        :param section: the name of the section
+        :param key: the name of the list
+        :param value: a JSON serializable value
+        """
+        RunReport.get_section(section).setdefault(key, list()).append(value)
+
+    @staticmethod
+    def set_distribution(section, key, values):
+        """
+        Set the summary of a distribution of values in a section of the report.
+        :param section: the name of the section
+        :param key: the name of the distribution
+        :param values: a list of numbers
+        """
+        if len(values) == 0:
+            summary = {'count': 0}
+        else:
+            values = sorted(values)
+            summary = {'count': len(values),
+                       'total': sum(values),
+                       'min': values[0],
+                       'mean': sum(values) / len(values),
+                       'p50': values[(len(values) - 1) // 2],
+                       'p90': values[(9 * (len(values) - 1)) // 10],
+                       'p99': values[(99 * (len(values) - 1)) // 100],
+                       'max': values[-1]}
+        RunReport.set_value(section, key, summary)
+
+    @staticmethod
+    def to_dict():
+        """
+        Return the report as a dictionary.
+        :return: a dictionary
+        """
+        return RunReport.sections
+
+    @staticmethod
+    def print_report():
+        """Print the sections of the report. Lists of values are summarized by their length."""
+        print("Run report:")
+        for section, values in RunReport.sections.items():
+            print("  " + section + ":")
+            for key, value in values.items():
+                if isinstance(value, list):
+                    value = str(len(value)) + " value(s)"
+                print("    " + key + ":", value)
+
+    @staticmethod
+    def write(path):
+        """
+        Write the report as a JSON file.
+        :param path: the path of the JSON file
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(RunReport.to_dict(), f, indent=2)
@@ -0,0 +1,37 @@
+from ..Common import GeometryNode
+from ..Common import SimplifiedFeatureList
+
+
+class SimplifiedNode(GeometryNode):
+    """
+    Creates a simplified version of the features of a node, keeping a ratio of their triangles (quadric edge collapse).
+    Unless a geometric error is given, the geometric error of the node is the highest geometric error
+    of its child nodes plus the error measured during the simplification.
+    """
+
+    DEFAULT_GEOMETRIC_ERROR = None
+
+    def __init__(self, features_node: GeometryNode, ratio=0.5, geometric_error=None):
+        feature_list = SimplifiedFeatureList(features_node=features_node, ratio=ratio)
+        super().__init__(feature_list, geometric_error=geometric_error)
+        # The error of the simplification, as a distance, only known once the geometry of the features is set
+        self.simplification_error = 0.
+
+    def update_geometric_error(self):
+        """
+        Store the geometric error of the node, measured during the simplification of its features.
+        The error is computed once, so it doesn't depend on the features after they are released.
+        """
+        super().update_geometric_error()
+        self.simplification_error = self.feature_list.get_deviation()
+        if self.geometric_error is None:
+            children_error = max([child.geometric_error for child in self.child_nodes], default=GeometryNode.DEFAULT_GEOMETRIC_ERROR)
+            self.geometric_error = children_error + self.simplification_error
+
+    def get_content_error(self, children_error=0.):
+        """
+        The simplification error is measured against the features of the previous level, so it adds to the error of the child nodes.
+        :param children_error: the highest geometric error of the child nodes
+        :return: a distance
+        """
+        return children_error + self.simplification_error
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class SpaceFillingCurve():
+    """
+    Compute the position of points along a 2D space filling curve (Morton or Hilbert curve).
+    The points are snapped on a grid of 2^bits x 2^bits cells covering a bounding box (X and Y only),
+    the key of a point being the index of its cell along the curve.
+    Sorting points by their keys keeps close points close in the sorted list.
+    """
+
+    CURVES = ['morton', 'hilbert']
+
+    def __init__(self, curve='hilbert', mins=None, maxs=None, bits=16):
+        """
+        :param curve: the name of the curve ('morton' or 'hilbert')
+        :param mins: the minimum X and Y of the grid
+        :param maxs: the maximum X and Y of the grid
+        :param bits: the number of bits of each coordinate on the grid
+        """
+        if curve not in SpaceFillingCurve.CURVES:
+            raise ValueError("Unknown space filling curve: " + str(curve))
+        self.curve = curve
+        self.bits = bits
+        self.mins = np.zeros(2) if mins is None else np.array(mins, dtype=np.float64)[0:2]
+        self.maxs = np.ones(2) if maxs is None else np.array(maxs, dtype=np.float64)[0:2]
+
+    @classmethod
+    def from_points(cls, points, curve='hilbert', bits=16):
+        """
+        Create a SpaceFillingCurve whose grid covers the bounding box of points.
+        :param points: a list of 2D or 3D points
+        :param curve: the name of the curve ('morton' or 'hilbert')
+        :param bits: the number of bits of each coordinate on the grid
+        :return: a SpaceFillingCurve
+        """
+        points = SpaceFillingCurve.to_xy(points)
+        if len(points) == 0:
+            return cls(curve, bits=bits)
+        return cls(curve, np.min(points, axis=0), np.max(points, axis=0), bits)
+
+    @staticmethod
+    def to_xy(points):
+        """
+        Convert a list of points into a (n, 2) array of their X and Y coordinates.
+        :param points: a list of 2D or 3D points
+        :return: a (n, 2) array
+        """
+        points = np.array(points, dtype=np.float64)
+        return points.reshape((len(points), -1))[:, 0:2]
+
+    def get_keys(self, points):
+        """
+        Compute the key of each point along the curve.
+        :param points: a list of 2D or 3D points
+        :return: an array of int64 keys
+        """
+        points = SpaceFillingCurve.to_xy(points)
+        size = np.where(self.maxs > self.mins, self.maxs - self.mins, 1.)
+        max_cell = (1 << self.bits) - 1
+        cells = np.clip(np.floor((points - self.mins) / size * max_cell), 0, max_cell).astype(np.int64)
+        if self.curve == 'morton':
+            return SpaceFillingCurve.morton_keys(cells[:, 0], cells[:, 1], self.bits)
+        return SpaceFillingCurve.hilbert_keys(cells[:, 0], cells[:, 1], self.bits)
+
+    def argsort(self, points):
+        """
+        Return the order of the points along the curve. Points with the same key keep their order.
+        :param points: a list of 2D or 3D points
+        :return: an array of indices
+        """
+        return np.argsort(self.get_keys(points), kind='stable')
+
+    @staticmethod
+    def morton_keys(x, y, bits):
+        """
+        Interleave the bits of the cell coordinates (Z-order).
+        :param x: an array of int64 cell coordinates
+        :param y: an array of int64 cell coordinates
+        :param bits: the number of bits of each coordinate
+        :return: an array of int64 keys
+        """
+        keys = np.zeros(len(x), dtype=np.int64)
+        for bit in range(bits):
+            keys |= ((x >> bit) & 1) << (2 * bit)
+            keys |= ((y >> bit) & 1) << (2 * bit + 1)
+        return keys
+
+    @staticmethod
+    def hilbert_keys(x, y, bits):
+        """
+        Compute the distance of the cells along the Hilbert curve.
+        :param x: an array of int64 cell coordinates
+        :param y: an array of int64 cell coordinates
+        :param bits: the number of bits of each coordinate
+        :return: an array of int64 keys
+        """
+        x = x.copy()
+        y = y.copy()
+        n = 1 << bits
+        keys = np.zeros(len(x), dtype=np.int64)
+        s = n >> 1
+        while s > 0:
+            rx = ((x & s) > 0).astype(np.int64)
+            ry = ((y & s) > 0).astype(np.int64)
+            keys += s * s * ((3 * rx) ^ ry)
+            # Rotate the quadrant, so the curve of the next level starts and ends at the right corners
+            flip = (ry == 0) & (rx == 1)
+            x[flip] = n - 1 - x[flip]
+            y[flip] = n - 1 - y[flip]
+            swap = ry == 0
+            x[swap], y[swap] = y[swap], x[swap]
+            s >>= 1
+        return keys
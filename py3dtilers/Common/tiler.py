@@ -3,7 +3,7 @@ from pathlib import Path
 import sys
 import os
 
-from ..Common import LodTree, FromGeometryTreeToTileset, Groups
+from ..Common import LodTree, StreamingLodTree, FromGeometryTreeToTileset, Groups, RunReport, TransformerCache
 from ..Color import ColorConfig
 from ..Texture import Texture
 from typing import TYPE_CHECKING
@@ -41,6 +41,13 @@ class Tiler():
                                  action='store_true',
                                  help='Creates a LOD1 when defined. The LOD1 is a 3D extrusion of the footprint of each object.')
 
+        self.parser.add_argument('--lod1_jobs',
+                                 nargs='?',
+                                 type=int,
+                                 default=1,
+                                 help='Set the number of processes used to extrude the footprints of the LOD1 (default: %(default)s).\
+                                     The features of a tile are extruded by chunks, only the tiles with several chunks use the processes.')
+
         self.parser.add_argument('--offset',
                                  nargs='*',
                                  default=[0, 0, 0],
@@ -69,6 +76,59 @@ class Tiler():
                                  type=str,
                                  help='Output projection.')
 
+        self.parser.add_argument('--crs_threads',
+                                 nargs='?',
+                                 type=int,
+                                 default=1,
+                                 help='Set the number of threads used to reproject the vertices (default: %(default)s).\
+                                     The vertices are reprojected by chunks, which can be processed in parallel.')
+
+        self.parser.add_argument('--fast_enu',
+                                 dest='fast_enu',
+                                 action='store_true',
+                                 help='When used, only the centroid of each tile is reprojected.\
+                                     The vertices are placed with a local East-North-Up frame in the transform of the tile.')
+
+        self.parser.add_argument('--fast_enu_max_error',
+                                 nargs='?',
+                                 type=float,
+                                 default=0.01,
+                                 help='Set the maximum error (in the units of the output CRS) allowed by the --fast_enu mode (default: %(default)s).\
+                                     The tiles with a higher error are fully reprojected.')
+
+        self.parser.add_argument('--jobs',
+                                 nargs='?',
+                                 type=int,
+                                 default=1,
+                                 help='Set the number of processes used to encode and write the tile contents (default: %(default)s).\
+                                     The output is the same as with a single process.')
+
+        self.parser.add_argument('--stream',
+                                 dest='stream',
+                                 action='store_true',
+                                 help='When used, the tiles of each group are created, writen and freed one group at a time,\
+                                     instead of creating the LOD hierarchy of all the groups before writing the tiles.')
+
+        self.parser.add_argument('--memory_budget',
+                                 nargs='?',
+                                 type=float,
+                                 help='Set the maximum size (in MB) of the tiles waiting to be encoded by the processes of --jobs.\
+                                     When the budget is reached, the next tiles wait until pending tiles are writen.\
+                                     Requires --jobs (greater than 1): it does not limit the memory used to read and group the features.')
+
+        self.parser.add_argument('--io_threads',
+                                 nargs='?',
+                                 type=int,
+                                 default=0,
+                                 help='Set the number of threads writing the tile contents and the atlas images in the background (default: %(default)s).\
+                                     When 0, the files are writen by the process encoding the tiles.')
+
+        self.parser.add_argument('--io_queue',
+                                 nargs='?',
+                                 type=int,
+                                 default=32,
+                                 help='Set the maximum number of files waiting to be writen by the --io_threads (default: %(default)s).')
+
         self.parser.add_argument('--with_texture',
                                  dest='with_texture',
                                  action='store_true',
@@ -79,6 +139,18 @@ class Tiler():
                                  action='store_true',
                                  help='If specified, no normals will be written to glTf, useful for Photogrammetry meshes')
 
+        self.parser.add_argument('--weld',
+                                 dest='weld',
+                                 action='store_true',
+                                 help='If specified, the identical vertices of each tile are merged and the glTf geometry is indexed\
+                                     (uint16 or uint32 indices), which reduces the size of the tiles.')
+
+        self.parser.add_argument('--quantize',
+                                 dest='quantize',
+                                 action='store_true',
+                                 help='If specified, the positions, normals, UVs and vertex colors are stored as normalized integers\
+                                     in the glTf (KHR_mesh_quantization), which reduces the size of the tiles.')
+
         self.parser.add_argument('--quality',
                                  nargs='?',
                                  type=int,
@@ -97,6 +169,23 @@ class Tiler():
                                  choices=['jpg', 'JPG', 'jpeg', 'JPEG', 'png', 'PNG'],
                                  help='Set the image file format (PNG or JPEG).')
 
+        self.parser.add_argument('--atlas_padding',
+                                 nargs='?',
+                                 type=int,
+                                 help='Set the number of pixels left between the textures in the atlas images. Default is 1.')
+
+        self.parser.add_argument('--atlas_npot',
+                                 dest='atlas_npot',
+                                 action='store_true',
+                                 help='If specified, the size of the atlas images is not rounded to a power of two.')
+
+        self.parser.add_argument('--max_atlas_size',
+                                 nargs='?',
+                                 type=int,
+                                 help='Set the maximum width and height (in pixels) of the atlas images. The textures which do not fit\
+                                    are written in other atlas images. By default (or with 0), the size is not limited.\
+                                    4096 is recommended, since it is the largest texture size supported by most GPUs.')
+
         self.parser.add_argument('--output_dir',
                                  '--out',
                                  '-o',
@@ -119,12 +208,53 @@ class Tiler():
                                  help='The geometric errors of the nodes.\
                                      Used (from left ro right) for basic nodes, LOD1 nodes and LOA nodes.')
 
+        self.parser.add_argument('--auto_geometric_error',
+                                 dest='auto_geometric_error',
+                                 action='store_true',
+                                 help='When used, the geometric error of each tile is computed from its features\
+                                     (deviation of the LODs against the features they replace, texel size of the texture LODs,\
+                                     diagonal of the tileset for the root tile) instead of using --geometric_error.')
+
+        self.parser.add_argument('--bvh',
+                                 nargs='?',
+                                 type=int,
+                                 const=8,
+                                 help='When used, the tiles are placed in a hierarchy of tiles without content instead of being the children of the root tile.\
+                                     Can be followed by the maximum number of children of each tile of the hierarchy (default: %(const)s).\
+                                     The geometric error of the tiles of the hierarchy is the diagonal of their box, bounded by the error of the root tile (500),\
+                                     except with --auto_geometric_error where the root error is raised to the errors of the hierarchy.')
+
         self.parser.add_argument('--kd_tree_max',
                                  nargs='?',
                                  type=int,
                                  help='Set the maximum number of features in each tile when the features are distributed by a kd-tree.\
                                      The value must be an integer.')
 
+        self.parser.add_argument('--kd_tree_3d',
+                                 dest='kd_tree_3d',
+                                 action='store_true',
+                                 help='When used, the kd-tree splits the features along the longest axis of their bounding box,\
+                                     including the vertical axis, instead of alternating the X and Y axes.')
+
+        self.parser.add_argument('--space_filling_curve',
+                                 nargs='?',
+                                 const='hilbert',
+                                 choices=['morton', 'hilbert'],
+                                 help='When used, the tiles and the features of each tile are ordered along a space filling curve,\
+                                     so close tiles get close indices. Can be followed by the curve to use (default: %(const)s).')
+
+        self.parser.add_argument('--max_tile_triangles',
+                                 nargs='?',
+                                 type=int,
+                                 help='Set the maximum number of triangles in each tile when the features are distributed by a kd-tree.\
+                                     A feature with more triangles is put alone in its tile.')
+
+        self.parser.add_argument('--max_tile_bytes',
+                                 nargs='?',
+                                 type=int,
+                                 help='Set the maximum estimated size (in bytes) of the geometry of each tile when the features are distributed by a kd-tree.\
+                                     A bigger feature is put alone in its tile.')
+
         self.parser.add_argument('--texture_lods',
                                  '--tl',
                                  nargs='?',
@@ -133,6 +263,13 @@ class Tiler():
                                  help='Set the number of levels of detail that will be created for each textured tile.\
                                      Each level of detail will be a tile with a less detailled image but the same geometry.')
 
+        self.parser.add_argument('--simplify',
+                                 nargs='+',
+                                 type=float,
+                                 default=[],
+                                 help='Create a simplified level of detail for each ratio, keeping this ratio of the triangles of the features.\
+                                     The ratios must be between 0 and 1, e.g. --simplify 0.5 0.1')
+
         self.parser.add_argument('--keep_ids',
                                  nargs='*',
                                  default=[],
@@ -145,6 +282,12 @@ class Tiler():
                                  type=str,
                                  help='If present, exlude the features which have their ID in the list.')
 
+        self.parser.add_argument('--report',
+                                 nargs='?',
+                                 type=str,
+                                 help='When defined, write a report of the run (cache counters, tile statistics...) in a JSON file.\
+                                    The flag must be followed by the path of the JSON file.')
+
         self.parser.add_argument('--as_lods',
                                  dest='as_lods',
                                  action='store_true',
@@ -152,6 +295,7 @@ class Tiler():
 
     def parse_command_line(self):
         self.args, _ = self.parser.parse_known_args()
+        RunReport.reset()
 
         if self.args.paths is None or len(self.args.paths) == 0:
             if self.default_input_path is not None:
@@ -165,6 +309,9 @@ class Tiler():
         if self.args.obj is not None and '.obj' not in self.args.obj:
             self.args.obj = self.args.obj + '.obj'
 
+        if self.args.report is not None and '.json' not in self.args.report:
+            self.args.report = self.args.report + '.json'
+
         if len(self.args.offset) < 3:
             [self.args.offset.append(0) for _ in range(len(self.args.offset), 3)]
         elif len(self.args.offset) > 3:
@@ -177,12 +324,22 @@ class Tiler():
             self.args.geometric_error[i] = float(val) if val is not None and val.lstrip('-').replace('.', '', 1).isdigit() else None
         [self.args.geometric_error.append(None) for _ in range(len(self.args.geometric_error), 3)]
 
+        if self.args.memory_budget is not None and (self.args.jobs is None or self.args.jobs <= 1):
+            print("The flag --memory_budget is ignored without --jobs")
+
+        self.args.simplify = sorted([ratio for ratio in self.args.simplify if 0 < ratio < 1], reverse=True)
+
         if self.args.quality is not None:
             Texture.set_texture_quality(self.args.quality)
         if self.args.compress_level is not None:
             Texture.set_texture_compress_level(self.args.compress_level)
         if self.args.format is not None:
             Texture.set_texture_format(self.args.format)
+        if self.args.atlas_padding is not None:
+            Texture.set_atlas_padding(self.args.atlas_padding)
+        Texture.set_atlas_power_of_two(not self.args.atlas_npot)
+        if self.args.max_atlas_size is not None:
+            Texture.set_max_atlas_size(self.args.max_atlas_size)
 
     def retrieve_files(self, paths):
         """
@@ -247,7 +404,8 @@ class Tiler():
                 print("No feature left, exiting")
                 sys.exit(1)
             print("Distribution of the", len(feature_list), "feature(s)...")
-        groups = Groups(feature_list, self.args.loa, self.get_kd_tree_max(), self.args.as_lods).get_groups_as_list()
+        groups = Groups(feature_list, self.args.loa, self.get_kd_tree_max(), self.args.as_lods, self.args.max_tile_triangles, self.args.max_tile_bytes,
+                        self.args.kd_tree_3d, self.args.space_filling_curve).get_groups_as_list()
         feature_list.delete_features_ref()
         return self.create_tileset_from_groups(groups, extension_name)
 
@@ -264,11 +422,25 @@ class Tiler():
 
         if self.args.as_lods:
             tree = LodTree.vertical_hierarchy(groups, geometric_errors)
+        elif self.args.stream:
+            tree = StreamingLodTree(groups, self.args.lod1, create_loa, self.args.with_texture, geometric_errors, self.args.texture_lods, self.args.simplify)
         else:
-            tree = LodTree(groups, self.args.lod1, create_loa, self.args.with_texture, geometric_errors, self.args.texture_lods)
+            tree = LodTree(groups, self.args.lod1, create_loa, self.args.with_texture, geometric_errors, self.args.texture_lods, self.args.simplify)
 
         self.create_output_directory()
-        return FromGeometryTreeToTileset.convert_to_tileset(tree, self.args, extension_name, self.get_output_dir(), with_normals=with_normals)
+        tileset = FromGeometryTreeToTileset.convert_to_tileset(tree, self.args, extension_name, self.get_output_dir(), with_normals=with_normals)
+        self.write_report()
+        return tileset
+
+    def write_report(self):
+        """
+        Print the report of the run and write it in a JSON file, if the user asked for it.
+        """
+        if getattr(self.args, 'report', None) is None:
+            return
+        RunReport.set_value('transformer_cache', 'size', len(TransformerCache.transformers))
+        RunReport.print_report()
+        RunReport.write(self.args.report)
 
     def create_output_directory(self):
         """
@@ -1,6 +1,7 @@
+import copy
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import numpy as np
-from pyproj import Transformer
 from sortedcollections import OrderedSet
 from pygltflib import VEC3, FLOAT
 from py3dtiles.tileset.content import B3dm, GltfAttribute, GltfPrimitive
@@ -8,8 +9,9 @@ from py3dtiles.tileset.content.batch_table import BatchTable
 from py3dtiles.tileset.content.b3dm_feature_table import B3dmFeatureTable
 from py3dtiles.tileset import Tile, BoundingVolumeBox
 from ..Kit3d.tileset import Kit3DTileset
-from ..Texture import Atlas
+from ..Texture import Atlas, Texture
 from ..Common import ObjWriter
+from ..Common import TriangleArray, TransformPipeline, TransformerCache, LocalFrame, RunReport, BackgroundWriter, MeshQuantizer
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -23,6 +25,20 @@ class FromGeometryTreeToTileset():
 
     tile_index = 0
     nb_nodes = 0
+    # The process pool encoding the tile contents (None when the tiles are encoded by the main process)
+    executor = None
+    jobs = 1
+    # The pending tile contents, with their estimated size in bytes
+    futures = dict()
+    # The maximum size (in bytes) of the tile contents waiting to be encoded by the process pool
+    memory_budget = None
+    # The threads writing the files of the main process (None when the files are writen immediately)
+    writer = None
+    # The size (in bytes) and the number of triangles of the tiles created, added to the run report
+    tile_bytes = list()
+    tile_triangles = list()
+    # The packing efficiency of the texture atlases created, added to the run report
+    atlas_efficiencies = list()
 
     @staticmethod
     def convert_to_tileset(geometry_tree: 'GeometryTree', user_arguments=None, extension_name=None, output_dir=None, with_normals=True):
@@ -40,14 +56,51 @@ class FromGeometryTreeToTileset():
         root_tile = Tile(geometric_error=500, bounding_volume=BoundingVolumeBox())
         FromGeometryTreeToTileset.tile_index = 0
         FromGeometryTreeToTileset.nb_nodes = geometry_tree.get_number_of_nodes()
+        FromGeometryTreeToTileset.tile_bytes = list()
+        FromGeometryTreeToTileset.tile_triangles = list()
+        FromGeometryTreeToTileset.atlas_efficiencies = list()
         obj_writer = ObjWriter()
         tree_centroid = geometry_tree.get_centroid()
-        while len(geometry_tree.root_nodes) > 0:
-            root_node = geometry_tree.root_nodes[0]
-            root_node.set_node_features_geometry(user_arguments)
-            offset = FromGeometryTreeToTileset.__transform_node(root_node, user_arguments, tree_centroid, obj_writer=obj_writer)
-            root_tile.add_child(FromGeometryTreeToTileset.__create_tile(root_node, offset, extension_name, output_dir, with_normals))
-            geometry_tree.root_nodes.remove(root_node)
+        weld = getattr(user_arguments, 'weld', False)
+        quantize = getattr(user_arguments, 'quantize', False)
+        FromGeometryTreeToTileset.__start_executor(getattr(user_arguments, 'jobs', 1), getattr(user_arguments, 'memory_budget', None))
+        FromGeometryTreeToTileset.__start_writer(getattr(user_arguments, 'io_threads', 0), getattr(user_arguments, 'io_queue', 32))
+        try:
+            tiles = list()
+            for root_node in geometry_tree.pop_root_nodes():
+                root_node.set_node_features_geometry(user_arguments)
+                transform = FromGeometryTreeToTileset.__transform_node(root_node, user_arguments, tree_centroid, obj_writer=obj_writer)
+                tiles.append(FromGeometryTreeToTileset.__create_tile(root_node, transform, extension_name, output_dir, with_normals, weld, quantize))
+        finally:
+            try:
+                FromGeometryTreeToTileset.__stop_executor()
+            finally:
+                FromGeometryTreeToTileset.__stop_writer()
+
+        auto_geometric_error = getattr(user_arguments, 'auto_geometric_error', False)
+        max_children = getattr(user_arguments, 'bvh', None)
+        if max_children is not None and len(tiles) > max_children:
+            # Without --auto_geometric_error, the root tile keeps its error, which bounds the errors of the hierarchy
+            max_error = None if auto_geometric_error else root_tile.geometric_error
+            tiles = FromGeometryTreeToTileset.__create_hierarchy(tiles, max(max_children, 2), max_error)
+        if auto_geometric_error and len(tiles) > 0:
+            # Without any tile rendered, the error is the size of the whole tileset
+            boxes = FromGeometryTreeToTileset.__get_bounds(tiles)
+            root_tile.geometric_error = float(np.linalg.norm(np.max(boxes[:, 3:6], axis=0) - np.min(boxes[:, 0:3], axis=0)))
+        for tile in tiles:
+            root_tile.add_child(tile)
+            if auto_geometric_error:
+                root_tile.geometric_error = max(root_tile.geometric_error, tile.geometric_error)
+        if auto_geometric_error:
+            # Without --auto_geometric_error, the errors given by the user and by the nodes are kept as they are
+            FromGeometryTreeToTileset.__check_geometric_errors(root_tile)
+        # The geometric error of the tileset is the error when the root tile isn't rendered
+        tileset.geometric_error = root_tile.geometric_error if auto_geometric_error else max(tileset.geometric_error, root_tile.geometric_error)
+
+        RunReport.set_distribution('tile_sizes', 'bytes', FromGeometryTreeToTileset.tile_bytes)
+        RunReport.set_distribution('tile_sizes', 'triangles', FromGeometryTreeToTileset.tile_triangles)
+        if len(FromGeometryTreeToTileset.atlas_efficiencies) > 0:
+            RunReport.set_distribution('atlas', 'efficiency', FromGeometryTreeToTileset.atlas_efficiencies)
 
         if user_arguments.obj is not None:
             obj_writer.write_obj(user_arguments.obj)
@@ -64,27 +117,50 @@ class FromGeometryTreeToTileset():
         :param node: the GeometryNode to transform.
         :param user_args: the Namespace containing the arguments of the command line.
         :param obj_writer: the writer used to create the OBJ model.
+        :return: the 4x4 transform of the tile created from the node.
         """
+        # The height multiplier, the scale, the offset and the reprojection are applied in a single pass
+        pipeline = TransformPipeline(getattr(user_args, 'crs_threads', 1))
         if hasattr(user_args, 'height_mult') and user_args.height_mult:
-            for feature_list in node.get_features():
-                feature_list.height_mult_features(user_args.height_mult)
+            pipeline.add_height_mult(user_args.height_mult)
             tree_centroid = np.array([tree_centroid[0], tree_centroid[1], tree_centroid[2] * user_args.height_mult])
 
         if hasattr(user_args, 'scale') and user_args.scale:
-            for feature_list in node.get_features():
-                feature_list.scale_features(user_args.scale, tree_centroid)
+            pipeline.add_scale(user_args.scale, tree_centroid)
 
         offset = np.array([0, 0, 0]) if user_args.offset[0] == 'centroid' else np.array(user_args.offset)
-        transform_offset = node.feature_list.get_centroid() + offset
+        change_crs = not user_args.crs_in == user_args.crs_out
+        # The OBJ model needs the reprojected vertices, so the local frame is only used without OBJ output
+        fast_enu = change_crs and getattr(user_args, 'fast_enu', False) and user_args.obj is None
 
-        if not user_args.crs_in == user_args.crs_out:
-            transformer = Transformer.from_crs(user_args.crs_in, user_args.crs_out, always_xy=True) # 증요: always_xy 옵션 추가
+        if change_crs:
+            transformer = TransformerCache.get_transformer(user_args.crs_in, user_args.crs_out, always_xy=True) # 증요: always_xy 옵션 추가
             tree_centroid = np.array(transformer.transform((tree_centroid + offset)[0], (tree_centroid + offset)[1], (tree_centroid + offset)[2]))
-            for feature_list in node.get_features():
-                feature_list.change_crs(transformer, offset)
-            transform_offset = node.feature_list.get_centroid()
+            pipeline.add_translation(offset)
+            if not fast_enu:
+                pipeline.set_reprojection(transformer)
 
-        distance = node.feature_list.get_centroid() - tree_centroid
+        for feature_list in node.get_features():
+            feature_list.transform_features(pipeline)
+
+        local_frame = None
+        if fast_enu:
+            local_frame = FromGeometryTreeToTileset.__create_local_frame(node, transformer, user_args.fast_enu_max_error)
+            if local_frame is None:
+                reprojection = TransformPipeline(getattr(user_args, 'crs_threads', 1))
+                reprojection.set_reprojection(transformer)
+                for feature_list in node.get_features():
+                    feature_list.transform_features(reprojection)
+
+        # With a local frame, the features stay in the input CRS and only the centroid is reprojected
+        centroid = node.feature_list.get_centroid() if local_frame is None else local_frame.center
+        transform_offset = centroid if change_crs else centroid + offset
+
+        distance = centroid - tree_centroid
+
+        if getattr(user_args, 'auto_geometric_error', False):
+            # The errors are computed once the features are in the output CRS, before each FeatureList is centered
+            node.compute_geometric_error()
 
         for feature_list in node.get_features():
             feature_list.translate_features(-feature_list.get_centroid())
@@ -93,16 +169,46 @@ class FromGeometryTreeToTileset():
             for leaf in node.get_leaves():
                 # Since the tiles are centered on [0, 0, 0], we use an offset to place the geometries in the OBJ model
                 obj_writer.add_geometries(leaf.feature_list, offset=distance)
-        return distance if user_args.offset[0] == 'centroid' else transform_offset
+
+        translation = distance if user_args.offset[0] == 'centroid' else transform_offset
+        if local_frame is not None:
+            return local_frame.get_transform(translation)
+        return np.array([[1, 0, 0, translation[0]],
+                         [0, 1, 0, translation[1]],
+                         [0, 0, 1, translation[2]],
+                         [0, 0, 0, 1]])
+
+    @staticmethod
+    def __create_local_frame(node: 'GeometryNode', transformer, max_error):
+        """
+        Create the local frame of a node, centered on the centroid of its features (in the input CRS).
+        The approximation error of the frame is added to the run report.
+        :param node: the GeometryNode.
+        :param transformer: the pyproj Transformer used to change the crs.
+        :param max_error: the maximum error allowed, in the units of the output CRS.
+        :return: a LocalFrame, or None when the error is above the maximum error.
+        """
+        boxes = [feature_list.get_geometry_store().get_bounding_boxes() for feature_list in node.get_features()]
+        mins = np.nanmin(np.concatenate([box[0] for box in boxes]), axis=0)
+        maxs = np.nanmax(np.concatenate([box[1] for box in boxes]), axis=0)
+
+        local_frame = LocalFrame(transformer, node.feature_list.get_centroid(), maxs - mins)
+        error = local_frame.get_max_error(mins, maxs)
+        fallback = not error <= max_error
+        RunReport.append_value('fast_enu', 'tiles', {'tile': FromGeometryTreeToTileset.tile_index, 'max_error': error, 'fallback': fallback})
+        RunReport.increment('fast_enu', 'fallbacks' if fallback else 'local_frames')
+        return None if fallback else local_frame
 
     @staticmethod
-    def __create_tile(node: 'GeometryNode', transform_offset, extension_name=None, output_dir=None, with_normals=True):
+    def __create_tile(node: 'GeometryNode', transform, extension_name=None, output_dir=None, with_normals=True, weld=False, quantize=False):
         """
         Create a tile from a node. Recursively create tiles from the children of the node.
         :param node: the GeometryNode.
-        :param transform_offset: the X,Y,Z position of the tile, relative to its parent's position.
+        :param transform: the 4x4 transform of the tile, relative to its parent's frame.
         :param extension_name: the name of the extension to create.
         :param output_dir: the directory where the tiles will be created.
+        :param weld: if True, the identical vertices are merged and the tile geometry is indexed.
+        :param quantize: if True, the vertex attributes are stored as normalized integers.
         """
         print("\r" + str(FromGeometryTreeToTileset.tile_index), "/", str(FromGeometryTreeToTileset.nb_nodes), "tiles created", end='', flush=True)
         feature_list = node.feature_list
@@ -111,9 +217,32 @@ class FromGeometryTreeToTileset():
                     content_uri=Path('tiles', f'{FromGeometryTreeToTileset.tile_index}.b3dm'),
                     refine_mode='REPLACE')
 
-        tile.tile_content = FromGeometryTreeToTileset.__create_tile_content(feature_list, extension_name, node.has_texture(), node.downsample_factor, with_normals)
-        tile.write_content(output_dir)
-        del tile.tile_content.body  # Delete the binary body of the tile once writen on disk to free the memory
+        if FromGeometryTreeToTileset.executor is None:
+            writer = FromGeometryTreeToTileset.writer
+            extension = FromGeometryTreeToTileset.__create_batch_table_extension(feature_list, extension_name)
+            tile.tile_content = FromGeometryTreeToTileset.__create_tile_content(feature_list, extension, node.has_texture(), node.downsample_factor, with_normals, writer=writer, weld=weld, quantize=quantize)
+            if writer is None:
+                tile.write_content(output_dir)
+            else:
+                # The tile is encoded here, only the file is writen in the background
+                writer.write_bytes(Path(output_dir, tile.content_uri), tile.tile_content.to_array().tobytes())
+            FromGeometryTreeToTileset.tile_bytes.append(tile.tile_content.header.tile_byte_length)
+            del tile.tile_content.body  # Delete the binary body of the tile once writen on disk to free the memory
+        else:
+            # The atlas number is reserved here to keep the same file names as when the tiles are created one by one
+            atlas_number = Atlas.reserve_tile_number() if node.has_texture() else None
+            # The textures and the extension can be read from the database of the tiler (CityTiler),
+            # whose connection isn't shared with the processes: they are loaded here and sent with the features
+            if node.has_texture() and feature_list.textures is None:
+                feature_list.textures = feature_list.get_textures()
+            extension = FromGeometryTreeToTileset.__create_batch_table_extension(feature_list, extension_name)
+            FromGeometryTreeToTileset.__submit_tile_content(tile.content_uri, output_dir, feature_list, extension, node.has_texture(), node.downsample_factor, with_normals, atlas_number, weld, quantize)
+
+        FromGeometryTreeToTileset.tile_triangles.append(sum([feature.get_number_of_triangles() for feature in feature_list]))
+        if not any(getattr(child_node, 'feature_list', None) is feature_list for child_node in node.child_nodes):
+            # No other tile uses the atlas or the textures of the features
+            feature_list.atlas = None
+            feature_list.textures = None
 
         bounding_box = BoundingVolumeBox()
         for feature in feature_list:
@@ -130,19 +259,228 @@ class FromGeometryTreeToTileset():
 
         FromGeometryTreeToTileset.tile_index += 1
         for child_node in node.child_nodes:
-            tile.add_child(FromGeometryTreeToTileset.__create_tile(child_node, [0., 0., 0.], extension_name, output_dir, with_normals))
+            tile.add_child(FromGeometryTreeToTileset.__create_tile(child_node, np.identity(4), extension_name, output_dir, with_normals, weld, quantize))
 
-        tile.transform = np.array([[1, 0, 0, transform_offset[0]],
-                                   [0, 1, 0, transform_offset[1]],
-                                   [0, 0, 1, transform_offset[2]],
-                                   [0, 0, 0, 1]])
+        tile.transform = transform
 
         return tile
 
     @staticmethod
-    def __create_tile_content(feature_list: 'FeatureList', extension_name=None, with_texture=False, downsample_factor=1, with_normals=True):
+    def __create_hierarchy(tiles, max_children, max_error=None):
+        """
+        Distribute tiles into a hierarchy of tiles without content (a bounding volume hierarchy).
+        The tiles are recursively split on the median of their centers, along the longest axis of the centers,
+        until each tile of the hierarchy has at most max_children children.
+        The geometric error of a tile of the hierarchy is the diagonal of its bounding box,
+        or the highest geometric error of its children when it is higher, bounded by max_error.
+        :param tiles: the tiles to distribute, placed in the frame of the root tile by their transform.
+        :param max_children: the maximum number of children of each tile.
+        :param max_error: the maximum geometric error of the tiles of the hierarchy (the error of their parent), None for no limit.
+        :return: at most max_children tiles, containing all the tiles
+        """
+        boxes = FromGeometryTreeToTileset.__get_bounds(tiles)
+        centers = (boxes[:, 0:3] + boxes[:, 3:6]) / 2
+
+        def split(indices, parts):
+            if parts <= 1 or len(indices) <= 1:
+                return [indices]
+            extent = np.ptp(centers[indices], axis=0)
+            order = indices[np.argsort(centers[indices, int(np.argmax(extent))], kind='stable')]
+            median = len(order) // 2
+            return split(order[:median], parts // 2) + split(order[median:], parts - parts // 2)
+
+        def create_node(indices, depth):
+            if len(indices) <= max_children:
+                return [tiles[i] for i in indices], depth
+            children = list()
+            max_depth = depth
+            for part in split(indices, max_children):
+                part_children, part_depth = create_node(part, depth + 1)
+                max_depth = max(max_depth, part_depth)
+                if len(part_children) == 1:
+                    children.extend(part_children)
+                    continue
+                mins = np.min(boxes[part, 0:3], axis=0)
+                maxs = np.max(boxes[part, 3:6], axis=0)
+                geometric_error = max([float(np.linalg.norm(maxs - mins))] + [child.geometric_error for child in part_children])
+                if max_error is not None:
+                    geometric_error = min(geometric_error, max_error)
+                node = Tile(geometric_error=geometric_error, bounding_volume=BoundingVolumeBox(), refine_mode='ADD')
+                for child in part_children:
+                    node.add_child(child)
+                children.append(node)
+                RunReport.increment('hierarchy', 'interior_tiles')
+            return children, max_depth
+
+        children, depth = create_node(np.arange(len(tiles)), 1)
+        RunReport.set_value('hierarchy', 'depth', depth)
+        return children
+
+    @staticmethod
+    def __get_bounds(tiles):
+        """
+        Compute the axis aligned bounds of the tiles, in the frame of their parent.
+        :param tiles: a list of tiles, placed in the frame of their parent by their transform.
+        :return: a (n, 6) array with the mins and the maxs of each tile
+        """
+        boxes = list()
+        for tile in tiles:
+            box = copy.deepcopy(tile.bounding_volume)
+            box.transform(tile.transform)
+            corners = np.array(box.get_corners())
+            boxes.append(np.concatenate([np.min(corners, axis=0), np.max(corners, axis=0)]))
+        return np.array(boxes)
+
+    @staticmethod
+    def __check_geometric_errors(tile):
+        """
+        Check that the geometric error of each tile is at least the geometric error of its children (recursively).
+        Otherwise a viewer could refine a tile into children requiring a further refinement at the same distance.
+        The geometric error of such a tile is raised to the highest error of its children, the corrections are added to the run report.
+        :param tile: the root tile
+        """
+        children_error = 0
+        for child in tile.children:
+            FromGeometryTreeToTileset.__check_geometric_errors(child)
+            children_error = max(children_error, child.geometric_error)
+        report = RunReport.get_section('geometric_error')
+        report['raised_tiles'] = report.get('raised_tiles', 0)
+        if children_error > tile.geometric_error:
+            report['raised_tiles'] += 1
+            report['max_raise'] = max(report.get('max_raise', 0), children_error - tile.geometric_error)
+            tile.geometric_error = children_error
+
+    @staticmethod
+    def __start_executor(jobs, memory_budget=None):
+        """
+        Create the process pool encoding the tile contents.
+        The texture settings are given to the workers, since they can be started without a copy of the main process.
+        :param jobs: the number of processes. When lower than 2, the tiles are encoded by the main process.
+        :param memory_budget: the maximum size (in MB) of the tiles waiting to be encoded, None for no limit.
+        """
+        FromGeometryTreeToTileset.futures = dict()
+        FromGeometryTreeToTileset.jobs = jobs if jobs is not None and jobs > 1 else 1
+        FromGeometryTreeToTileset.memory_budget = memory_budget * 1024 * 1024 if memory_budget is not None else None
+        if FromGeometryTreeToTileset.jobs > 1:
+            texture_settings = (Texture.folder, Texture.quality, Texture.compress_level, Texture.format,
+                                Texture.atlas_padding, Texture.atlas_power_of_two, Texture.max_atlas_size)
+            FromGeometryTreeToTileset.executor = ProcessPoolExecutor(max_workers=FromGeometryTreeToTileset.jobs,
+                                                                     initializer=FromGeometryTreeToTileset.init_worker,
+                                                                     initargs=texture_settings)
+
+    @staticmethod
+    def __stop_executor():
+        """
+        Wait until all the tile contents are written, then stop the process pool.
+        The errors raised while encoding a tile are raised again here.
+        """
+        if FromGeometryTreeToTileset.executor is None:
+            return
+        try:
+            for future in FromGeometryTreeToTileset.futures:
+                FromGeometryTreeToTileset.__add_result(future.result())
+        finally:
+            FromGeometryTreeToTileset.executor.shutdown(cancel_futures=True)
+            FromGeometryTreeToTileset.executor = None
+            FromGeometryTreeToTileset.futures = dict()
+
+    @staticmethod
+    def __start_writer(threads, queue_size):
+        """
+        Create the threads writing the tile contents and the atlas images of the main process.
+        :param threads: the number of threads. When lower than 1, the files are writen immediately.
+        :param queue_size: the maximum number of files waiting to be writen.
+        """
+        if threads is not None and threads > 0:
+            FromGeometryTreeToTileset.writer = BackgroundWriter(threads, queue_size if queue_size is not None and queue_size > 0 else 1)
+
+    @staticmethod
+    def __stop_writer():
+        """
+        Wait until all the pending files are writen, then stop the writing threads.
+        """
+        if FromGeometryTreeToTileset.writer is None:
+            return
+        try:
+            FromGeometryTreeToTileset.writer.flush()
+        finally:
+            FromGeometryTreeToTileset.writer = None
+
+    @staticmethod
+    def __submit_tile_content(content_uri, output_dir, feature_list: 'FeatureList', *content_args):
+        """
+        Send the features of a tile to the process pool, which encodes and writes the content of the tile.
+        To bound the memory used by the pending tiles, wait when each process already has two tiles to encode,
+        or when the pending tiles would exceed the memory budget.
+        :param content_uri: the path of the tile content, relative to the output directory.
+        :param output_dir: the directory where the tiles are created.
+        :param feature_list: the features of the tile.
+        :param content_args: the other arguments used to create the tile content.
+        """
+        futures = FromGeometryTreeToTileset.futures
+        budget = FromGeometryTreeToTileset.memory_budget
+        size = feature_list.get_memory_size()
+        while len(futures) > 0 and (len(futures) >= 2 * FromGeometryTreeToTileset.jobs or (budget is not None and sum(futures.values()) + size > budget)):
+            done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                FromGeometryTreeToTileset.__add_result(future.result())
+                del futures[future]
+        futures[FromGeometryTreeToTileset.executor.submit(FromGeometryTreeToTileset.write_tile_content, content_uri, output_dir, feature_list, *content_args)] = size
+
+        in_flight = RunReport.get_section('in_flight')
+        in_flight['max_tiles'] = max(in_flight.get('max_tiles', 0), len(futures))
+        in_flight['max_bytes'] = max(in_flight.get('max_bytes', 0), sum(futures.values()))
+
+    @staticmethod
+    def __add_result(result):
+        """
+        Add the result of a tile encoded by the process pool to the statistics of the run report.
+        :param result: the size of the tile content and the efficiencies of the atlases created by the process
+        """
+        tile_byte_length, atlas_efficiencies = result
+        FromGeometryTreeToTileset.tile_bytes.append(tile_byte_length)
+        FromGeometryTreeToTileset.atlas_efficiencies.extend(atlas_efficiencies)
+
+    @staticmethod
+    def init_worker(folder, quality, compress_level, format, atlas_padding=1, atlas_power_of_two=True, max_atlas_size=None):
+        """
+        Initialize a process of the pool with the texture settings of the main process.
+        """
+        Texture.folder = folder
+        Texture.quality = quality
+        Texture.compress_level = compress_level
+        Texture.format = format
+        Texture.atlas_padding = atlas_padding
+        Texture.atlas_power_of_two = atlas_power_of_two
+        Texture.max_atlas_size = max_atlas_size
+
+    @staticmethod
+    def write_tile_content(content_uri, output_dir, feature_list: 'FeatureList', extension=None, with_texture=False, downsample_factor=1, with_normals=True, atlas_number=None, weld=False, quantize=False):
+        """
+        Create the content of a tile and write it on disk. Called by the processes of the pool.
+        :param content_uri: the path of the tile content, relative to the output directory.
+        :param output_dir: the directory where the tiles are created.
+        :param feature_list: the features of the tile, with their textures when the tile is textured.
+        :param extension: the batch table extension of the tile, created by the main process.
+        :param atlas_number: the number of the texture atlas of the tile.
+        :param weld: if True, the identical vertices are merged and the tile geometry is indexed.
+        :param quantize: if True, the vertex attributes are stored as normalized integers.
+        :return: the size of the tile content (in bytes), and the packing efficiency of the atlases created
+        """
+        FromGeometryTreeToTileset.atlas_efficiencies = list()
+        tile = Tile(content_uri=content_uri)
+        tile.tile_content = FromGeometryTreeToTileset.__create_tile_content(feature_list, extension, with_texture, downsample_factor, with_normals, atlas_number, weld=weld, quantize=quantize)
+        tile.write_content(output_dir)
+        return tile.tile_content.header.tile_byte_length, FromGeometryTreeToTileset.atlas_efficiencies
+
+    @staticmethod
+    def __create_tile_content(feature_list: 'FeatureList', extension=None, with_texture=False, downsample_factor=1, with_normals=True, atlas_number=None, writer=None, weld=False, quantize=False):
         """
         :param pre_tile: an array containing features of a single tile
+        :param extension: the batch table extension of the tile, None if there is none
+        :param writer: the BackgroundWriter saving the atlas image, None to save it immediately
+        :param weld: if True, the identical vertices are merged and the tile geometry is indexed
+        :param quantize: if True, the vertex attributes are stored as normalized integers (KHR_mesh_quantization)
 
         :return: a B3dm tile.
         """
@@ -160,7 +498,15 @@ class FromGeometryTreeToTileset():
                               0, 1, 0, 0,
                               0, 0, 0, 1], dtype=np.float32)
 
-        primitives = FromGeometryTreeToTileset.__group_by_material_index(feature_list, with_texture, downsample_factor, with_normals)
+        primitives = FromGeometryTreeToTileset.__group_by_material_index(feature_list, with_texture, downsample_factor, with_normals, atlas_number, writer, weld)
+
+        quantizer = None
+        if quantize:
+            # The node matrix restores the positions from the bounding box of the tile before the z-up to y-up rotation
+            quantizer = MeshQuantizer(primitives)
+            for primitive in primitives:
+                quantizer.quantize(primitive)
+            transform = transform.reshape((4, 4), order='F') @ quantizer.get_matrix()
 
         # Create a batch table and add the ID of each feature to it
         ids = [feature.get_id() for feature in feature_list]
@@ -183,57 +529,109 @@ class FromGeometryTreeToTileset():
                 key_data = [feature_data.get(key, None) for feature_data in features_data]
                 bt.add_property_as_json(key, key_data)
 
-        if extension_name is not None:
-            extension = feature_list.__class__.create_batch_table_extension(extension_name, ids, feature_list)
-            if extension is not None:
-                if 'extensions' not in bt.header.data:
-                    bt.header.data['extensions'] = {}
-                bt.header.data['extensions'][extension.name] = extension.to_dict()
+        if extension is not None:
+            if 'extensions' not in bt.header.data:
+                bt.header.data['extensions'] = {}
+            bt.header.data['extensions'][extension.name] = extension.to_dict()
 
         # Eventually wrap the features together with the optional
         # BatchTableHierarchy within a B3dm:
-        return B3dm.from_primitives(primitives, batch_table=bt, feature_table=ft, transform=transform)
+        b3dm = B3dm.from_primitives(primitives, batch_table=bt, feature_table=ft, transform=transform)
+        if quantizer is not None:
+            quantizer.update_gltf(b3dm.body.gltf)
+            b3dm.sync()
+        return b3dm
 
     @staticmethod
-    def __group_by_material_index(feature_list: 'FeatureList', with_texture: int, downsample_factor=1, with_normals=True):
+    def __create_batch_table_extension(feature_list: 'FeatureList', extension_name=None):
+        """
+        Create the batch table extension of a tile.
+        :param feature_list: the features of the tile
+        :param extension_name: the name of the extension to create, None to create no extension
+        :return: the extension, or None
+        """
+        if extension_name is None:
+            return None
+        ids = [feature.get_id() for feature in feature_list]
+        return feature_list.__class__.create_batch_table_extension(extension_name, ids, feature_list)
+
+    @staticmethod
+    def __create_atlas(feature_list: 'FeatureList', downsample_factor=1, atlas_number=None, writer=None):
+        """
+        Create the texture atlas of a tile.
+        The texture LOD nodes share their features, so the atlas of the features is packed once (which updates their UVs)
+        and kept on the FeatureList: the other levels only save a downsized copy of its images.
+        :param feature_list: the features of the tile
+        :param downsample_factor: the factor used to downsize the atlas images
+        :param atlas_number: the number of the atlas, None to use the next number
+        :param writer: the BackgroundWriter saving the atlas images, None to save them immediately
+        :return: the ids of the pages of the atlas
+        """
+        if feature_list.atlas is None:
+            feature_list.atlas = Atlas(feature_list, downsample_factor, atlas_number, writer, keep_image=True)
+            FromGeometryTreeToTileset.atlas_efficiencies.extend(feature_list.atlas.efficiencies)
+            return feature_list.atlas.ids
+        return feature_list.atlas.create_level(downsample_factor, atlas_number, writer)
+
+    @staticmethod
+    def __group_by_material_index(feature_list: 'FeatureList', with_texture: int, downsample_factor=1, with_normals=True, atlas_number=None, writer=None, weld=False):
         primitives = {}
-        seen_mat_indexes = []
         batch_id = 0
 
-        texture_uri = Atlas(feature_list, downsample_factor).id if with_texture else None
-        for feature in feature_list:
+        # Each page of the atlas is the texture of its own primitives
+        texture_uris = FromGeometryTreeToTileset.__create_atlas(feature_list, downsample_factor, atlas_number, writer) if with_texture else [None]
+        store = feature_list.get_geometry_store()
+        normals_array = TriangleArray.compute_triangle_normals(store.vertices.reshape((-1, 3, 3))).repeat(3, axis=0) if with_normals else None
+        uvs_array = store.get_uvs() if with_texture else None
+        colors_array = store.get_colors(with_texture)
+        for index, feature in enumerate(feature_list):
             mat_index = feature.material_index
+            page = feature_list.atlas.get_page(feature.get_id()) if with_texture else 0
 
-            if mat_index not in seen_mat_indexes:
-                seen_mat_indexes.append(mat_index)
+            if (mat_index, page) not in primitives:
                 additional_attributes_dict = {}
                 if feature.has_vertex_colors:
                     additional_attributes_dict['COLOR_0'] = []
-                primitives[mat_index] = {'positions': [], 'normals': [], 'uvs': [], 'batchids': [], 'texture_uri': texture_uri, 'material': feature_list.get_material(mat_index), 'additional_attributes': additional_attributes_dict}
+                primitives[(mat_index, page)] = {'positions': [], 'normals': [], 'uvs': [], 'batchids': [], 'texture_uri': texture_uris[page], 'material': feature_list.get_material(mat_index), 'additional_attributes': additional_attributes_dict}
 
-            primitive = primitives[mat_index]
+            primitive = primitives[(mat_index, page)]
 
-            positions = np.array(feature.get_geom_as_triangles(), dtype=np.float32).flatten().reshape((-1, 3))
+            start, end = store.offsets[index], store.offsets[index + 1]
+            positions = store.vertices[start:end]
             primitive['positions'].append(positions)
             if with_normals:
-                primitive['normals'].append(feature.geom.compute_normals())
+                primitive['normals'].append(normals_array[start:end])
             if with_texture:
-                primitive['uvs'].append(feature.geom.get_data(0).astype(np.float32))
+                primitive['uvs'].append(uvs_array[start:end] if uvs_array is not None else feature.geom.get_data(0))
             primitive['batchids'].append(np.full(len(positions), batch_id, dtype=np.uint32))
             if feature.has_vertex_colors:
-                primitive['additional_attributes']['COLOR_0'].append(feature.geom.get_data(int(with_texture)).astype(np.float32))
+                primitive['additional_attributes']['COLOR_0'].append(colors_array[start:end] if colors_array is not None else feature.geom.get_data(int(with_texture)))
 
             batch_id += 1
 
         gltf_primitives = []
         for primitive in primitives.values():
-            additional_attributes = []
-            for attribute in primitive['additional_attributes']:
-                additional_attributes.append(GltfAttribute(attribute, VEC3, FLOAT, np.concatenate(primitive['additional_attributes'][attribute])))
-            points = np.concatenate(primitive['positions'])
+            attributes = {attribute: np.concatenate(arrays, dtype=np.float32) for attribute, arrays in primitive['additional_attributes'].items()}
+            points = np.concatenate(primitive['positions'], dtype=np.float32)
             normals = np.concatenate(primitive['normals'], dtype=np.float32) if with_normals else None
             uvs = np.concatenate(primitive['uvs'], dtype=np.float32) if with_texture else None
             batchids = np.concatenate(primitive['batchids'])
-            gltf_primitives.append(GltfPrimitive(points, normals=normals, uvs=uvs, batchids=batchids, additional_attributes=additional_attributes, texture_uri=primitive['texture_uri'], material=primitive['material']))
+            triangles = None
+            if weld:
+                # Keep one copy of each (position, normal, uv, batch id, colors) tuple, the triangles index those vertices
+                vertices, indices = TriangleArray.weld_vertices([points, normals, uvs, batchids] + list(attributes.values()))
+                points = points[vertices]
+                normals = normals[vertices] if normals is not None else None
+                uvs = uvs[vertices] if uvs is not None else None
+                batchids = batchids[vertices]
+                attributes = {attribute: array[vertices] for attribute, array in attributes.items()}
+                small = len(vertices) <= np.iinfo(np.uint16).max
+                if small and len(indices) % 2 == 1:
+                    # The attributes following the indices must start on a 4-byte boundary, so uint16 indices need an even count:
+                    # a degenerated triangle (three times the same vertex, not rendered) pads the index buffer
+                    indices = np.concatenate([indices, np.full(3, indices[-1])])
+                triangles = indices.astype(np.uint16 if small else np.uint32)
+            additional_attributes = [GltfAttribute(attribute, VEC3, FLOAT, array) for attribute, array in attributes.items()]
+            gltf_primitives.append(GltfPrimitive(points, normals=normals, uvs=uvs, batchids=batchids, additional_attributes=additional_attributes, triangles=triangles, texture_uri=primitive['texture_uri'], material=primitive['material']))
 
         return gltf_primitives
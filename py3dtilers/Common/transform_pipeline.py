@@ -0,0 +1,95 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TransformPipeline(object):
+    """
+    A lazy sequence of transformations applied to the vertices of the features.
+    The affine steps (height multiplier, scale, translation) are collected, then applied
+    together with the (optional) reprojection in a single pass over the vertex array.
+    The vertices are processed by chunks, so each vertex is read and written once,
+    while the steps are still evaluated in the order they were added (which keeps the
+    results identical to applying each transformation separately).
+    """
+
+    # The number of vertices transformed at once
+    CHUNK_SIZE = 65536
+
+    def __init__(self, threads=1):
+        """
+        :param int threads: the number of threads used to transform the chunks of vertices.
+        The reprojection releases the GIL, so the chunks can be reprojected in parallel.
+        """
+        self.steps = list()
+        self.transformer = None
+        self.threads = threads if threads is not None and threads > 0 else 1
+
+    def is_empty(self):
+        """
+        Check if the pipeline contains at least one transformation.
+        :return: a boolean
+        """
+        return len(self.steps) == 0 and self.transformer is None
+
+    def add_height_mult(self, height_mult):
+        """
+        Multiply the height (Z) of the vertices.
+        :param height_mult: the factor to scale height values
+        """
+        self.steps.append(('height_mult', height_mult))
+
+    def add_scale(self, scale_factor, centroid):
+        """
+        Rescale the vertices around a reference point.
+        :param scale_factor: the factor to scale the objects
+        :param centroid: the centroid used as reference point
+        """
+        self.steps.append(('scale', (scale_factor, np.asarray(centroid, dtype=np.float64))))
+
+    def add_translation(self, offset):
+        """
+        Translate the vertices by adding an offset.
+        :param offset: the Vec3 translation offset
+        """
+        self.steps.append(('translate', np.asarray(offset, dtype=np.float64)))
+
+    def set_reprojection(self, transformer):
+        """
+        Project the vertices into another CRS once the affine steps are applied.
+        :param transformer: the pyproj Transformer used to change the crs
+        """
+        self.transformer = transformer
+
+    def apply(self, vertices):
+        """
+        Apply the transformations in place on an array of vertices.
+        :param vertices: a (N, 3) float64 array
+        """
+        chunks = [vertices[start:start + self.CHUNK_SIZE] for start in range(0, len(vertices), self.CHUNK_SIZE)]
+        if self.threads > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                list(executor.map(self.__apply_on_chunk, chunks))
+        else:
+            for chunk in chunks:
+                self.__apply_on_chunk(chunk)
+
+    def __apply_on_chunk(self, chunk):
+        """
+        Apply the transformations in place on a chunk of vertices.
+        :param chunk: a (n, 3) float64 array
+        """
+        for step, value in self.steps:
+            if step == 'height_mult':
+                chunk[:, 2] *= value
+            elif step == 'scale':
+                scale_factor, centroid = value
+                chunk -= centroid
+                chunk *= scale_factor
+                chunk += centroid
+            elif step == 'translate':
+                chunk += value
+        if self.transformer is not None:
+            x, y, z = self.transformer.transform(chunk[:, 0], chunk[:, 1], chunk[:, 2])
+            chunk[:, 0] = x
+            chunk[:, 1] = y
+            chunk[:, 2] = z
@@ -0,0 +1,44 @@
+from threading import Lock
+from pyproj import Transformer
+from .run_report import RunReport
+
+
+class TransformerCache():
+    """
+    A process-wide cache of pyproj Transformer instances.
+    Creating a Transformer loads entries from the PROJ database, so the transformers are created once
+    for each (crs_in, crs_out, options) key and reused by all the nodes and all the runs of the process.
+    """
+
+    transformers = dict()
+    hits = 0
+    misses = 0
+    lock = Lock()
+
+    @staticmethod
+    def get_transformer(crs_in, crs_out, **options):
+        """
+        Return a Transformer from crs_in to crs_out. The transformer is created when not found in the cache.
+        :param crs_in: the input CRS
+        :param crs_out: the output CRS
+        :param options: the keyword arguments given to Transformer.from_crs (for example always_xy=True)
+        :return: a pyproj Transformer
+        """
+        key = (crs_in, crs_out, tuple(sorted(options.items())))
+        with TransformerCache.lock:
+            if key in TransformerCache.transformers:
+                TransformerCache.hits += 1
+                RunReport.increment('transformer_cache', 'hits')
+            else:
+                TransformerCache.misses += 1
+                RunReport.increment('transformer_cache', 'misses')
+                TransformerCache.transformers[key] = Transformer.from_crs(crs_in, crs_out, **options)
+            return TransformerCache.transformers[key]
+
+    @staticmethod
+    def clear():
+        """Remove all the transformers from the cache and reset the counters."""
+        with TransformerCache.lock:
+            TransformerCache.transformers = dict()
+            TransformerCache.hits = 0
+            TransformerCache.misses = 0
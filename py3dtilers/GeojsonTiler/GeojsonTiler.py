@@ -165,8 +165,8 @@ class GeojsonTiler(Tiler):
 
         :return: a tileset.
         """
-        features = self.retrieve_geojsons()
-        objects = Geojsons.parse_geojsons(features, properties, is_roof, color_attribute)
+        # The GeoJson features are not kept in a local variable, so they can be freed once their tiles are writen
+        objects = Geojsons.parse_geojsons(self.retrieve_geojsons(), properties, is_roof, color_attribute)
 
         if not color_attribute[0] == 'NONE':
             self.add_colors(objects, color_attribute)
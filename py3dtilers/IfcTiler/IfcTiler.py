@@ -110,7 +110,11 @@ class IfcTiler(Tiler):
                 except Exception as e:
                     logging.exception(f"Failed processing {ifc_file}: {e}")
             
-            groups = Groups(objects).get_groups_as_list()
+            groups = Groups(objects, kd_tree_max=self.get_kd_tree_max(), max_tile_triangles=self.args.max_tile_triangles,
+                            max_tile_bytes=self.args.max_tile_bytes, kd_tree_3d=self.args.kd_tree_3d,
+                            space_filling_curve=self.args.space_filling_curve).get_groups_as_list()
+            # The groups hold the features, so the features can be freed once the tiles of their group are writen
+            del objects
             return self.create_tileset_from_groups(groups, "batch_table_hierarchy" if with_BTH else None)
         finally:
             root.removeHandler(handler)
@@ -25,9 +25,6 @@ class IfcObjectGeom(Feature):
     def hasGeom(self):
         return self.has_geom
 
-    def set_triangles(self, triangles):
-        self.geom.triangles[0] = triangles
-
     def getParentsInIfc(self, ifcObject):
         self.parents = list()
         while ifcObject:
@@ -100,13 +97,8 @@ class IfcObjectGeom(Feature):
             logging.error("Error while creating geom : No triangles found")
             return False
 
-        triangles = list()
-        for index in indexList:
-            triangle = []
-            for i in range(0, 3):
-                # We store each position for each triangles, as GLTF expect
-                triangle.append(vertexList[index[i]])
-            triangles.append(triangle)
+        # We store each position for each triangles, as GLTF expect
+        triangles = vertexList[indexList].astype(np.float64)
 
         self.geom.triangles.append(triangles)
 
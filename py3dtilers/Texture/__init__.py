@@ -1,9 +1,11 @@
 from .texture import Texture
 from .atlas_rectangle import Rectangle
 from .atlas_node import Node
+from .atlas_packer import AtlasPacker
 from .atlas import Atlas
 
 __all__ = ['Rectangle',
            'Node',
            'Atlas',
+           'AtlasPacker',
            'Texture']
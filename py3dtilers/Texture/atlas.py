@@ -1,88 +1,138 @@
-import numpy as np
-from ..Texture import Rectangle, Node
-
-# This file implement the solution described here
-# https://blackpawn.com/texts/lightmaps/
-# to properly pack multiple texture in a Atlas by creating a tree
-# of rectangle representing the Atlas.
+from pathlib import Path
+from PIL import Image
+from ..Texture import Texture, AtlasPacker
 
 
 class Atlas():
     """
     An Atlas contains the texture images of a tile.
+    The textures are placed in the atlas image by an AtlasPacker, with the padding, the power of two rounding
+    and the maximum size of the Texture settings.
+    When the textures don't fit in the maximum size, they are spread over several images (pages).
     """
+    tile_number = 0
 
-    def __init__(self, feature_list, downsample_factor=1):
+    def __init__(self, feature_list, downsample_factor=1, tile_number=None, writer=None, keep_image=False):
+        """
+        :param feature_list: the features of the tile
+        :param int downsample_factor: the factor used to downsize the atlas images
+        :param tile_number: the number of the atlas, used in the file names of its pages. When None, the next number is used.
+        :param writer: the BackgroundWriter saving the atlas images. When None, the images are saved immediately.
+        :param keep_image: if True, the full resolution images are kept to save other levels of the atlas
+        """
         features_with_id_key = dict()
         textures_with_id_key = dict()
 
-        textures = feature_list.get_textures()
+        # The textures can be loaded beforehand by the main process (see FeatureList.textures)
+        textures = feature_list.get_textures() if feature_list.textures is None else feature_list.textures
         for feature in feature_list:
             features_with_id_key[feature.get_id()] = feature.geom
             textures_with_id_key[feature.get_id()] = textures[feature.get_id()]
 
-        # Sort textures by size, starting by the biggest one
-        textures_sorted = sorted(textures_with_id_key.items(),
-                                 key=lambda t: self.computeArea(t[1].size), reverse=True)
+        packer = AtlasPacker(Texture.atlas_padding, Texture.atlas_power_of_two, Texture.max_atlas_size)
+        max_size = packer.get_max_size()
+        if max_size is not None:
+            # The UVs are relative to the texture, so a texture bigger than a page can be downsized
+            for feature_id, image in textures_with_id_key.items():
+                if max(image.size) > max_size:
+                    ratio = max_size / max(image.size)
+                    textures_with_id_key[feature_id] = image.resize((max(1, int(image.width * ratio)), max(1, int(image.height * ratio))))
 
-        atlasTree = self.computeAtlasTree(textures_sorted)
+        feature_ids = list(textures_with_id_key.keys())
+        sizes = [image.size for image in textures_with_id_key.values()]
 
-        self.tile_number = atlasTree.get_tile_number()
+        self.tile_number = Atlas.reserve_tile_number() if tile_number is None else tile_number
+        # The page of the texture of each feature, the images and the ids of the pages, and their packing efficiency
+        self.page_with_id_key = dict()
+        self.images = list()
+        self.ids = list()
+        self.efficiencies = list()
+        for page, (indices, positions, atlas_size) in enumerate(packer.pack_pages(sizes)):
+            page_textures_with_id_key = {feature_ids[i]: textures_with_id_key[feature_ids[i]] for i in indices}
+            for feature_id in page_textures_with_id_key:
+                self.page_with_id_key[feature_id] = page
+            # The ratio of the page covered by the textures
+            self.efficiencies.append(packer.get_efficiency([sizes[i] for i in indices], atlas_size))
 
-        self.id = atlasTree.createAtlasImage(features_with_id_key, self.tile_number, downsample_factor)
+            image = self.createImage(features_with_id_key, page_textures_with_id_key, positions, atlas_size)
+            self.images.append(image if keep_image else None)
+            self.ids.append(Atlas.saveAtlasImage(image, Atlas.get_page_number(self.tile_number, page), downsample_factor, writer))
 
-    def computeArea(self, size):
+    def get_page(self, feature_id):
         """
-        :param size : an array with a width and a height of a texture
-        :rtype float: the area of the texture
+        :param feature_id: the ID of a feature
+        :return: the index of the page containing the texture of the feature
         """
-        width, height = size
-        return width * height
+        return self.page_with_id_key.get(feature_id, 0)
 
-    def multipleOf2(self, nb):
+    @staticmethod
+    def get_page_number(tile_number, page):
         """
-        :param nb: a number
-        :rtype float: The first multiple of 2 greater than the number
+        Return the number used in the file name of a page. The first page keeps the number of the atlas.
+        :param tile_number: the number of the atlas
+        :param page: the index of the page
+        :return: a number, or a string when the page isn't the first one
         """
-        i = 1
-        while i < nb:
-            i *= 2
-        return i
+        return tile_number if page == 0 else str(tile_number) + '_' + str(page)
 
-    def computeAtlasTree(self, textures_sorted):
+    def createImage(self, features_with_id_key, textures_with_id_key, positions, atlas_size):
         """
-        :param textures_sorted:  A dictionnary, with building_id as key,
-                            and pillow image as value.
-        :rtype node: the root node of the atlas tree
+        Create the atlas image from the textures and update the UVs of the features.
+        :param features_with_id_key: a dictionnary, with feature_id as key, and triangles as value
+        :param textures_with_id_key: a dictionnary, with feature_id as key, and pillow image as value
+        :param positions: the (left, top) position of each texture in the atlas
+        :param atlas_size: the (width, height) of the atlas
+        :return: a pillow image
         """
-        surfaceAtlas = 0
-        for key, image in textures_sorted:
-            # Add the surface of the current texture to the atlas one
-            surfaceAtlas += self.computeArea(image.size)
+        atlasImg = Image.new('RGB', atlas_size, color='black')
+        for (feature_id, image), (left, top) in zip(textures_with_id_key.items(), positions):
+            atlasImg.paste(image, (left, top))
+            ratio = [image.width / atlas_size[0], image.height / atlas_size[1]]
+            offset = [left / atlas_size[0], top / atlas_size[1]]
+            Texture.transform_uvs(features_with_id_key[feature_id].triangles[1], ratio, offset)
+        return atlasImg
 
-        # We estimate the size of the atlas to be around the nearest power of 2
-        # of the squareroot of all surfaces combined. There will be cases
-        # where this does not work, since this creates a square.
-        sizeOfAtlas = self.multipleOf2(np.sqrt(surfaceAtlas))
+    @staticmethod
+    def reserve_tile_number():
+        """
+        Return the next atlas number and increment the counter.
+        :return: int
+        """
+        tile_number = Atlas.tile_number
+        Atlas.tile_number += 1
+        return tile_number
 
-        rect = Rectangle(0, 0, sizeOfAtlas, sizeOfAtlas)
-        node_root = None
-        it = 0
-        while node_root is None:
-            node_root = Node(rect)
-            axis = it % 2
-            for key, image in textures_sorted:
-                node_root = node_root.insert(image, key)
-                if node_root is None:
-                    # If the node_root is None, this means that the estimation
-                    # of the size of the atlas is wrong and must be enlarged
-                    rect = Rectangle(
-                        0,
-                        0,
-                        int(rect.get_width() + rect.get_width() * (1 - axis)),
-                        int(rect.get_height() + rect.get_height() * axis)
-                    )
-                    it += 1
-                    break
-        node_root.set_tile_number()
-        return node_root
+    @staticmethod
+    def saveAtlasImage(atlasImg, tile_number, downsample_factor=1, writer=None):
+        """
+        Save an atlas image, downsized by a factor.
+        :param atlasImg: a pillow image
+        :param tile_number: the tile number
+        :param int downsample_factor: the factor used to downsize the image
+        :param writer: the BackgroundWriter saving the image. When None, the image is saved immediately.
+        :return: the id (file name) of the atlas
+        """
+        atlas_id = 'ATLAS_' + str(tile_number) + Texture.format
+
+        if downsample_factor != 1:
+            width = 1 << (int(atlasImg.width / downsample_factor) - 1).bit_length()
+            height = 1 << (int(atlasImg.height / downsample_factor) - 1).bit_length()
+            atlasImg = atlasImg.resize((width, height))
+        atlas_path = Path(Texture.folder, 'tiles', atlas_id)
+        if writer is None:
+            atlasImg.save(atlas_path, quality=Texture.quality, compress_level=Texture.compress_level)
+        else:
+            writer.submit(atlasImg.save, atlas_path, quality=Texture.quality, compress_level=Texture.compress_level)
+        return atlas_id
+
+    def create_level(self, downsample_factor=1, tile_number=None, writer=None):
+        """
+        Save another level of the atlas, downsized from the full resolution images.
+        The UVs are relative to the size of the pages, so the features keep the same UVs for all the levels.
+        :param int downsample_factor: the factor used to downsize the atlas images
+        :param tile_number: the number of the new atlas, used in the file names of its pages. When None, the next number is used.
+        :param writer: the BackgroundWriter saving the atlas images. When None, the images are saved immediately.
+        :return: the ids of the pages of the new atlas
+        """
+        tile_number = Atlas.reserve_tile_number() if tile_number is None else tile_number
+        return [Atlas.saveAtlasImage(image, Atlas.get_page_number(tile_number, page), downsample_factor, writer) for page, image in enumerate(self.images)]
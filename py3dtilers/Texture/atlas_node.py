@@ -1,5 +1,3 @@
-import numpy as np
-from pathlib import Path
 from PIL import Image
 from ..Texture import Rectangle, Texture
 
@@ -8,8 +6,8 @@ class Node(object):
     """
     The class that represents a node in the tree representing the Atlas.
     It should be associate with at least a rectangle.
+    The atlases are now packed by an AtlasPacker, this binary tree is kept for compatibility.
     """
-    tile_number = 0
 
     def __init__(self, rect=None):
         self.rect = rect
@@ -22,8 +20,16 @@ class Node(object):
         return (self.child[0] is None and self.child[1] is None)
 
     def set_tile_number(self):
-        self.node_number = Node.tile_number
-        Node.tile_number += 1
+        self.node_number = Node.reserve_tile_number()
+
+    @staticmethod
+    def reserve_tile_number():
+        """
+        Return the next atlas number and increment the counter of the atlases.
+        :return: int
+        """
+        from ..Texture import Atlas
+        return Atlas.reserve_tile_number()
 
     def get_tile_number(self):
         return self.node_number
@@ -107,7 +113,7 @@ class Node(object):
             self.child[0].insert(img, feature_id)
             return self
 
-    def createAtlasImage(self, features_with_id_key, tile_number, downsample_factor=1):
+    def createAtlasImage(self, features_with_id_key, tile_number, downsample_factor=1, writer=None):
         """
         :param features_with_id_key: a dictionnary, with feature_id as key,
                         and triangles as value. The triangles position must be
@@ -115,6 +121,17 @@ class Node(object):
                         triangles[1]
         :param tile_number: the tile number
         :param int downsample_factor: the factor used to downsize the image
+        :param writer: the BackgroundWriter saving the image. When None, the image is saved immediately.
+        """
+        atlasImg = self.createImage(features_with_id_key)
+        return Node.saveAtlasImage(atlasImg, tile_number, downsample_factor, writer)
+
+    def createImage(self, features_with_id_key):
+        """
+        Create the atlas image from the textures of the tree and update the UVs of the features.
+        :param features_with_id_key: a dictionnary, with feature_id as key,
+                        and triangles as value.
+        :return: a pillow image
         """
         atlasImg = Image.new(
             'RGB',
@@ -122,14 +139,20 @@ class Node(object):
             color='black')
 
         self.fillAtlasImage(atlasImg, features_with_id_key)
-        atlas_id = 'ATLAS_' + str(tile_number) + Texture.format
+        return atlasImg
 
-        if downsample_factor != 1:
-            width = 1 << (int(atlasImg.width / downsample_factor) - 1).bit_length()
-            height = 1 << (int(atlasImg.height / downsample_factor) - 1).bit_length()
-            atlasImg = atlasImg.resize((width, height))
-        atlasImg.save(Path(Texture.folder, 'tiles', atlas_id), quality=Texture.quality, compress_level=Texture.compress_level)
-        return atlas_id
+    @staticmethod
+    def saveAtlasImage(atlasImg, tile_number, downsample_factor=1, writer=None):
+        """
+        Save an atlas image, downsized by a factor.
+        :param atlasImg: a pillow image
+        :param tile_number: the tile number
+        :param int downsample_factor: the factor used to downsize the image
+        :param writer: the BackgroundWriter saving the image. When None, the image is saved immediately.
+        :return: the id (file name) of the atlas
+        """
+        from ..Texture import Atlas
+        return Atlas.saveAtlasImage(atlasImg, tile_number, downsample_factor, writer)
 
     def fillAtlasImage(self, atlasImg, features_with_id_key):
         """
@@ -171,8 +194,4 @@ class Node(object):
         offsetWidth = (self.rect.get_left() / newWidth)
         offsetHeight = (self.rect.get_top() / newHeight)
 
-        for i in range(0, len(uvs)):
-            for y in range(0, 3):
-                new_u = (uvs[i][y][0] * ratioWidth) + offsetWidth
-                new_v = (uvs[i][y][1] * ratioHeight) + offsetHeight
-                uvs[i][y] = np.array([new_u, new_v])
+        Texture.transform_uvs(uvs, [ratioWidth, ratioHeight], [offsetWidth, offsetHeight])
@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class AtlasPacker():
+    """
+    Pack rectangles (the texture images of the features) into an atlas with a skyline bottom-left heuristic.
+    The skyline is the upper outline of the rectangles already placed, each rectangle is placed where its top is the lowest.
+    The rectangles are placed once, by decreasing height, so the packing doesn't restart when the atlas is too small:
+    the atlas grows in height, and a few widths are tried to keep the smallest atlas.
+    The packing only depends on the sizes of the rectangles and their order, so it is deterministic.
+    When the rectangles don't fit in the maximum size, they are spread over several atlases (pages).
+    """
+
+    def __init__(self, padding=1, power_of_two=True, max_size=None):
+        """
+        :param int padding: the number of pixels left between the rectangles
+        :param power_of_two: if True, the width and the height of the atlas are rounded to a power of two
+        :param max_size: the maximum width and height of the atlas, None for no limit.
+        When the sizes are rounded to a power of two, the maximum size is rounded down to a power of two.
+        """
+        self.padding = max(0, padding) if padding is not None else 0
+        self.power_of_two = power_of_two
+        self.max_size = max_size
+
+    def pack(self, sizes):
+        """
+        Place the rectangles in an atlas.
+        The rectangles which can't be placed in an atlas of max_size x max_size pixels are not placed.
+        :param sizes: the (width, height) of each rectangle
+        :return: the (left, top) position of each rectangle (None when the rectangle isn't placed), and the (width, height) of the atlas
+        """
+        padded_sizes = [(width + self.padding, height + self.padding) for width, height in sizes]
+        if len(padded_sizes) == 0:
+            return list(), (1, 1)
+        order = sorted(range(len(padded_sizes)), key=lambda i: (-padded_sizes[i][1], -padded_sizes[i][0], i))
+        max_size = self.get_max_size()
+        max_height = max_size if max_size is not None else sum([height for _, height in padded_sizes])
+
+        best = None
+        for width in self.get_widths(padded_sizes):
+            positions, used_width, used_height = self.__pack_in_width(padded_sizes, order, width, max_height)
+            atlas_size = (self.round_size(used_width), self.round_size(used_height))
+            # Keep the atlas placing the most rectangles, then the smallest one, then the most square one
+            key = (-sum([position is not None for position in positions]), atlas_size[0] * atlas_size[1], max(atlas_size), atlas_size[0])
+            if best is None or key < best[0]:
+                best = (key, positions, atlas_size)
+        return best[1], best[2]
+
+    def pack_pages(self, sizes):
+        """
+        Place the rectangles in as many atlases (pages) as needed to respect the maximum size.
+        Each page is packed with the rectangles which didn't fit in the previous ones.
+        :param sizes: the (width, height) of each rectangle, smaller than the maximum size
+        :return: a list of pages, each page being the indices of its rectangles, their (left, top) positions and the (width, height) of the page
+        """
+        pages = list()
+        remaining = list(range(len(sizes)))
+        while len(pages) == 0 or len(remaining) > 0:
+            positions, atlas_size = self.pack([sizes[i] for i in remaining])
+            placed = [i for i, position in zip(remaining, positions) if position is not None]
+            if len(placed) == 0 and len(remaining) > 0:
+                raise ValueError("A rectangle is bigger than the maximum size of the atlas (" + str(self.get_max_size()) + " pixels)")
+            pages.append((placed, [position for position in positions if position is not None], atlas_size))
+            remaining = [i for i, position in zip(remaining, positions) if position is None]
+        return pages
+
+    def get_max_size(self):
+        """
+        :return: the maximum width and height of the atlas (rounded down to a power of two when the sizes are), None for no limit
+        """
+        if self.max_size is None:
+            return None
+        max_size = max(1, int(self.max_size))
+        return 1 << (max_size.bit_length() - 1) if self.power_of_two else max_size
+
+    def get_widths(self, padded_sizes):
+        """
+        Return the widths of atlas tried to pack the rectangles, around the square root of their area.
+        :param padded_sizes: the (width, height) of each rectangle, padding included
+        :return: a list of widths
+        """
+        min_width = max([width for width, _ in padded_sizes]) - self.padding
+        base = max(min_width, int(np.ceil(np.sqrt(sum([width * height for width, height in padded_sizes])))))
+        if self.power_of_two:
+            base = self.round_size(base)
+            widths = [base // 2, base, base * 2]
+        else:
+            widths = [base, int(base * 1.25), int(base * 1.5)]
+        if self.max_size is not None:
+            widths = [min(width, self.get_max_size()) for width in widths]
+        return sorted(set([width for width in widths if width >= min(min_width, widths[-1])]))
+
+    def round_size(self, size):
+        """
+        :param size: a number of pixels
+        :return: the size, rounded to the next power of two when power_of_two is True
+        """
+        size = max(1, int(size))
+        return 1 << (size - 1).bit_length() if self.power_of_two else size
+
+    def get_efficiency(self, sizes, atlas_size):
+        """
+        :param sizes: the (width, height) of the rectangles placed in the atlas
+        :param atlas_size: the (width, height) of the atlas
+        :return: the ratio of the area of the atlas used by the rectangles
+        """
+        return sum([width * height for width, height in sizes]) / (atlas_size[0] * atlas_size[1])
+
+    def __pack_in_width(self, sizes, order, width, max_height):
+        """
+        Place the rectangles in an atlas of a fixed width.
+        :param sizes: the (width, height) of each rectangle
+        :param order: the order used to place the rectangles
+        :param width: the width of the atlas
+        :param max_height: the maximum height of the atlas
+        :return: the position of each rectangle (None when it doesn't fit), the width and the height used by the rectangles
+        """
+        # The padding of the rectangles on the right and bottom sides of the atlas can be outside of it
+        width += self.padding
+        max_height += self.padding
+        # The segments of the skyline, as [left, top, width]
+        skyline = [[0, 0, width]]
+        positions = [None] * len(sizes)
+        used_width = 0
+        used_height = 0
+        for index in order:
+            rectangle_width, rectangle_height = sizes[index]
+            best = None
+            for i in range(len(skyline)):
+                top = AtlasPacker.__get_top(skyline, i, rectangle_width, width)
+                if top is None or top + rectangle_height > max_height:
+                    continue
+                if best is None or (top + rectangle_height, skyline[i][0]) < best[0]:
+                    best = ((top + rectangle_height, skyline[i][0]), i, top)
+            if best is None:
+                continue
+            _, i, top = best
+            left = skyline[i][0]
+            positions[index] = (left, top)
+            used_width = max(used_width, left + rectangle_width)
+            used_height = max(used_height, top + rectangle_height)
+            AtlasPacker.__add_to_skyline(skyline, i, left, top + rectangle_height, rectangle_width)
+        return positions, max(0, used_width - self.padding), max(0, used_height - self.padding)
+
+    @staticmethod
+    def __get_top(skyline, i, rectangle_width, width):
+        """
+        Find the top of the skyline under a rectangle whose left side is at the start of a segment.
+        :return: the top, None when the rectangle goes out of the atlas
+        """
+        left = skyline[i][0]
+        if left + rectangle_width > width:
+            return None
+        top = 0
+        remaining = rectangle_width
+        while remaining > 0:
+            top = max(top, skyline[i][1])
+            remaining -= skyline[i][2]
+            i += 1
+        return top
+
+    @staticmethod
+    def __add_to_skyline(skyline, i, left, top, rectangle_width):
+        """
+        Raise the skyline over a placed rectangle, then merge the neighbouring segments at the same height.
+        """
+        skyline.insert(i, [left, top, rectangle_width])
+        right = left + rectangle_width
+        j = i + 1
+        while j < len(skyline) and skyline[j][0] < right:
+            shrink = right - skyline[j][0]
+            if shrink >= skyline[j][2]:
+                del skyline[j]
+                continue
+            skyline[j][0] += shrink
+            skyline[j][2] -= shrink
+            break
+        j = 0
+        while j < len(skyline) - 1:
+            if skyline[j][1] == skyline[j + 1][1]:
+                skyline[j][2] += skyline[j + 1][2]
+                del skyline[j + 1]
+            else:
+                j += 1
@@ -12,6 +12,10 @@ class Texture():
     quality = 75  # 95 is considered the best because 100 disables some portions of jpeg compression, 1 is the worst
     compress_level = 0
     format = '.jpg'
+    # The packing of the textures in the atlases (see AtlasPacker)
+    atlas_padding = 1
+    atlas_power_of_two = True
+    max_atlas_size = None
 
     def __init__(self, image_path):
         """
@@ -37,24 +41,11 @@ class Texture():
         :param uvs: the uvs defining the area.
         :return: a Pillow Image
         """
-        minX = 2
-        maxX = -1
-
-        minY = 2
-        maxY = -1
+        uv_array = np.asarray(uvs, dtype=np.float64).reshape((-1, 2))
+        minX, minY = np.min(uv_array, axis=0, initial=2)
+        maxX, maxY = np.max(uv_array, axis=0, initial=-1)
 
         texture_size = image.size
-        for uv_triangle in uvs:
-            for uv in uv_triangle:
-                if uv[0] < minX:
-                    minX = uv[0]
-                if uv[0] > maxX:
-                    maxX = uv[0]
-                if uv[1] < minY:
-                    minY = uv[1]
-                if uv[1] > maxY:
-                    maxY = uv[1]
-
         cropped_image = image.crop((minX * texture_size[0], minY * texture_size[1], maxX * texture_size[0], maxY * texture_size[1]))
 
         self.updateUvs(uvs, [minX, minY, maxX, maxY])
@@ -66,22 +57,27 @@ class Texture():
         :param uvs: the uvs
         :param rect: the area (minX, minY, maxX, maxY)
         """
-        offsetX = rect[0]
-        offsetY = rect[1]
-        if rect[2] != rect[0]:
-            ratioX = 1 / (rect[2] - rect[0])
-        else:
-            ratioX = 1
-        if rect[3] != rect[1]:
-            ratioY = 1 / (rect[3] - rect[1])
-        else:
-            ratioY = 1
+        ratioX = 1 / (rect[2] - rect[0]) if rect[2] != rect[0] else 1
+        ratioY = 1 / (rect[3] - rect[1]) if rect[3] != rect[1] else 1
+        Texture.transform_uvs(uvs, [ratioX, ratioY], [-rect[0] * ratioX, -rect[1] * ratioY])
 
-        for i in range(0, len(uvs)):
-            for y in range(0, 3):
-                new_u = (uvs[i][y][0] - offsetX) * ratioX
-                new_v = (uvs[i][y][1] - offsetY) * ratioY
-                uvs[i][y] = np.array([new_u, new_v])
+    @staticmethod
+    def transform_uvs(uvs, ratio, offset):
+        """
+        Replace each UV by uv * ratio + offset, with array operations on the whole UV buffer.
+        The UVs are updated in place: an array is overwritten, the triangles of a list are replaced.
+        :param uvs: the UVs of the triangles, as a (n, 3, 2) array or a list of triangles
+        :param ratio: the (u, v) scale
+        :param offset: the (u, v) offset, added after the scale
+        """
+        if len(uvs) == 0:
+            return
+        ratio = np.asarray(ratio, dtype=np.float64)
+        offset = np.asarray(offset, dtype=np.float64)
+        if isinstance(uvs, np.ndarray):
+            uvs[...] = uvs * ratio + offset
+        else:
+            uvs[:] = list(np.asarray(uvs, dtype=np.float64).reshape((len(uvs), 3, 2)) * ratio + offset)
 
     @staticmethod
     def set_texture_folder(folder):
@@ -116,3 +112,27 @@ class Texture():
         :param format: a format as string
         """
         Texture.format = '.' + format
+
+    @staticmethod
+    def set_atlas_padding(padding):
+        """
+        Sets the number of pixels left between the textures in the atlases.
+        :param padding: a positive number
+        """
+        Texture.atlas_padding = max(0, padding)
+
+    @staticmethod
+    def set_atlas_power_of_two(power_of_two):
+        """
+        Sets if the width and the height of the atlases are rounded to a power of two.
+        :param power_of_two: a boolean
+        """
+        Texture.atlas_power_of_two = power_of_two
+
+    @staticmethod
+    def set_max_atlas_size(max_size):
+        """
+        Sets the maximum width and height of the atlas pages, in pixels.
+        :param max_size: a positive number, None or 0 for no limit
+        """
+        Texture.max_atlas_size = max_size if max_size is not None and max_size > 0 else None
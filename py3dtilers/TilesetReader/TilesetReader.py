@@ -53,7 +53,9 @@ class TilesetTiler(Tiler):
         Override the parent tileset creation.
         """
         self.create_output_directory()
-        return FromGeometryTreeToTileset.convert_to_tileset(tileset_tree, self.args, extension_name, self.get_output_dir())
+        tileset = FromGeometryTreeToTileset.convert_to_tileset(tileset_tree, self.args, extension_name, self.get_output_dir())
+        self.write_report()
+        return tileset
 
     def transform_tileset(self, tileset):
         """
@@ -14,11 +14,10 @@ requirements = (
     'pywavefront',
     'pyyaml',
     'scipy',
-    'shapely',
-    'alphashape',
+    'shapely>=2.0',
+    'mapbox_earcut',
     #'py3dtiles @ git+https://gitlab.com/py3dtiles/py3dtiles@v9.0.0',
     #'py3dtiles_temporal_extension @ git+https://gitlab.com/VCityTeam/py3dtiles_temporal_extension',
-    #'earclip @ git+https://github.com/lionfish0/earclip',
     'Pillow',
     'ifcopenshell',
     'sortedcollections', 
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from py3dtilers.Texture import AtlasPacker
+
+
+def random_sizes(nb_sizes, max_size=300, seed=0):
+    rng = np.random.default_rng(seed)
+    return [tuple(size) for size in rng.integers(1, max_size + 1, (nb_sizes, 2)).tolist()]
+
+
+def assert_no_overlap(sizes, positions, atlas_size, padding):
+    """
+    Check that the rectangles stay in the atlas and that their padded areas don't overlap.
+    """
+    atlas_width, atlas_height = atlas_size
+    mask = np.zeros((atlas_height + padding, atlas_width + padding), dtype=np.int32)
+    for (width, height), (left, top) in zip(sizes, positions):
+        assert left >= 0 and top >= 0
+        assert left + width <= atlas_width and top + height <= atlas_height
+        mask[top:top + height + padding, left:left + width + padding] += 1
+    assert mask.max() <= 1
+
+
+@pytest.mark.parametrize('padding', [0, 1, 4])
+@pytest.mark.parametrize('power_of_two', [True, False])
+def test_pack(padding, power_of_two):
+    sizes = random_sizes(150)
+    positions, atlas_size = AtlasPacker(padding, power_of_two).pack(sizes)
+    assert len(positions) == len(sizes)
+    if power_of_two:
+        assert all(size & (size - 1) == 0 for size in atlas_size)
+    assert_no_overlap(sizes, positions, atlas_size, padding)
+
+
+@pytest.mark.parametrize('padding', [0, 1, 4])
+@pytest.mark.parametrize('power_of_two', [True, False])
+def test_pack_pages(padding, power_of_two):
+    sizes = random_sizes(150)
+    packer = AtlasPacker(padding, power_of_two, max_size=1024)
+    pages = packer.pack_pages(sizes)
+
+    assert len(pages) > 1
+    # Each rectangle is placed in a single page
+    assert sorted([i for indices, _, _ in pages for i in indices]) == list(range(len(sizes)))
+    for indices, positions, atlas_size in pages:
+        assert len(indices) == len(positions)
+        assert max(atlas_size) <= 1024
+        if power_of_two:
+            assert all(size & (size - 1) == 0 for size in atlas_size)
+        assert_no_overlap([sizes[i] for i in indices], positions, atlas_size, padding)
+
+
+def test_single_page_without_limit():
+    sizes = random_sizes(150)
+    pages = AtlasPacker(1).pack_pages(sizes)
+    assert len(pages) == 1
+    indices, positions, atlas_size = pages[0]
+    assert sorted(indices) == list(range(len(sizes)))
+    assert_no_overlap([sizes[i] for i in indices], positions, atlas_size, 1)
+
+
+def test_pack_is_deterministic():
+    sizes = random_sizes(50)
+    assert AtlasPacker(1).pack(sizes) == AtlasPacker(1).pack(sizes)
+
+
+def test_rectangle_bigger_than_a_page():
+    with pytest.raises(ValueError):
+        AtlasPacker(1, max_size=256).pack_pages([(100, 100), (300, 10)])
+
+
+def test_max_size_is_rounded_down_to_a_power_of_two():
+    assert AtlasPacker(max_size=1000).get_max_size() == 512
+    assert AtlasPacker(power_of_two=False, max_size=1000).get_max_size() == 1000
+    assert AtlasPacker().get_max_size() is None
+
+
+def test_padding_on_the_border():
+    # The padding of the rectangles on the right and bottom sides can be outside of the atlas
+    positions, atlas_size = AtlasPacker(2).pack([(64, 64)])
+    assert positions == [(0, 0)]
+    assert atlas_size == (64, 64)
+
+
+def test_empty():
+    assert AtlasPacker().pack([]) == ([], (1, 1))
+    assert AtlasPacker().pack_pages([]) == [([], [], (1, 1))]
@@ -0,0 +1,51 @@
+import threading
+import pytest
+from py3dtilers.Common import BackgroundWriter, RunReport
+
+
+@pytest.fixture(autouse=True)
+def empty_report():
+    RunReport.reset()
+    yield
+    RunReport.reset()
+
+
+def test_write_bytes(tmp_path):
+    writer = BackgroundWriter(threads=3, queue_size=4)
+    for i in range(20):
+        writer.write_bytes(tmp_path / 'tiles' / f'{i}.b3dm', bytes([i]) * (i + 1))
+    writer.flush()
+    for i in range(20):
+        assert (tmp_path / 'tiles' / f'{i}.b3dm').read_bytes() == bytes([i]) * (i + 1)
+    section = RunReport.get_section('writer')
+    assert section['writes'] == 20
+    assert 1 <= section['max_queue_depth'] <= 4
+
+
+def test_queue_is_bounded():
+    writer = BackgroundWriter(threads=1, queue_size=2)
+    release = threading.Event()
+    writer.submit(release.wait)
+    writer.submit(release.wait)
+    # The queue is full, the next submit waits until a write is done
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (writer.submit(release.wait), submitted.set()))
+    thread.start()
+    assert not submitted.wait(0.2)
+    release.set()
+    assert submitted.wait(5)
+    thread.join()
+    writer.flush()
+    assert RunReport.get_section('writer')['max_queue_depth'] == 2
+
+
+def test_errors_are_raised_by_flush(tmp_path):
+    def fail():
+        raise OSError('disk full')
+
+    writer = BackgroundWriter()
+    writer.submit(fail)
+    writer.write_bytes(tmp_path / 'tile.b3dm', b'b3dm')
+    with pytest.raises(OSError, match='disk full'):
+        writer.flush()
+    assert (tmp_path / 'tile.b3dm').read_bytes() == b'b3dm'
@@ -0,0 +1,109 @@
+import copy
+import numpy as np
+import pytest
+from pyproj import Transformer
+from py3dtilers.Common import Feature, FeatureList, TransformPipeline
+
+
+def legacy_translate(feature_list, offset):
+    """
+    The former FeatureList.translate_features, looping over each vertex.
+    """
+    for feature in feature_list.get_features():
+        feature.set_triangles([[np.array(points + offset) for points in triangle] for triangle in feature.get_geom_as_triangles()])
+        feature.set_box()
+
+
+def legacy_height_mult(feature_list, height_mult):
+    """
+    The former FeatureList.height_mult_features, looping over each vertex.
+    """
+    for feature in feature_list.get_features():
+        feature.set_triangles([[np.array([vertex[0], vertex[1], vertex[2] * height_mult]) for vertex in triangle]
+                               for triangle in feature.get_geom_as_triangles()])
+        feature.set_box()
+
+
+def legacy_scale(feature_list, scale_factor, centroid):
+    """
+    The former FeatureList.scale_features, looping over each vertex.
+    """
+    for feature in feature_list.get_features():
+        feature.set_triangles([[((vertex - centroid) * scale_factor) + centroid for vertex in triangle]
+                               for triangle in feature.get_geom_as_triangles()])
+        feature.set_box()
+
+
+@pytest.fixture
+def feature_list():
+    rng = np.random.default_rng(0)
+    features = list()
+    for i, nb_triangles in enumerate([5, 1, 12, 3]):
+        feature = Feature(str(i))
+        feature.set_triangles(rng.uniform([1000, 2000, 0], [1100, 2100, 40], (nb_triangles, 3, 3)))
+        feature.set_box()
+        features.append(feature)
+    return FeatureList(features)
+
+
+def assert_same_features(feature_list, expected_list):
+    for feature, expected in zip(feature_list, expected_list):
+        assert np.allclose(feature.get_geom_as_triangles(), expected.get_geom_as_triangles(), rtol=0, atol=1e-6)
+        assert np.allclose(feature.get_centroid(), expected.get_centroid(), rtol=0, atol=1e-6)
+        assert np.allclose(feature.get_bounding_volume_box().get_corners(), expected.get_bounding_volume_box().get_corners(), rtol=0, atol=1e-6)
+
+
+def test_translate(feature_list):
+    expected = copy.deepcopy(feature_list)
+    legacy_translate(expected, np.array([-1000, -2000, 5]))
+    feature_list.translate_features([-1000, -2000, 5])
+    assert_same_features(feature_list, expected)
+
+
+def test_height_mult(feature_list):
+    expected = copy.deepcopy(feature_list)
+    legacy_height_mult(expected, 0.3048)
+    feature_list.height_mult_features(0.3048)
+    assert_same_features(feature_list, expected)
+
+
+def test_scale(feature_list):
+    centroid = feature_list.get_centroid()
+    expected = copy.deepcopy(feature_list)
+    legacy_scale(expected, 2.5, centroid)
+    feature_list.scale_features(2.5, centroid)
+    assert_same_features(feature_list, expected)
+
+
+def test_transforms_update_the_features(feature_list):
+    # The features of the list are transformed in place, through the views of the geometry store
+    feature = feature_list[2]
+    triangles = feature.get_geom_as_triangles().copy()
+    feature_list.translate_features([1, 2, 3])
+    feature_list.height_mult_features(2)
+    expected = triangles + [1, 2, 3]
+    expected[:, :, 2] *= 2
+    assert np.allclose(feature.get_geom_as_triangles(), expected)
+    assert np.allclose(feature.get_centroid(), (np.min(expected.reshape((-1, 3)), axis=0) + np.max(expected.reshape((-1, 3)), axis=0)) / 2)
+
+
+def legacy_change_crs(feature_list, transformer, offset):
+    """
+    The former FeatureList.change_crs, reprojecting the vertices one by one.
+    """
+    for feature in feature_list.get_features():
+        feature.set_triangles([[np.array(transformer.transform(*(point + offset))) for point in triangle]
+                               for triangle in feature.get_geom_as_triangles()])
+        feature.set_box()
+
+
+@pytest.mark.parametrize('threads', [1, 3])
+def test_change_crs(feature_list, threads, monkeypatch):
+    # Small chunks, so the vertices are reprojected in several calls (and threads)
+    monkeypatch.setattr(TransformPipeline, 'CHUNK_SIZE', 8)
+    transformer = Transformer.from_crs('EPSG:3946', 'EPSG:4978', always_xy=True)
+    feature_list.translate_features([1840000, 5170000, 150])
+    expected = copy.deepcopy(feature_list)
+    legacy_change_crs(expected, transformer, np.array([5, 5, 0]))
+    feature_list.change_crs(transformer, np.array([5, 5, 0]), threads=threads)
+    assert_same_features(feature_list, expected)
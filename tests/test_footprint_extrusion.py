@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Polygon
+from py3dtilers.Common import Feature, FeatureList, ExtrudedPolygon, FootprintExtruder
+
+# An L-shaped footprint (concave)
+CONCAVE = Polygon([(0, 0), (20, 0), (20, 8), (8, 8), (8, 15), (0, 15)])
+# A footprint with a courtyard
+HOLED = Polygon([(100, 0), (130, 0), (130, 30), (100, 30)], [[(110, 10), (120, 10), (120, 20), (110, 20)]])
+
+
+def create_walls(polygon, height):
+    """
+    Create the triangles of the walls of a footprint, from Z=0 to the height.
+    """
+    triangles = list()
+    for ring in [polygon.exterior] + list(polygon.interiors):
+        coordinates = list(ring.coords)
+        for (x0, y0), (x1, y1) in zip(coordinates[:-1], coordinates[1:]):
+            triangles += [[[x0, y0, 0], [x1, y1, 0], [x1, y1, height]], [[x0, y0, 0], [x1, y1, height], [x0, y0, height]]]
+    return np.array(triangles, dtype=np.float64)
+
+
+def create_feature(id, polygon, height):
+    feature = Feature(id)
+    feature.set_triangles(create_walls(polygon, height))
+    feature.set_box()
+    return feature
+
+
+def get_area(triangles):
+    return np.sum(np.abs(np.cross(triangles[:, 1, 0:2] - triangles[:, 0, 0:2], triangles[:, 2, 0:2] - triangles[:, 0, 0:2]))) / 2
+
+
+def get_upper_faces(triangles):
+    return triangles[np.all(triangles[:, :, 2] == np.max(triangles[:, :, 2]), axis=1)]
+
+
+@pytest.mark.parametrize('polygon', [CONCAVE, HOLED])
+def test_footprint_is_the_convex_hull(polygon):
+    extrusion = ExtrudedPolygon('extrusion', [create_feature('building', polygon, 10)])
+    footprint = Polygon(extrusion.points)
+    assert footprint.equals(polygon.convex_hull)
+
+    triangles = extrusion.get_geom_as_triangles()
+    upper_faces = get_upper_faces(triangles)
+    assert np.isclose(get_area(upper_faces), polygon.convex_hull.area)
+    assert np.allclose(upper_faces[:, :, 2], 10)
+    assert np.isclose(np.min(triangles[:, :, 2]), 0)
+    # The upper faces look up
+    normals = np.cross(upper_faces[:, 1] - upper_faces[:, 0], upper_faces[:, 2] - upper_faces[:, 0])
+    assert np.all(normals[:, 2] > 0)
+
+
+def test_earcut_on_a_concave_polygon():
+    feature = create_feature('building', CONCAVE, 10)
+    polygon = np.array(CONCAVE.exterior.coords)[:-1]
+    extrusion = ExtrudedPolygon('extrusion', [feature], polygon=polygon)
+    upper_faces = get_upper_faces(extrusion.get_geom_as_triangles())
+
+    # Earcut covers the polygon without going out of it
+    assert len(upper_faces) == len(polygon) - 2
+    assert np.isclose(get_area(upper_faces), CONCAVE.area)
+    centers = shapely.points(np.mean(upper_faces[:, :, 0:2], axis=1))
+    assert np.all(shapely.contains(CONCAVE, centers))
+    normals = np.cross(upper_faces[:, 1] - upper_faces[:, 0], upper_faces[:, 2] - upper_faces[:, 0])
+    assert np.all(normals[:, 2] > 0)
+
+
+def test_earcut_on_a_clockwise_polygon():
+    feature = create_feature('building', CONCAVE, 10)
+    polygon = np.array(CONCAVE.exterior.coords)[:-1][::-1]
+    extrusion = ExtrudedPolygon('extrusion', [feature], polygon=polygon)
+    upper_faces = get_upper_faces(extrusion.get_geom_as_triangles())
+    normals = np.cross(upper_faces[:, 1] - upper_faces[:, 0], upper_faces[:, 2] - upper_faces[:, 0])
+    assert np.all(normals[:, 2] > 0)
+    assert np.isclose(get_area(upper_faces), CONCAVE.area)
+
+
+def test_extruder_matches_the_extrusion_of_each_feature():
+    features = [create_feature('concave', CONCAVE, 10), create_feature('holed', HOLED, 25)]
+    empty = Feature('empty')
+    empty.set_triangles(np.zeros((0, 3, 3)))
+    features.insert(1, empty)
+    store = FeatureList(features).get_geometry_store()
+    triangles, batch_ids = FootprintExtruder().extrude(store.vertices, store.offsets)
+
+    assert set(batch_ids.tolist()) == {0, 2}
+    for index in [0, 2]:
+        extrusion = ExtrudedPolygon('extrusion', [features[index]]).get_geom_as_triangles()
+        feature_triangles = triangles[batch_ids == index]
+        assert len(feature_triangles) == len(extrusion)
+        assert np.isclose(get_area(get_upper_faces(feature_triangles)), get_area(get_upper_faces(extrusion)))
+        # The upper faces are fans instead of earcut triangles, but the vertices are the same
+        assert np.allclose(np.unique(feature_triangles.reshape((-1, 3)), axis=0), np.unique(extrusion.reshape((-1, 3)), axis=0))
+
+
+def test_convex_hulls():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, (300, 2))
+    indices = rng.integers(0, 10, 300)
+    hull_points, hull_indices = FootprintExtruder.get_convex_hulls(points, indices, 10)
+    for index in range(10):
+        hull = Polygon(hull_points[hull_indices == index])
+        assert hull.is_valid
+        assert not hull.exterior.is_ccw
+        assert hull.equals(shapely.convex_hull(shapely.multipoints(points[indices == index])))
+
+
+def test_aligned_vertices():
+    triangles = np.array([[[0, 0, 0], [10, 0, 0], [10, 0, 5]], [[0, 0, 0], [10, 0, 5], [0, 0, 5]]], dtype=np.float64)
+    triangles, batch_ids = FootprintExtruder().extrude(triangles.reshape((-1, 3)), np.array([0, 6]))
+    assert len(triangles) > 0
+    assert get_area(get_upper_faces(triangles)) > 0
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from py3dtilers.Common import Feature, FeatureList, GeometryStore, TriangleArray
+
+
+def create_feature(id, nb_triangles, rng, with_uvs=True):
+    feature = Feature(id)
+    feature.set_triangles(rng.uniform(-100, 100, (nb_triangles, 3, 3)))
+    if with_uvs:
+        feature.geom.set_layer(1, rng.uniform(0, 1, (nb_triangles, 3, 2)))
+    return feature
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    return [create_feature(str(i), nb_triangles, rng) for i, nb_triangles in enumerate([4, 1, 7, 2])]
+
+
+def test_triangle_array_converts_lists():
+    triangles = [[np.array([0., 0., 0.]), np.array([1., 0., 0.]), np.array([0., 1., 0.])]]
+    geom = TriangleArray(triangles=[triangles])
+    layer = geom.get_layer(0)
+    assert isinstance(layer, np.ndarray)
+    assert layer.shape == (1, 3, 3)
+    assert geom.get_number_of_triangles() == 1
+    assert np.array_equal(geom.get_vertex_array(), np.array(triangles).reshape((-1, 3)))
+
+
+def test_offsets(features):
+    store = GeometryStore(features)
+    assert len(store) == len(features)
+    assert store.offsets.tolist() == [0, 12, 15, 36, 42]
+    assert store.get_sizes().tolist() == [12, 3, 21, 6]
+
+
+def test_round_trip(features):
+    triangles = [feature.get_geom_as_triangles().copy() for feature in features]
+    uvs = [feature.geom.get_layer(1).copy() for feature in features]
+    store = GeometryStore(features)
+
+    assert store.is_valid(features)
+    assert np.array_equal(store.vertices, np.concatenate(triangles).reshape((-1, 3)))
+    assert np.array_equal(store.get_uvs(), np.concatenate(uvs).reshape((-1, 2)))
+    for i, feature in enumerate(features):
+        assert np.array_equal(feature.get_geom_as_triangles(), triangles[i])
+        assert np.array_equal(feature.geom.get_layer(1), uvs[i])
+        assert np.array_equal(store.get_vertices(i), triangles[i].reshape((-1, 3)))
+
+    # The geometry of the features is a view of the store
+    store.vertices += 1
+    for i, feature in enumerate(features):
+        assert np.array_equal(feature.get_geom_as_triangles(), triangles[i] + 1)
+
+
+def test_store_of_feature_list(features):
+    feature_list = FeatureList(features)
+    store = feature_list.get_geometry_store()
+    assert feature_list.get_geometry_store() is store
+    features[0].set_triangles(np.zeros((1, 3, 3)))
+    assert not store.is_valid(features)
+
+
+def test_store_with_moved_views(features):
+    store = GeometryStore(features)
+    # Views of the stored arrays, but not at the rows of their features
+    vertices = features[1].geom.triangles[0]
+    features[1].geom.triangles[0] = store.vertices[0:3].reshape((-1, 3, 3))
+    assert not store.is_valid(features)
+    features[1].geom.triangles[0] = vertices
+    assert store.is_valid(features)
+    features[2].geom.triangles[1] = features[2].geom.triangles[1][:-1]
+    assert not store.is_valid(features)
+
+
+def test_layers_of_different_widths():
+    rng = np.random.default_rng(0)
+    features = [create_feature('a', 2, rng), create_feature('b', 3, rng, with_uvs=False)]
+    features[1].geom.set_layer(1, rng.uniform(0, 1, (3, 3, 3)))
+    store = GeometryStore(features)
+    assert store.get_uvs() is None
+    assert store.vertices.shape == (15, 3)
+
+
+def test_weld_vertices():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0],
+                          [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float64)
+    batch_ids = np.zeros(6, dtype=np.uint32)
+    first, inverse = TriangleArray.weld_vertices([positions, None, batch_ids])
+    assert first.tolist() == [0, 1, 2, 4]
+    assert inverse.tolist() == [0, 1, 2, 1, 3, 2]
+    assert np.array_equal(positions[first][inverse], positions)
+
+
+def test_weld_vertices_keeps_different_attributes():
+    positions = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0],
+                          [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float64)
+    batch_ids = np.array([0, 0, 0, 1, 1, 1], dtype=np.uint32)
+    first, inverse = TriangleArray.weld_vertices([positions, batch_ids])
+    assert first.tolist() == [0, 1, 2, 3, 4, 5]
+    assert inverse.tolist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_weld_vertices_with_signed_zeros():
+    positions = np.array([[0, 0, 1], [-0., 0, 1], [0, -0., 1], [1, 0, 0]], dtype=np.float32)
+    normals = np.array([[0, -0., 1], [0, 0, 1], [-0., 0, 1], [0, 0, 1]], dtype=np.float32)
+    first, inverse = TriangleArray.weld_vertices([positions, normals])
+    assert first.tolist() == [0, 3]
+    assert inverse.tolist() == [0, 0, 0, 1]
+
+
+def test_get_bounding_boxes(features):
+    empty = Feature('empty')
+    empty.set_triangles(np.zeros((0, 3, 3)))
+    features.insert(1, empty)
+    mins, maxs = GeometryStore(features).get_bounding_boxes()
+
+    assert np.all(np.isnan(mins[1])) and np.all(np.isnan(maxs[1]))
+    for i, feature in enumerate(features):
+        if i == 1:
+            continue
+        vertices = feature.get_vertex_array()
+        assert np.array_equal(mins[i], np.min(vertices, axis=0))
+        assert np.array_equal(maxs[i], np.max(vertices, axis=0))
@@ -0,0 +1,123 @@
+import numpy as np
+from py3dtilers.Common import Feature, FeatureList, kd_tree
+from py3dtilers.Common.kd_tree import split_on_budget
+
+
+def create_features(nb_features, seed=0):
+    rng = np.random.default_rng(seed)
+    features = list()
+    for i, centroid in enumerate(rng.uniform([0, 0, 0], [1000, 1000, 100], (nb_features, 3))):
+        feature = Feature(str(i))
+        # Round the centroids, so many features share the median value of a level
+        feature.centroid = np.round(centroid / 50) * 50
+        features.append(feature)
+    return features
+
+
+def legacy_kd_tree(feature_list, maxNumObjects, depth=0):
+    """
+    The former kd-tree, sorting the features at each level of the recursion.
+    """
+    derived = feature_list.__class__
+    axis = depth % 2
+    feature_list.set_features(sorted(feature_list, key=lambda obj: obj.get_centroid()[axis]))
+    median = len(feature_list) // 2
+    lObjects = feature_list[:median]
+    rObjects = feature_list[median:]
+    pre_tiles = derived()
+    if len(lObjects) > maxNumObjects or len(rObjects) > maxNumObjects:
+        pre_tiles.extend(legacy_kd_tree(lObjects, maxNumObjects, depth + 1))
+        pre_tiles.extend(legacy_kd_tree(rObjects, maxNumObjects, depth + 1))
+    else:
+        if len(lObjects) > 0:
+            pre_tiles.append(lObjects)
+        if len(rObjects) > 0:
+            pre_tiles.append(rObjects)
+    return pre_tiles
+
+
+def get_ids(groups):
+    return [[feature.get_id() for feature in group] for group in groups]
+
+
+def test_kd_tree_matches_legacy_split():
+    features = create_features(2000)
+    for max_objects in [1, 7, 50, 500, 5000]:
+        legacy_groups = legacy_kd_tree(FeatureList(list(features)), max_objects)
+        groups = kd_tree(FeatureList(list(features)), max_objects)
+        assert get_ids(groups) == get_ids(legacy_groups)
+
+
+def test_kd_tree_sorts_the_feature_list():
+    features = create_features(100)
+    feature_list = FeatureList(list(features))
+    legacy_feature_list = FeatureList(list(features))
+    kd_tree(feature_list, 10)
+    legacy_kd_tree(legacy_feature_list, 10)
+    assert get_ids([feature_list]) == get_ids([legacy_feature_list])
+
+
+def test_split_on_budget():
+    rng = np.random.default_rng(0)
+    centroids = rng.uniform(0, 1000, (500, 2))
+    triangles = rng.integers(1, 400, 500).astype(np.float64)
+    triangles[3] = 5000
+    weights = np.stack([np.ones(500), triangles], axis=1)
+    limits = np.array([40., 2000.])
+    leaves = list()
+    split_on_budget(centroids, np.arange(500), weights, limits, 0, 0, leaves)
+
+    # Each feature is in a single group
+    assert sorted(np.concatenate(leaves).tolist()) == list(range(500))
+    for leaf in leaves:
+        # Only a single feature can exceed a limit
+        assert len(leaf) == 1 or np.all(np.sum(weights[leaf], axis=0) <= limits)
+    assert [3] in [leaf.tolist() for leaf in leaves]
+
+
+def test_split_on_budget_keeps_a_fitting_group():
+    centroids = np.zeros((10, 2))
+    weights = np.ones((10, 1))
+    leaves = list()
+    split_on_budget(centroids, np.arange(10), weights, np.array([10.]), 0, 0, leaves)
+    assert [leaf.tolist() for leaf in leaves] == [list(range(10))]
+
+
+def test_kd_tree_with_triangle_budget():
+    features = create_features(300)
+    for i, feature in enumerate(features):
+        feature.set_triangles(np.zeros((1 + i % 20, 3, 3)))
+    groups = kd_tree(FeatureList(list(features)), 100, max_triangles=200)
+    assert sorted([feature.get_id() for group in groups for feature in group]) == sorted([feature.get_id() for feature in features])
+    for group in groups:
+        assert len(group) <= 100
+        assert sum([feature.get_number_of_triangles() for feature in group]) <= 200
+
+
+def legacy_kd_tree_3d(feature_list, maxNumObjects):
+    """
+    Split the features on the longest axis of the bounding box of their centroids, sorting them at each level.
+    """
+    centroids = np.array([feature.get_centroid() for feature in feature_list])
+    axis = int(np.argmax(np.ptp(centroids, axis=0)))
+    features = sorted(feature_list, key=lambda obj: obj.get_centroid()[axis])
+    median = len(features) // 2
+    halves = [features[:median], features[median:]]
+    if len(halves[0]) > maxNumObjects or len(halves[1]) > maxNumObjects:
+        return legacy_kd_tree_3d(halves[0], maxNumObjects) + legacy_kd_tree_3d(halves[1], maxNumObjects)
+    return [half for half in halves if len(half) > 0]
+
+
+def test_kd_tree_3d_splits_on_the_longest_axis():
+    # A tower: the centroids spread on Z much more than on X and Y
+    rng = np.random.default_rng(0)
+    features = list()
+    for i, centroid in enumerate(rng.uniform([0, 0, 0], [10, 20, 1000], (64, 3))):
+        feature = Feature(str(i))
+        feature.centroid = centroid
+        features.append(feature)
+    groups = kd_tree(FeatureList(list(features)), 8, use_3d=True)
+    assert get_ids(groups) == get_ids(legacy_kd_tree_3d(features, 8))
+    # The groups are stacked floors of the tower
+    heights = [[feature.get_centroid()[2] for feature in group] for group in groups]
+    assert all(max(lower) <= min(upper) for lower, upper in zip(heights, heights[1:]))
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from pyproj import Transformer
+from py3dtilers.Common import LocalFrame
+
+ORIGIN = np.array([1843000., 5175000., 170.])
+
+
+@pytest.fixture
+def transformer():
+    return Transformer.from_crs('EPSG:3946', 'EPSG:4978', always_xy=True)
+
+
+def random_points(mins, maxs, nb_points=500):
+    return np.random.default_rng(0).uniform(mins, maxs, (nb_points, 3))
+
+
+def test_origin_is_exact(transformer):
+    frame = LocalFrame(transformer, ORIGIN, [100, 100, 20])
+    assert np.allclose(frame.center, transformer.transform(*ORIGIN), rtol=0, atol=1e-6)
+    assert np.allclose(frame.approximate(ORIGIN[np.newaxis, :]), frame.center, rtol=0, atol=1e-9)
+
+
+def test_small_tile(transformer):
+    mins, maxs = ORIGIN - [50, 50, 10], ORIGIN + [50, 50, 10]
+    frame = LocalFrame(transformer, ORIGIN, maxs - mins)
+    points = random_points(mins, maxs)
+    errors = np.linalg.norm(frame.approximate(points) - frame.reproject(points), axis=1)
+    max_error = frame.get_max_error(mins, maxs)
+    assert max_error < 0.01
+    # The error is the highest on the corners of the box
+    assert np.max(errors) <= max_error + 1e-9
+
+
+def test_error_grows_with_the_extent(transformer):
+    errors = list()
+    for size in [100, 1000, 10000]:
+        half_size = np.array([size, size, 20]) / 2
+        frame = LocalFrame(transformer, ORIGIN, 2 * half_size)
+        errors.append(frame.get_max_error(ORIGIN - half_size, ORIGIN + half_size))
+    assert errors[0] < errors[1] < errors[2]
+    # The error of the linearization grows with the square of the extent
+    assert errors[2] / errors[1] > 50
+
+
+def test_transform_places_the_local_vertices(transformer):
+    frame = LocalFrame(transformer, ORIGIN, [100, 100, 20])
+    points = random_points(ORIGIN - [50, 50, 10], ORIGIN + [50, 50, 10], 10)
+    transform = frame.get_transform(frame.center)
+    local = np.column_stack((points - ORIGIN, np.ones(len(points))))
+    placed = np.matmul(local, transform.T)[:, 0:3]
+    assert np.allclose(placed, frame.approximate(points), rtol=0, atol=1e-6)
+    assert np.allclose(placed, frame.reproject(points), rtol=0, atol=0.01)
@@ -0,0 +1,79 @@
+import numpy as np
+import pygltflib
+from py3dtiles.tileset.content import GltfAttribute, GltfPrimitive
+from py3dtilers.Common import MeshQuantizer
+
+
+def create_primitive(rng, nb_vertices, offset):
+    points = rng.uniform([-50, 0, 10], [150, 20, 12], (nb_vertices, 3)).astype(np.float32) + offset
+    normals = rng.normal(size=(nb_vertices, 3))
+    normals = (normals / np.linalg.norm(normals, axis=1)[:, np.newaxis]).astype(np.float32)
+    uvs = rng.uniform(0, 1, (nb_vertices, 2)).astype(np.float32)
+    colors = GltfAttribute('COLOR_0', pygltflib.VEC3, pygltflib.FLOAT, rng.uniform(0, 1, (nb_vertices, 3)).astype(np.float32))
+    return GltfPrimitive(points, normals=normals, uvs=uvs, additional_attributes=[colors])
+
+
+def test_decoded_positions_are_within_the_stated_precision():
+    rng = np.random.default_rng(0)
+    primitives = [create_primitive(rng, 300, np.float32(0)), create_primitive(rng, 200, np.float32(30))]
+    positions = [primitive.points.array.astype(np.float64) for primitive in primitives]
+    quantizer = MeshQuantizer(primitives)
+    for primitive in primitives:
+        quantizer.quantize(primitive)
+
+    all_positions = np.concatenate(positions)
+    size = np.max(all_positions, axis=0) - np.min(all_positions, axis=0)
+    matrix = quantizer.get_matrix()
+    for primitive, original in zip(primitives, positions):
+        assert primitive.points.array.dtype == np.int16
+        assert primitive.points.array.shape == (len(original), 4)
+        normalized = primitive.points.array[:, 0:3] / np.iinfo(np.int16).max
+        decoded = (np.hstack([normalized, np.ones((len(normalized), 1))]) @ matrix.T)[:, 0:3]
+        # The precision is the size of the tile divided by 65534 on each axis, the rounding error is half of it
+        assert np.all(np.abs(decoded - original) <= size / 65534 / 2 * (1 + 1e-6))
+
+
+def test_decoded_attributes():
+    rng = np.random.default_rng(1)
+    primitive = create_primitive(rng, 500, np.float32(0))
+    # A cubic tile, the precision of the normals decreases when the node matrix isn't a uniform scale
+    primitive.points = GltfAttribute('POSITION', pygltflib.VEC3, pygltflib.FLOAT, rng.uniform(0, 100, (500, 3)).astype(np.float32))
+    normals = primitive.normals.array.astype(np.float64)
+    uvs = primitive.uvs.array.astype(np.float64)
+    colors = primitive.additional_attributes[0].array.astype(np.float64)
+    quantizer = MeshQuantizer([primitive])
+    quantizer.quantize(primitive)
+
+    assert primitive.uvs.array.dtype == np.uint16
+    assert np.all(np.abs(primitive.uvs.array / 65535 - uvs) <= 0.5 / 65535 + 1e-7)
+    assert primitive.additional_attributes[0].array.dtype == np.uint8
+    assert np.all(np.abs(primitive.additional_attributes[0].array[:, 0:3] / 255 - colors) <= 0.5 / 255 + 1e-7)
+    assert np.all(primitive.additional_attributes[0].array[:, 3] == 255)
+
+    # The node matrix scales the normals by the inverse of the half size
+    assert primitive.normals.array.dtype == np.int8
+    decoded = (primitive.normals.array[:, 0:3] / 127) / quantizer.half_size
+    decoded /= np.linalg.norm(decoded, axis=1)[:, np.newaxis]
+    assert np.all(np.sum(decoded * normals, axis=1) > 0.99)
+
+
+def test_attributes_out_of_range_are_kept_as_floats():
+    rng = np.random.default_rng(2)
+    primitive = create_primitive(rng, 10, np.float32(0))
+    primitive.uvs = GltfAttribute('TEXCOORD_0', pygltflib.VEC2, pygltflib.FLOAT, rng.uniform(0, 2, (10, 2)).astype(np.float32))
+    MeshQuantizer([primitive]).quantize(primitive)
+    assert primitive.uvs.array.dtype == np.float32
+
+
+def test_flat_axis():
+    points = np.array([[0, 0, 5], [10, 0, 5], [0, 10, 5]], dtype=np.float32)
+    primitive = GltfPrimitive(points)
+    quantizer = MeshQuantizer([primitive])
+    quantizer.quantize(primitive)
+    assert quantizer.half_size[2] == 1.
+    assert np.all(primitive.points.array[:, 2] == 0)
+
+
+def test_to_normalized():
+    assert MeshQuantizer.to_normalized([-2., -1., 0., 0.5, 1., 2.], np.int8).tolist() == [-127, -127, 0, 64, 127, 127]
+    assert MeshQuantizer.to_normalized([-1., 0., 1.], np.uint8).tolist() == [0, 0, 255]
@@ -0,0 +1,82 @@
+import numpy as np
+from py3dtilers.Common import MeshSimplifier, TriangleArray
+
+
+def create_grid(size, height=None):
+    """
+    Create a grid of size x size squares, two triangles per square, on the XY plane or on a height function.
+    """
+    x, y = np.meshgrid(np.arange(size + 1, dtype=np.float64), np.arange(size + 1, dtype=np.float64), indexing='ij')
+    z = np.zeros_like(x) if height is None else height(x, y)
+    points = np.stack([x, y, z], axis=-1)
+    a = points[:-1, :-1].reshape((-1, 3))
+    b = points[1:, :-1].reshape((-1, 3))
+    c = points[1:, 1:].reshape((-1, 3))
+    d = points[:-1, 1:].reshape((-1, 3))
+    return np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)])
+
+
+def test_flat_grid():
+    triangles = create_grid(20)
+    simplifier = MeshSimplifier(triangles)
+    assert simplifier.get_number_of_triangles() == 800
+    error = simplifier.simplify(400)
+
+    simplified = simplifier.get_triangles()
+    assert len(simplified) <= 400
+    # The collapses on a plane have no cost and keep the vertices on the plane
+    assert error < 1e-6
+    assert np.allclose(simplified[:, :, 2], 0)
+    # The grid keeps its outline and its area, without flipped triangles
+    normals = TriangleArray.compute_triangle_normals(simplified)
+    assert np.allclose(normals, [0, 0, 1])
+    area = np.sum(np.linalg.norm(np.cross(simplified[:, 1] - simplified[:, 0], simplified[:, 2] - simplified[:, 0]), axis=1)) / 2
+    assert np.isclose(area, 400)
+    assert np.allclose(np.min(simplified.reshape((-1, 3)), axis=0), [0, 0, 0])
+    assert np.allclose(np.max(simplified.reshape((-1, 3)), axis=0), [20, 20, 0])
+
+
+def wave(x, y):
+    return np.sin(x / 3) * np.cos(y / 4)
+
+
+def test_curved_grid():
+    triangles = create_grid(20, wave)
+    simplifier = MeshSimplifier(triangles)
+    error = simplifier.simplify(200)
+    simplified = simplifier.get_triangles()
+
+    assert len(simplified) <= 200
+    assert error > 0
+    assert not np.any(MeshSimplifier.is_degenerated(simplifier.faces))
+    # The vertices of the simplified mesh stay close to the original surface
+    vertices = simplified.reshape((-1, 3))
+    assert np.max(np.abs(vertices[:, 2] - wave(vertices[:, 0], vertices[:, 1]))) < 1
+
+
+def test_groups_do_not_share_vertices():
+    left = create_grid(10)
+    right = create_grid(10) + [10, 0, 0]
+    triangles = np.concatenate([left, right])
+    groups = np.repeat([3, 7], [len(left), len(right)])
+    simplifier = MeshSimplifier(triangles, groups)
+    simplifier.simplify(100)
+
+    simplified = simplifier.get_triangles()
+    triangle_groups = simplifier.get_triangle_groups()
+    assert set(triangle_groups.tolist()) == {3, 7}
+    assert np.all(simplified[triangle_groups == 3][:, :, 0] <= 10)
+    assert np.all(simplified[triangle_groups == 7][:, :, 0] >= 10)
+
+
+def test_target_higher_than_the_mesh():
+    triangles = create_grid(3)
+    simplifier = MeshSimplifier(triangles)
+    assert simplifier.simplify(100) == 0.
+    assert np.array_equal(simplifier.get_triangles(), triangles)
+
+
+def test_empty_mesh():
+    simplifier = MeshSimplifier(np.zeros((0, 3, 3)))
+    assert simplifier.simplify(0) == 0.
+    assert simplifier.get_triangles().shape == (0, 3, 3)
@@ -0,0 +1,47 @@
+import numpy as np
+from shapely.geometry import Point, Polygon
+from py3dtilers.Common import PolygonIndex
+
+
+def find_containing_polygons(polygons, points):
+    """
+    The former search, testing the polygons one by one for each point.
+    """
+    indices = list()
+    for point in points:
+        index = -1
+        for i, polygon in enumerate(polygons):
+            if polygon.contains(Point(point[0], point[1])):
+                index = i
+                break
+        indices.append(index)
+    return indices
+
+
+def create_polygons(rng, nb_polygons):
+    polygons = list()
+    for x, y, radius in rng.uniform([0, 0, 5], [200, 200, 30], (nb_polygons, 3)):
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 8))
+        radii = rng.uniform(0.3, 1, 8) * radius
+        polygons.append(Polygon(np.stack([x + radii * np.cos(angles), y + radii * np.sin(angles)], axis=1)))
+    return polygons
+
+
+def test_matches_the_search_one_by_one():
+    rng = np.random.default_rng(0)
+    # The polygons overlap, the first one containing a point is kept
+    polygons = create_polygons(rng, 40)
+    points = rng.uniform(-20, 220, (2000, 3))
+    index = PolygonIndex(polygons)
+    assert index.find_containing_polygons(points).tolist() == find_containing_polygons(polygons, points)
+
+
+def test_holes():
+    polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (6, 4), (6, 6), (4, 6)]])
+    index = PolygonIndex([polygon, Polygon([(3, 3), (7, 3), (7, 7), (3, 7)])])
+    assert index.find_containing_polygons([(1, 1), (5, 5), (20, 20)]).tolist() == [0, 1, -1]
+
+
+def test_empty():
+    assert PolygonIndex([]).find_containing_polygons([(0, 0)]).tolist() == [-1]
+    assert PolygonIndex(create_polygons(np.random.default_rng(0), 3)).find_containing_polygons([]).tolist() == []
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from py3dtilers.Common import SpaceFillingCurve
+
+
+def grid(bits):
+    x, y = np.meshgrid(np.arange(1 << bits), np.arange(1 << bits), indexing='ij')
+    return x.ravel(), y.ravel()
+
+
+def test_morton_order():
+    # Z-order on a 4x4 grid: the bits of X and Y are interleaved, X being the lowest bit
+    x, y = grid(2)
+    keys = SpaceFillingCurve.morton_keys(x, y, 2)
+    assert keys[(x == 0) & (y == 0)] == 0
+    assert keys[(x == 1) & (y == 0)] == 1
+    assert keys[(x == 0) & (y == 1)] == 2
+    assert keys[(x == 1) & (y == 1)] == 3
+    assert keys[(x == 2) & (y == 0)] == 4
+    assert keys[(x == 3) & (y == 3)] == 15
+
+
+@pytest.mark.parametrize('curve', SpaceFillingCurve.CURVES)
+def test_keys_are_a_permutation_of_the_cells(curve):
+    x, y = grid(4)
+    keys = SpaceFillingCurve.morton_keys(x, y, 4) if curve == 'morton' else SpaceFillingCurve.hilbert_keys(x, y, 4)
+    assert sorted(keys.tolist()) == list(range(256))
+
+
+def test_hilbert_curve_is_continuous():
+    # Each cell is a neighbour of the previous cell along the curve
+    x, y = grid(5)
+    order = np.argsort(SpaceFillingCurve.hilbert_keys(x, y, 5))
+    steps = np.abs(np.diff(x[order])) + np.abs(np.diff(y[order]))
+    assert np.all(steps == 1)
+    assert (x[order[0]], y[order[0]]) == (0, 0)
+    assert (x[order[-1]], y[order[-1]]) == (31, 0)
+
+
+def test_argsort_points():
+    points = [[0, 0, 5], [10, 10, 0], [0.1, 9.9, 1], [9.9, 0.1, 2]]
+    curve = SpaceFillingCurve.from_points(points, 'hilbert', bits=2)
+    assert curve.argsort(points).tolist() == [0, 2, 1, 3]
+    curve = SpaceFillingCurve.from_points(points, 'morton', bits=2)
+    assert curve.argsort(points).tolist() == [0, 3, 2, 1]
+    # Points in the same cell keep their order
+    assert curve.argsort([[1, 1], [0, 0], [2, 2]]).tolist() == [0, 1, 2]
+
+
+def test_unknown_curve():
+    with pytest.raises(ValueError):
+        SpaceFillingCurve('peano')
@@ -0,0 +1,87 @@
+import numpy as np
+from PIL import Image
+from py3dtilers.Texture import Texture
+
+
+def legacy_update_uvs(uvs, rect):
+    """
+    The former Texture.updateUvs, looping over each UV.
+    """
+    offsetX = rect[0]
+    offsetY = rect[1]
+    ratioX = 1 / (rect[2] - rect[0]) if rect[2] != rect[0] else 1
+    ratioY = 1 / (rect[3] - rect[1]) if rect[3] != rect[1] else 1
+    for i in range(0, len(uvs)):
+        for y in range(0, 3):
+            new_u = (uvs[i][y][0] - offsetX) * ratioX
+            new_v = (uvs[i][y][1] - offsetY) * ratioY
+            uvs[i][y] = np.array([new_u, new_v])
+
+
+def legacy_update_uv(uvs, position, oldTexture, newTexture):
+    """
+    The former update of the UVs of a texture placed in an atlas, looping over each UV.
+    """
+    ratioWidth = oldTexture.size[0] / newTexture.size[0]
+    ratioHeight = oldTexture.size[1] / newTexture.size[1]
+    offsetWidth = position[0] / newTexture.size[0]
+    offsetHeight = position[1] / newTexture.size[1]
+    for i in range(0, len(uvs)):
+        for y in range(0, 3):
+            new_u = (uvs[i][y][0] * ratioWidth) + offsetWidth
+            new_v = (uvs[i][y][1] * ratioHeight) + offsetHeight
+            uvs[i][y] = np.array([new_u, new_v])
+
+
+def random_uvs(nb_triangles=100, seed=0):
+    return np.random.default_rng(seed).uniform(0.2, 0.7, (nb_triangles, 3, 2))
+
+
+def test_transform_uvs_of_an_array():
+    uvs = random_uvs()
+    legacy_uvs = uvs.copy()
+    image = Image.new('RGB', (300, 200))
+    atlas_image = Image.new('RGB', (1024, 512))
+    legacy_update_uv(legacy_uvs, (100, 250), image, atlas_image)
+
+    buffer = uvs
+    Texture.transform_uvs(uvs, [300 / 1024, 200 / 512], [100 / 1024, 250 / 512])
+    # The array is updated in place
+    assert uvs is buffer
+    assert np.allclose(uvs, legacy_uvs)
+
+
+def test_transform_uvs_of_a_list():
+    uvs = [[np.array(uv) for uv in triangle] for triangle in random_uvs(10)]
+    legacy_uvs = [[uv.copy() for uv in triangle] for triangle in uvs]
+    legacy_update_uvs(legacy_uvs, [0.2, 0.1, 0.7, 0.9])
+    Texture.transform_uvs(uvs, [2, 1.25], [-0.4, -0.125])
+    assert len(uvs) == 10
+    assert np.allclose(np.array(uvs), np.array(legacy_uvs))
+
+
+def test_transform_empty_uvs():
+    uvs = list()
+    Texture.transform_uvs(uvs, [2, 2], [1, 1])
+    assert uvs == []
+
+
+def test_update_uvs():
+    texture = Texture.__new__(Texture)
+    for rect in [[0.2, 0.3, 0.6, 0.9], [0.5, 0.5, 0.5, 0.8]]:
+        uvs = random_uvs()
+        legacy_uvs = uvs.copy()
+        legacy_update_uvs(legacy_uvs, rect)
+        texture.updateUvs(uvs, rect)
+        assert np.allclose(uvs, legacy_uvs)
+
+
+def test_crop_image():
+    texture = Texture.__new__(Texture)
+    uvs = random_uvs()
+    image = Image.new('RGB', (1000, 500))
+    cropped_image = texture.cropImage(image, uvs)
+
+    assert np.allclose(np.min(uvs.reshape((-1, 2)), axis=0), 0)
+    assert np.allclose(np.max(uvs.reshape((-1, 2)), axis=0), 1)
+    assert cropped_image.size[0] <= 500 and cropped_image.size[1] <= 250
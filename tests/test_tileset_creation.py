@@ -0,0 +1,315 @@
+import json
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+import numpy as np
+import pygltflib
+import pytest
+from PIL import Image
+from py3dtiles.tileset.content import read_binary_tile_content
+
+
+def create_geojson(path, nb_features=60, seed=0):
+    """
+    Write a GeoJSON file of round buildings, with their height in the HAUTEUR property.
+    """
+    rng = np.random.default_rng(seed)
+    features = list()
+    for i in range(nb_features):
+        x, y = rng.uniform([1843000, 5175000], [1843800, 5175800])
+        radius = rng.uniform(4, 12)
+        nb_points = int(rng.integers(5, 13))
+        ring = [[x + radius * math.cos(2 * math.pi * k / nb_points), y + radius * math.sin(2 * math.pi * k / nb_points), 170.] for k in range(nb_points)]
+        ring.append(ring[0])
+        features.append({'type': 'Feature',
+                         'properties': {'ID': 'building_' + str(i), 'HAUTEUR': float(rng.uniform(5, 40)), 'PREC_ALTI': 1.},
+                         'geometry': {'type': 'Polygon', 'coordinates': [ring]}})
+    with open(path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+    return path
+
+
+def create_textured_obj(directory, nb_objects=12, seed=0):
+    """
+    Write an OBJ file of textured squares, each square using its own image.
+    """
+    rng = np.random.default_rng(seed)
+    directory.mkdir()
+    obj_lines = ['mtllib materials.mtl']
+    mtl_lines = list()
+    for i in range(nb_objects):
+        size = tuple(rng.integers(16, 100, 2).tolist())
+        Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)).save(directory / f'image_{i}.png')
+        mtl_lines += [f'newmtl material_{i}', 'Kd 1 1 1', f'map_Kd image_{i}.png', '']
+        x, y = 20 * (i % 4), 20 * (i // 4)
+        obj_lines += [f'o object_{i}',
+                      f'v {x} {y} 0', f'v {x + 10} {y} 0', f'v {x + 10} {y + 10} 0', f'v {x} {y + 10} 0',
+                      'vt 0.1 0.1', 'vt 0.9 0.1', 'vt 0.9 0.8', 'vt 0.1 0.8',
+                      f'usemtl material_{i}',
+                      f'f {4 * i + 1}/{4 * i + 1} {4 * i + 2}/{4 * i + 2} {4 * i + 3}/{4 * i + 3}',
+                      f'f {4 * i + 1}/{4 * i + 1} {4 * i + 3}/{4 * i + 3} {4 * i + 4}/{4 * i + 4}']
+    (directory / 'materials.mtl').write_text('\n'.join(mtl_lines))
+    (directory / 'squares.obj').write_text('\n'.join(obj_lines))
+    return directory
+
+
+def run_tiler(package, arguments):
+    """
+    Run a tiler in a new process, as from the command line (the tilers keep counters in class attributes).
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([str(Path(__file__).parents[1]), os.environ.get('PYTHONPATH', '')]))
+    command = [sys.executable, '-c', f'from {package} import main; main()'] + [str(argument) for argument in arguments]
+    subprocess.run(command, env=environment, check=True, capture_output=True)
+
+
+def read_files(directory):
+    """
+    Return the content of the files of a directory, by relative path.
+    """
+    return {path.relative_to(directory).as_posix(): path.read_bytes() for path in sorted(Path(directory).rglob('*')) if path.is_file()}
+
+
+def read_accessor(gltf, index):
+    """
+    Read the array of a glTF accessor (without byte stride).
+    """
+    accessor = gltf.accessors[index]
+    dtype = {pygltflib.FLOAT: np.float32, pygltflib.UNSIGNED_SHORT: np.uint16, pygltflib.UNSIGNED_INT: np.uint32}[accessor.componentType]
+    width = {pygltflib.SCALAR: 1, pygltflib.VEC2: 2, pygltflib.VEC3: 3}[accessor.type]
+    offset = gltf.bufferViews[accessor.bufferView].byteOffset + (accessor.byteOffset or 0)
+    return np.frombuffer(gltf.binary_blob(), dtype=dtype, count=accessor.count * width, offset=offset).reshape((accessor.count, width))
+
+
+def read_triangles(path):
+    """
+    Read the triangles of a b3dm tile, without the degenerated triangles.
+    :return: the (n, 3, 3) triangles sorted by their coordinates, and the glTF of the tile
+    """
+    gltf = read_binary_tile_content(path).body.gltf
+    triangles = list()
+    for primitive in gltf.meshes[0].primitives:
+        positions = read_accessor(gltf, primitive.attributes.POSITION)
+        if primitive.indices is None:
+            triangles.append(positions.reshape((-1, 3, 3)))
+        else:
+            triangles.append(positions[read_accessor(gltf, primitive.indices).reshape((-1, 3))])
+    triangles = np.concatenate(triangles)
+    triangles = triangles[np.any(triangles[:, 0] != triangles[:, 1], axis=1) | np.any(triangles[:, 0] != triangles[:, 2], axis=1)]
+    return triangles[np.lexsort(triangles.reshape((-1, 9)).T)], gltf
+
+
+@pytest.fixture
+def geojson(tmp_path):
+    return create_geojson(tmp_path / 'buildings.geojson')
+
+
+def create_geojson_tileset(geojson, output_dir, *options):
+    run_tiler('py3dtilers.GeojsonTiler', ['-i', geojson, '-o', output_dir, '--kd_tree_max', 10, '--lod1'] + list(options))
+    return read_files(output_dir)
+
+
+def test_jobs_create_the_same_tileset(tmp_path, geojson):
+    expected = create_geojson_tileset(geojson, tmp_path / 'serial')
+    assert 'tileset.json' in expected
+    assert len([path for path in expected if path.endswith('.b3dm')]) > 6
+    assert create_geojson_tileset(geojson, tmp_path / 'jobs', '--jobs', 2) == expected
+
+
+def test_jobs_with_textures(tmp_path):
+    obj = create_textured_obj(tmp_path / 'obj')
+    tilesets = list()
+    for jobs in [1, 2]:
+        output_dir = tmp_path / f'jobs_{jobs}'
+        run_tiler('py3dtilers.ObjTiler', ['-i', obj, '-o', output_dir, '--kd_tree_max', 4, '--with_texture', '--texture_lods', 2, '--jobs', jobs])
+        tilesets.append(read_files(output_dir))
+    assert len([path for path in tilesets[0] if path.startswith('tiles/') and not path.endswith('.b3dm')]) > 3
+    assert tilesets[1] == tilesets[0]
+
+
+def test_stream_creates_the_same_tileset(tmp_path, geojson):
+    expected = create_geojson_tileset(geojson, tmp_path / 'default')
+    assert create_geojson_tileset(geojson, tmp_path / 'stream', '--stream') == expected
+    # A budget lower than a tile only limits the number of tiles sent to the processes
+    assert create_geojson_tileset(geojson, tmp_path / 'budget', '--stream', '--jobs', 2, '--memory_budget', 0.001) == expected
+
+
+def test_io_threads_create_the_same_tileset(tmp_path, geojson):
+    expected = create_geojson_tileset(geojson, tmp_path / 'default')
+    assert create_geojson_tileset(geojson, tmp_path / 'io_threads', '--io_threads', 3) == expected
+
+
+def test_io_threads_with_textures(tmp_path):
+    obj = create_textured_obj(tmp_path / 'obj')
+    tilesets = list()
+    for options in [[], ['--io_threads', 2]]:
+        output_dir = tmp_path / f'output_{len(tilesets)}'
+        run_tiler('py3dtilers.ObjTiler', ['-i', obj, '-o', output_dir, '--kd_tree_max', 4, '--with_texture', '--texture_lods', 1] + options)
+        tilesets.append(read_files(output_dir))
+    assert tilesets[1] == tilesets[0]
+
+
+def create_fans_obj(directory, nb_triangles=(3, 4, 6)):
+    """
+    Write an OBJ file of fans, the triangles of each fan sharing their vertices.
+    """
+    directory.mkdir()
+    lines = list()
+    nb_vertices = 0
+    for i, count in enumerate(nb_triangles):
+        lines += [f'o fan_{i}', f'v {20 * i} 0 0']
+        lines += [f'v {20 * i + 10 * math.cos(k / count)} {10 * math.sin(k / count)} 0' for k in range(count + 1)]
+        lines += [f'f {nb_vertices + 1} {nb_vertices + k + 2} {nb_vertices + k + 3}' for k in range(count)]
+        nb_vertices += count + 2
+    (directory / 'fans.obj').write_text('\n'.join(lines))
+    return directory
+
+
+@pytest.mark.parametrize('input_type', ['geojson', 'obj'])
+def test_weld(tmp_path, geojson, input_type):
+    if input_type == 'geojson':
+        create_geojson_tileset(geojson, tmp_path / 'soup')
+        create_geojson_tileset(geojson, tmp_path / 'weld', '--weld')
+    else:
+        # Fans with an odd number of triangles, so the uint16 indices need a padding.
+        # The fans aren't reprojected, so the triangles of a fan keep the same normal
+        obj = create_fans_obj(tmp_path / 'obj')
+        for options in [['-o', tmp_path / 'soup'], ['-o', tmp_path / 'weld', '--weld']]:
+            run_tiler('py3dtilers.ObjTiler', ['-i', obj, '--crs_in', 'EPSG:4978'] + options)
+    tiles = sorted((tmp_path / 'soup' / 'tiles').glob('*.b3dm'))
+    assert len(tiles) > 0
+    for tile in tiles:
+        expected, _ = read_triangles(tile)
+        triangles, gltf = read_triangles(tmp_path / 'weld' / 'tiles' / tile.name)
+        assert np.array_equal(triangles, expected)
+        for primitive in gltf.meshes[0].primitives:
+            indices = gltf.accessors[primitive.indices]
+            # Small primitives use uint16 indices, padded to an even count so the next buffer views stay aligned
+            assert indices.componentType == pygltflib.UNSIGNED_SHORT
+            assert indices.count % 6 == 0
+            assert gltf.accessors[primitive.attributes.POSITION].count < indices.count
+        assert all(buffer_view.byteOffset % 4 == 0 for buffer_view in gltf.bufferViews)
+
+
+def get_corners(tile, matrix):
+    """
+    Return the corners of the box of a tile of tileset.json, in the frame of the root tile.
+    :param matrix: the 4x4 transform from the frame of the parent of the tile to the frame of the root tile
+    """
+    box = np.array(tile['boundingVolume']['box'])
+    signs = np.array([[x, y, z] for x in [-1, 1] for y in [-1, 1] for z in [-1, 1]])
+    corners = box[0:3] + signs @ box[3:12].reshape((3, 3))
+    return (np.column_stack((corners, np.ones(8))) @ matrix.T)[:, 0:3]
+
+
+def check_hierarchy(tile, matrix, max_children, max_error):
+    """
+    Check that the tiles without content contain their children, and return the content of the tiles.
+    """
+    if 'transform' in tile:
+        matrix = matrix @ np.array(tile['transform']).reshape((4, 4), order='F')
+    if 'content' in tile:
+        return [tile['content']['uri']]
+    assert 0 < len(tile['children']) <= max_children
+    assert tile['geometricError'] <= max_error
+    assert tile['refine'] == 'ADD'
+    corners = get_corners(tile, matrix)
+    uris = list()
+    for child in tile['children']:
+        child_matrix = matrix @ np.array(child['transform']).reshape((4, 4), order='F') if 'transform' in child else matrix
+        child_corners = get_corners(child, child_matrix)
+        assert np.all(np.min(child_corners, axis=0) >= np.min(corners, axis=0) - 1e-6)
+        assert np.all(np.max(child_corners, axis=0) <= np.max(corners, axis=0) + 1e-6)
+        uris += check_hierarchy(child, matrix, max_children, tile['geometricError'])
+    return uris
+
+
+def test_bvh(tmp_path, geojson):
+    create_geojson_tileset(geojson, tmp_path / 'flat', '--kd_tree_max', 3)
+    create_geojson_tileset(geojson, tmp_path / 'bvh', '--kd_tree_max', 3, '--bvh', 4)
+    flat = json.loads((tmp_path / 'flat' / 'tileset.json').read_text())
+    bvh = json.loads((tmp_path / 'bvh' / 'tileset.json').read_text())
+
+    assert len(flat['root']['children']) > 4
+    # The root keeps its error, which bounds the errors of the hierarchy
+    assert bvh['root']['geometricError'] == flat['root']['geometricError'] == 500
+    uris = list()
+    for child in bvh['root']['children']:
+        assert 'content' not in child
+        uris += check_hierarchy(child, np.identity(4), 4, 500)
+    assert len(bvh['root']['children']) <= 4
+    assert sorted(uris) == sorted([child['content']['uri'] for child in flat['root']['children']])
+
+
+def test_texture_lods_share_the_atlas(tmp_path):
+    obj = create_textured_obj(tmp_path / 'obj')
+    for texture_lods in [0, 2]:
+        run_tiler('py3dtilers.ObjTiler', ['-i', obj, '-o', tmp_path / f'lods_{texture_lods}', '--kd_tree_max', 4,
+                                          '--with_texture', '--texture_lods', texture_lods, '--format', 'png'])
+    without_lods = json.loads((tmp_path / 'lods_0' / 'tileset.json').read_text())['root']['children']
+    with_lods = json.loads((tmp_path / 'lods_2' / 'tileset.json').read_text())['root']['children']
+    assert len(with_lods) == len(without_lods) > 1
+
+    for tile, expected_tile in zip(with_lods, without_lods):
+        # The levels go from the lowest resolution (the parent) to the full resolution
+        levels = [tile, tile['children'][0], tile['children'][0]['children'][0]]
+        images = list()
+        uvs = list()
+        for level in levels:
+            gltf = read_binary_tile_content(tmp_path / 'lods_2' / level['content']['uri']).body.gltf
+            images.append(Image.open(tmp_path / 'lods_2' / 'tiles' / gltf.images[0].uri))
+            uvs.append(np.concatenate([read_accessor(gltf, primitive.attributes.TEXCOORD_0) for primitive in gltf.meshes[0].primitives]))
+        # The atlas is packed once: all the levels use the same UVs, only the atlas image is downsized
+        assert all(np.array_equal(level_uvs, uvs[-1]) for level_uvs in uvs)
+        assert images[0].width < images[1].width < images[2].width
+        assert images[0].height < images[1].height < images[2].height
+
+        gltf = read_binary_tile_content(tmp_path / 'lods_0' / expected_tile['content']['uri']).body.gltf
+        expected_image = Image.open(tmp_path / 'lods_0' / 'tiles' / gltf.images[0].uri)
+        assert np.array_equal(np.array(images[-1]), np.array(expected_image))
+
+
+def get_leaves(tile):
+    """
+    Return the tiles without children.
+    """
+    if not tile.get('children'):
+        return [tile]
+    return [leaf for child in tile['children'] for leaf in get_leaves(child)]
+
+
+def check_monotone_errors(tile):
+    """
+    Check that the geometric error of each tile is at least the error of its children, and return the number of tiles.
+    """
+    count = 1
+    for child in tile.get('children', []):
+        assert child['geometricError'] <= tile['geometricError']
+        count += check_monotone_errors(child)
+    return count
+
+
+@pytest.mark.parametrize('options', [['--simplify', 0.5], ['--bvh', 3]])
+def test_auto_geometric_error(tmp_path, geojson, options):
+    create_geojson_tileset(geojson, tmp_path / 'auto', '--kd_tree_max', 5, '--auto_geometric_error', *options)
+    tileset = json.loads((tmp_path / 'auto' / 'tileset.json').read_text())
+    assert check_monotone_errors(tileset['root']) > 10
+    assert tileset['geometricError'] == tileset['root']['geometricError']
+    # The LOD1 tiles replace buildings several meters high, the original features have no error
+    lod1_tiles = [tile for tile in tileset['root']['children'] if 'content' in tile]
+    for tile in lod1_tiles:
+        assert tile['geometricError'] > 1
+    leaves = get_leaves(tileset['root'])
+    assert len(leaves) > 0 and all(tile['geometricError'] == 0 for tile in leaves)
+
+
+def test_auto_geometric_error_with_textures(tmp_path):
+    obj = create_textured_obj(tmp_path / 'obj')
+    run_tiler('py3dtilers.ObjTiler', ['-i', obj, '-o', tmp_path / 'auto', '--kd_tree_max', 4, '--with_texture', '--texture_lods', 2, '--auto_geometric_error'])
+    tileset = json.loads((tmp_path / 'auto' / 'tileset.json').read_text())
+    assert check_monotone_errors(tileset['root']) == 13
+    for tile in tileset['root']['children']:
+        # The lower resolution levels have a bigger texel, so a higher error
+        errors = [tile['geometricError'], tile['children'][0]['geometricError'], tile['children'][0]['children'][0]['geometricError']]
+        assert errors[0] > errors[1] > errors[2] >= 0
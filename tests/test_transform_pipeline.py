@@ -0,0 +1,63 @@
+import copy
+import numpy as np
+import pytest
+from pyproj import Transformer
+from py3dtilers.Common import Feature, FeatureList, TransformPipeline
+
+
+@pytest.fixture
+def feature_list():
+    rng = np.random.default_rng(0)
+    features = list()
+    for i, nb_triangles in enumerate([30, 2, 11, 25]):
+        feature = Feature(str(i))
+        feature.set_triangles(rng.uniform([1840000, 5170000, 150], [1841000, 5171000, 200], (nb_triangles, 3, 3)))
+        feature.set_box()
+        features.append(feature)
+    return FeatureList(features)
+
+
+@pytest.fixture
+def transformer():
+    return Transformer.from_crs('EPSG:3946', 'EPSG:4978', always_xy=True)
+
+
+@pytest.mark.parametrize('chunk_size', [7, 65536])
+def test_same_result_as_each_transformation(feature_list, transformer, chunk_size, monkeypatch):
+    monkeypatch.setattr(TransformPipeline, 'CHUNK_SIZE', chunk_size)
+    centroid = feature_list.get_centroid()
+    offset = np.array([10, -20, 5])
+    expected = copy.deepcopy(feature_list)
+    expected.height_mult_features(1.5)
+    expected.scale_features(2, centroid)
+    expected.change_crs(transformer, offset)
+
+    pipeline = TransformPipeline()
+    pipeline.add_height_mult(1.5)
+    pipeline.add_scale(2, centroid)
+    pipeline.add_translation(offset)
+    pipeline.set_reprojection(transformer)
+    feature_list.transform_features(pipeline)
+
+    for feature, expected_feature in zip(feature_list, expected):
+        assert np.allclose(feature.get_geom_as_triangles(), expected_feature.get_geom_as_triangles(), rtol=0, atol=1e-6)
+        assert np.allclose(feature.get_centroid(), expected_feature.get_centroid(), rtol=0, atol=1e-6)
+
+
+def test_steps_keep_their_order():
+    vertices = np.array([[1., 2., 3.], [4., 5., 6.]])
+    pipeline = TransformPipeline()
+    pipeline.add_translation([1, 1, 1])
+    pipeline.add_height_mult(2)
+    pipeline.add_scale(3, [0, 0, 0])
+    pipeline.apply(vertices)
+    assert np.array_equal(vertices, [[6., 9., 24.], [15., 18., 42.]])
+
+
+def test_empty_pipeline(feature_list):
+    pipeline = TransformPipeline()
+    assert pipeline.is_empty()
+    expected = [feature.get_geom_as_triangles().copy() for feature in feature_list]
+    feature_list.transform_features(pipeline)
+    for feature, triangles in zip(feature_list, expected):
+        assert np.array_equal(feature.get_geom_as_triangles(), triangles)
@@ -0,0 +1,38 @@
+import pytest
+from pyproj import Transformer
+from py3dtilers.Common import RunReport, TransformerCache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    TransformerCache.clear()
+    RunReport.reset()
+    yield
+    TransformerCache.clear()
+    RunReport.reset()
+
+
+def test_transformers_are_reused():
+    transformer = TransformerCache.get_transformer('EPSG:3946', 'EPSG:4978', always_xy=True)
+    assert TransformerCache.get_transformer('EPSG:3946', 'EPSG:4978', always_xy=True) is transformer
+    assert TransformerCache.misses == 1
+    assert TransformerCache.hits == 1
+    assert RunReport.get_section('transformer_cache') == {'misses': 1, 'hits': 1}
+
+    expected = Transformer.from_crs('EPSG:3946', 'EPSG:4978', always_xy=True).transform(1843000, 5175000, 170)
+    assert transformer.transform(1843000, 5175000, 170) == expected
+
+
+def test_the_options_are_part_of_the_key():
+    transformer = TransformerCache.get_transformer('EPSG:3946', 'EPSG:4326', always_xy=True)
+    assert TransformerCache.get_transformer('EPSG:3946', 'EPSG:4326') is not transformer
+    assert TransformerCache.get_transformer('EPSG:4326', 'EPSG:3946', always_xy=True) is not transformer
+    assert TransformerCache.misses == 3
+    assert TransformerCache.hits == 0
+
+
+def test_clear():
+    transformer = TransformerCache.get_transformer('EPSG:3946', 'EPSG:4978')
+    TransformerCache.clear()
+    assert TransformerCache.misses == 0
+    assert TransformerCache.get_transformer('EPSG:3946', 'EPSG:4978') is not transformer